@@ -0,0 +1,57 @@
+"""Compare default and bulk ingest throughput into subject.Subject
+
+Requires a database configured as for the tests (dj_local_conf.json or DJ_*
+environment variables). Inserted rows are deleted after each run.
+
+run:
+    python benchmarks/bench_bulk_ingest.py --rows 100000
+"""
+
+import argparse
+import pathlib
+import tempfile
+import time
+
+import datajoint as dj
+
+
+def write_subjects_csv(path: pathlib.Path, n_rows: int):
+    """Write `n_rows` synthetic subjects named bench_<n>"""
+    with open(path, "w") as f:
+        f.write("subject,sex,subject_birth_date,subject_description\n")
+        for i in range(n_rows):
+            f.write(f"bench_{i},{'MF'[i % 2]},2020-01-01,synthetic subject {i}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dj.config["safemode"] = False
+    from workflow_session.ingest import ingest_csv_to_table
+    from workflow_session.pipeline import subject
+
+    bench_subjects = subject.Subject & 'subject LIKE "bench\\_%%"'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = pathlib.Path(tmp_dir) / "subjects.csv"
+        write_subjects_csv(csv_path, args.rows)
+        for mode, options in (("default", {}), ("bulk", {"bulk": True})):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                ingest_csv_to_table(
+                    [csv_path], [subject.Subject()], verbose=False, **options
+                )
+                timings.append(time.perf_counter() - start)
+                bench_subjects.delete()
+            best = min(timings)
+            print(
+                f"{mode:>8}: best of {args.repeat} {best:.2f} s, "
+                + f"{args.rows / best:,.0f} rows/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
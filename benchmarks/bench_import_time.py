@@ -0,0 +1,60 @@
+"""Compare eager and lazy import time of workflow_session.pipeline
+
+Each measurement runs in a fresh interpreter so no module or connection is
+reused. Reports the import itself and the first query on lab.Lab, which in
+lazy mode activates only the lab schema.
+
+Requires a database configured as for the tests (dj_local_conf.json or DJ_*
+environment variables).
+
+run:
+    python benchmarks/bench_import_time.py --repeat 5
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+_PROBE = """
+import json, time
+start = time.perf_counter()
+import datajoint as dj
+custom = dj.config["custom"] if "custom" in dj.config else {{}}
+custom["lazy_activation"] = {lazy}
+dj.config["custom"] = custom
+from workflow_session import pipeline
+imported = time.perf_counter()
+len(pipeline.lab.Lab())
+print(json.dumps([imported - start, time.perf_counter() - start]))
+"""
+
+
+def measure(lazy: bool) -> tuple:
+    """Return (import seconds, seconds until first lab.Lab query returns)"""
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(lazy=lazy)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return tuple(json.loads(output.splitlines()[-1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for lazy in (False, True):
+        timings = [measure(lazy) for _ in range(args.repeat)]
+        import_time = min(t[0] for t in timings)
+        first_query = min(t[1] for t in timings)
+        print(
+            f"{'lazy' if lazy else 'eager':>6}: import {import_time:.2f} s, "
+            + f"first lab.Lab query {first_query:.2f} s (best of {args.repeat})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Time end-to-end ingest of synthetic colonies of increasing size
+
+For each size, generate_data.py writes a colony in the layout of ./user_data,
+then a fresh interpreter ingests it with ingest_lab, ingest_subjects and
+ingest_sessions into schemas under a run-specific prefix, which are dropped
+afterwards. One JSON record per size, with insert seconds per table, is
+appended to --output, so results of successive runs or options can be
+compared to track regressions.
+
+Requires a database configured as for the tests (dj_local_conf.json or DJ_*
+environment variables), e.g. the MySQL service in docker/.
+
+run:
+    python benchmarks/bench_ingest.py --sizes 1000 10000 100000 1000000
+    python benchmarks/bench_ingest.py --sizes 10000 --option bulk=true
+    python benchmarks/bench_ingest.py --sizes 1000000 --option load_data=true
+"""
+
+import argparse
+import datetime
+import json
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_data import generate_colony
+
+
+def _option(text: str) -> tuple:
+    """Parse KEY=VALUE, with VALUE as JSON when possible, e.g. workers=4"""
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def run_ingest(paths: dict, prefix: str, options: dict, keep: bool) -> dict:
+    """Ingest one generated colony in this process; return seconds per stage"""
+    import datajoint as dj
+
+    dj.config["safemode"] = False
+    custom = dj.config["custom"] if "custom" in dj.config else {}
+    custom["database.prefix"] = prefix
+    dj.config["custom"] = custom
+
+    from workflow_session.ingest import ingest_lab, ingest_sessions, ingest_subjects
+    from workflow_session.report import IngestReport
+    from workflow_session import pipeline
+
+    timings, report = {}, IngestReport()
+    try:
+        for stage, ingest in (
+            ("lab", ingest_lab),
+            ("subject", ingest_subjects),
+            ("session", ingest_sessions),
+        ):
+            start = time.perf_counter()
+            ingest(**paths[stage], verbose=False, report=report, **options)
+            timings[f"{stage}_s"] = time.perf_counter() - start
+        timings["insert_s"] = {
+            record["table"]: record["insert_s"] for record in report.as_dict()["tables"]
+        }
+    finally:
+        if not keep:
+            for module in (
+                pipeline.summary,
+                pipeline.session,
+                pipeline.genotyping,
+                pipeline.subject,
+                pipeline.lab,
+            ):
+                module.schema.drop(force=True)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--sessions-per-subject", type=int, default=2)
+    parser.add_argument(
+        "--option",
+        type=_option,
+        action="append",
+        default=[],
+        help="ingest keyword argument as KEY=VALUE, e.g. bulk=true; repeatable",
+    )
+    parser.add_argument("--output", default="bench_ingest.jsonl")
+    parser.add_argument("--data-dir", help="keep generated CSVs here")
+    parser.add_argument("--keep", action="store_true", help="do not drop schemas")
+    parser.add_argument("--run", help=argparse.SUPPRESS)  # child: JSON arguments
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_ingest(**json.loads(args.run))))
+        return
+
+    options = dict(args.option)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_subjects in args.sizes:
+            root = pathlib.Path(args.data_dir or tmp_dir) / f"colony_{n_subjects}"
+            start = time.perf_counter()
+            paths = generate_colony(root, n_subjects, args.sessions_per_subject)
+            generate_s = time.perf_counter() - start
+
+            child_args = dict(
+                paths={
+                    stage: {name: str(path) for name, path in stage_paths.items()}
+                    for stage, stage_paths in paths.items()
+                },
+                prefix=f"bench{int(time.time())}_",
+                options=options,
+                keep=args.keep,
+            )
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", json.dumps(child_args)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            record = dict(
+                timestamp=datetime.datetime.now().isoformat(timespec="seconds"),
+                subjects=n_subjects,
+                sessions=n_subjects * args.sessions_per_subject,
+                options=options,
+                generate_s=generate_s,
+                **json.loads(output.splitlines()[-1]),
+            )
+            record["total_s"] = sum(
+                record[f"{stage}_s"] for stage in ("lab", "subject", "session")
+            )
+            with open(args.output, "a") as f:
+                f.write(json.dumps(record) + "\n")
+            print(
+                f"{n_subjects:>9,} subjects: lab {record['lab_s']:.1f} s, "
+                + f"subjects {record['subject_s']:.1f} s, "
+                + f"sessions {record['session_s']:.1f} s, "
+                + f"{n_subjects / record['total_s']:,.0f} subjects/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
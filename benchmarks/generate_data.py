@@ -0,0 +1,317 @@
+"""Generate synthetic colony CSVs in the layout of ./user_data
+
+Every file under user_data/lab, user_data/subject and user_data/session is
+reproduced with the same columns. Foreign keys stay consistent: parents are
+earlier subjects of the same line and sex, litters belong to their pair's
+line, and all users, projects, cages and sequences referenced are declared.
+
+run:
+    python benchmarks/generate_data.py ./bench_data --subjects 100000
+"""
+
+import argparse
+import bisect
+import csv
+import datetime
+import pathlib
+import random
+
+_START = datetime.date(2010, 1, 1)
+_SPAN_DAYS = 12 * 365
+_N_LINES = 6
+_N_USERS = 40
+_N_PROJECTS = 8
+_LITTERS_PER_PAIR = 4
+_BREEDING_AGE = datetime.timedelta(days=60)
+_LITTER_INTERVAL = datetime.timedelta(days=21)
+
+
+def _write(path: pathlib.Path, header: list, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
+
+
+def _lab_csvs(root: pathlib.Path) -> dict:
+    users = [f"User{i}" for i in range(_N_USERS)]
+    projects = [f"Proj{i}" for i in range(_N_PROJECTS)]
+    return dict(
+        lab_csv_path=_write(
+            root / "lab/labs.csv",
+            "lab,lab_name,institution,address,time_zone,location,"
+            "location_description".split(","),
+            [
+                (lab, f"{lab} name", "Example Uni", "1 Example St", "UTC+0", "B1", "")
+                for lab in ("LabA", "LabB")
+            ],
+        ),
+        project_csv_path=_write(
+            root / "lab/projects.csv",
+            "project,project_description,repository_url,repository_name,codeurl".split(
+                ","
+            ),
+            [(p, f"{p} description", "https://example.org", p, "") for p in projects],
+        ),
+        publication_csv_path=_write(
+            root / "lab/publications.csv",
+            ["project", "publication"],
+            [(p, f"doi:10.0000/{p}") for p in projects],
+        ),
+        keyword_csv_path=_write(
+            root / "lab/keywords.csv",
+            ["project", "keyword"],
+            [(p, kw) for p in projects for kw in ("Study", "Synthetic")],
+        ),
+        protocol_csv_path=_write(
+            root / "lab/protocols.csv",
+            ["protocol", "protocol_type", "protocol_description"],
+            [
+                ("ProtA", "IRB expedited review", ""),
+                ("ProtB", "Alternative Method", ""),
+            ],
+        ),
+        users_csv_path=_write(
+            root / "lab/users.csv",
+            ["lab", "user", "user_role", "user_email", "user_cellphone"],
+            [
+                (("LabA", "LabB")[i % 2], user, ("PI", "Lab Tech")[i > 1], "", "")
+                for i, user in enumerate(users)
+            ],
+        ),
+        project_user_csv_path=_write(
+            root / "lab/project_users.csv",
+            ["user", "project"],
+            [(user, projects[i % _N_PROJECTS]) for i, user in enumerate(users)],
+        ),
+        sources_csv_path=_write(
+            root / "lab/sources.csv",
+            ["source", "source_name", "contact_details", "source_description"],
+            [("Provider1", "Example Provider", "", "")],
+        ),
+    )
+
+
+def _pick_parent(breeders: tuple, litter_birth: datetime.date, rng) -> str:
+    """Random subject of breeding age at `litter_birth`, else the oldest one"""
+    subjects, births = breeders
+    n_mature = bisect.bisect_right(births, litter_birth - _BREEDING_AGE)
+    return subjects[rng.randrange(n_mature)] if n_mature else subjects[0]
+
+
+def _subject_csvs(root: pathlib.Path, n_subjects: int, rng: random.Random) -> tuple:
+    """Write subject and genotyping CSVs; return their paths and subject rows"""
+    lines = [f"Line{i}" for i in range(_N_LINES)]
+    alleles = [f"Allele{i}" for i in range(_N_LINES)]
+    sequences = [f"Seq{i}" for i in range(_N_LINES)]
+    users = [f"User{i}" for i in range(_N_USERS)]
+    paths = dict(
+        strain_csv_path=_write(
+            root / "subject/strain.csv",
+            ["strain", "strain_standard_name", "strain_desc"],
+            [(f"Strain{i}", f"Strain{i}-std", "") for i in range(5)],
+        ),
+        allele_csv_path=_write(
+            root / "subject/allele.csv",
+            "allele,allele_standard_name,sequence,source,source_identifier,"
+            "source_url".split(","),
+            [(a, a, s, "Provider1", "", "") for a, s in zip(alleles, sequences)],
+        ),
+        line_csv_path=_write(
+            root / "subject/line.csv",
+            "line,species,line_description,target_phenotype,is_active,allele".split(
+                ","
+            ),
+            [(line, "mus musculus", "", "", 1, a) for line, a in zip(lines, alleles)],
+        ),
+    )
+
+    subjects, parts, zygosity, cages, tests, litters = [], [], [], [], [], []
+    n_founders = max(2 * _N_LINES, n_subjects // 20)
+    # Per line and sex: subjects and birth dates, in birth order
+    breeders = {line: {"M": ([], []), "F": ([], [])} for line in lines}
+    pairs = {line: None for line in lines}
+    open_litters = {line: None for line in lines}
+
+    for i in range(n_subjects):
+        subject = f"s{i:07d}"  # subject is varchar(8)
+        line_idx = i % _N_LINES
+        line = lines[line_idx]
+        birth = _START + datetime.timedelta(days=i * _SPAN_DAYS // n_subjects)
+        if i < n_founders:
+            sex = "MF"[(i // _N_LINES) % 2]
+        else:
+            sex = rng.choice("MMFFU")
+            # Up to 8 pups per litter; pairs renewed every few litters, and
+            # whenever the current pair littered too recently
+            litter = open_litters[line]
+            if litter is None or len(litter["pups"]) >= 8:
+                pair = pairs[line]
+                if (
+                    pair is None
+                    or pair["litters"] >= _LITTERS_PER_PAIR
+                    or birth - pair["last_litter"] < _LITTER_INTERVAL
+                ):
+                    pair = dict(
+                        breeding_pair=f"BP{i:07d}",
+                        father=_pick_parent(breeders[line]["M"], birth, rng),
+                        mother=_pick_parent(breeders[line]["F"], birth, rng),
+                        start=birth - _LITTER_INTERVAL,
+                        litters=0,
+                    )
+                    pairs[line] = pair
+                pair["litters"] += 1
+                pair["last_litter"] = birth
+                litter = dict(line=line, pair=pair, birth=birth, pups=[])
+                open_litters[line] = litter
+                litters.append(litter)
+            litter["pups"].append((subject, sex))
+            birth = litter["birth"]
+        if sex in "MF":
+            breeders[line][sex][0].append(subject)
+            breeders[line][sex][1].append(birth)
+
+        death = birth + datetime.timedelta(days=rng.randint(200, 900))
+        subjects.append((subject, sex, birth, "", death, "natural causes"))
+        parts.append(
+            (
+                subject,
+                "ProtA",
+                users[i % _N_USERS],
+                line,
+                f"Strain{i % 5}",
+                "Provider1",
+                "LabA",
+            )
+        )
+        zygosity.append((subject, alleles[line_idx], rng.choice(("Present", "Absent"))))
+        cages.append((f"C{i // 4:06d}", subject, birth, users[i % _N_USERS]))
+        tests.append(
+            (subject, sequences[line_idx], "TestA", rng.choice(("Present", "Absent")))
+        )
+
+    breeding_rows = []
+    for litter in litters:
+        pair = litter["pair"]
+        n_male = sum(sex == "M" for _, sex in litter["pups"])
+        n_female = sum(sex == "F" for _, sex in litter["pups"])
+        for subject, _ in litter["pups"]:
+            breeding_rows.append(
+                (
+                    subject,
+                    litter["line"],
+                    pair["breeding_pair"],
+                    pair["start"],
+                    pair["start"] + datetime.timedelta(days=365),
+                    pair["father"],
+                    pair["mother"],
+                    litter["birth"],
+                    len(litter["pups"]),
+                    litter["birth"] + datetime.timedelta(days=21),
+                    n_male,
+                    n_female,
+                )
+            )
+
+    paths.update(
+        subject_csv_path=_write(
+            root / "subject/subjects.csv",
+            "subject,sex,subject_birth_date,subject_description,death_date,"
+            "cull_method".split(","),
+            subjects,
+        ),
+        subject_part_csv_path=_write(
+            root / "subject/subjects_part.csv",
+            "subject,protocol,user,line,strain,source,lab".split(","),
+            parts,
+        ),
+        zygosity_csv_path=_write(
+            root / "subject/zygosity.csv", ["subject", "allele", "zygosity"], zygosity
+        ),
+        cage_csv_path=_write(
+            root / "subject/cage.csv",
+            ["cage", "subject", "caging_datetime", "user"],
+            cages,
+        ),
+        genotype_test_csv_path=_write(
+            root / "subject/genotype_test.csv",
+            ["subject", "sequence", "genotype_test_id", "test_result"],
+            tests,
+        ),
+        breedingpair_csv_path=_write(
+            root / "subject/breedingpair.csv",
+            "subject,line,breeding_pair,bp_start_date,bp_end_date,father,mother,"
+            "litter_birth_date,num_of_pups,weaning_date,num_of_male,"
+            "num_of_female".split(","),
+            breeding_rows,
+        ),
+    )
+    return paths, subjects
+
+
+def _session_csvs(
+    root: pathlib.Path, subjects: list, sessions_per_subject: int, rng: random.Random
+) -> dict:
+    def _rows():
+        for i, (subject, _, birth, *_) in enumerate(subjects):
+            for k in range(sessions_per_subject):
+                start = datetime.datetime.combine(birth, datetime.time(9)) + (
+                    datetime.timedelta(days=60 + 7 * k, minutes=rng.randint(0, 480))
+                )
+                yield (
+                    subject,
+                    f"Proj{i % _N_PROJECTS}",
+                    start,
+                    f"/{subject}/session{k}",
+                    "synthetic session",
+                    f"User{i % _N_USERS}",
+                )
+
+    return dict(
+        session_csv_path=_write(
+            root / "session/sessions.csv",
+            "subject,project,session_datetime,session_dir,session_note,user".split(","),
+            _rows(),
+        )
+    )
+
+
+def generate_colony(
+    root: str, n_subjects: int, sessions_per_subject: int = 2, seed: int = 0
+) -> dict:
+    """Write a synthetic colony under `root` in the layout of ./user_data
+
+    Args:
+        root (str): output directory, receiving lab/, subject/ and session/
+        n_subjects (int): number of subjects, at most 10^7
+        sessions_per_subject (int): Default 2. Sessions per subject
+        seed (int): Default 0. Random seed, for reproducible files
+
+    Returns:
+        paths (dict): {"lab": kwargs, "subject": kwargs, "session": kwargs} of
+            CSV paths for ingest_lab, ingest_subjects and ingest_sessions
+    """
+    root = pathlib.Path(root)
+    rng = random.Random(seed)
+    subject_paths, subjects = _subject_csvs(root, n_subjects, rng)
+    return dict(
+        lab=_lab_csvs(root),
+        subject=subject_paths,
+        session=_session_csvs(root, subjects, sessions_per_subject, rng),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--subjects", type=int, default=1000)
+    parser.add_argument("--sessions-per-subject", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_colony(args.root, args.subjects, args.sessions_per_subject, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,4 +31,5 @@ setup(
     keywords="neuroscience lab-management animal-management session datajoint",
     packages=find_packages(exclude=["contrib", "docs", "tests*"]),
     install_requires=requirements,
+    extras_require={"arrow": ["pyarrow"]},
 )
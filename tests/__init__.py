@@ -1,15 +1,19 @@
 """
 run all tests:
     pytest -sv --cov-report term-missing --cov=workflow_session -p no:warnings tests/
+run in parallel, each pytest-xdist worker with its own schemas and CSV directory:
+    pytest -n auto [above options]
 run one test, debug:
     pytest [above options] --pdb tests/tests_name.py -k function_name
 """
 
 import os
 import sys
+import atexit
+import shutil
 import pytest
 import pathlib
-import datajoint as dj
+import tempfile
 
 __all__ = ["pipeline"]
 
@@ -18,10 +22,18 @@ __all__ = ["pipeline"]
 _tear_down = True
 verbose = False
 
-pathlib.Path("./tests/user_data").mkdir(exist_ok=True)
-pathlib.Path("./tests/user_data/lab").mkdir(exist_ok=True)
-pathlib.Path("./tests/user_data/session").mkdir(exist_ok=True)
-pathlib.Path("./tests/user_data/subject").mkdir(exist_ok=True)
+# pytest-xdist worker ID, e.g. "gw0"; empty when running serially
+_worker = os.environ.get("PYTEST_XDIST_WORKER", "")
+
+# CSVs written by fixtures, in a directory of this worker's own
+user_data = pathlib.Path(
+    tempfile.mkdtemp(prefix=f"workflow_session_{_worker or 'tests'}_")
+)
+(user_data / "lab").mkdir(exist_ok=True)
+(user_data / "session").mkdir(exist_ok=True)
+(user_data / "subject").mkdir(exist_ok=True)
+if _tear_down:
+    atexit.register(shutil.rmtree, user_data, ignore_errors=True)
 
 # ------------------ GENERAL FUNCTIONS ------------------
 
@@ -52,25 +64,6 @@ class QuietStdOut:
 # ---------------------- FIXTURES ----------------------
 
 
-@pytest.fixture(autouse=True)
-def dj_config():
-    """If dj_local_config exists, load"""
-    if pathlib.Path("./dj_local_conf.json").exists():
-        dj.config.load("./dj_local_conf.json")
-    dj.config["safemode"] = False
-    dj.config["database.host"] = os.environ.get("DJ_HOST") or dj.config["database.host"]
-    dj.config["database.password"] = (
-        os.environ.get("DJ_PASS") or dj.config["database.password"]
-    )
-    dj.config["database.user"] = os.environ.get("DJ_USER") or dj.config["database.user"]
-    dj.config["custom"] = {
-        "database.prefix": (
-            os.environ.get("DATABASE_PREFIX") or dj.config["custom"]["database.prefix"]
-        )
-    }
-    return
-
-
 @pytest.fixture
 def pipeline():
     """Loads workflow_session.pipeline lab, session, subject"""
@@ -81,6 +74,7 @@ def pipeline():
         "genotyping": pipeline.genotyping,
         "session": pipeline.session,
         "lab": pipeline.lab,
+        "summary": pipeline.summary,
     }
 
     if _tear_down:
@@ -90,6 +84,10 @@ def pipeline():
             pipeline.subject.Line.delete()
             pipeline.session.Session.delete()
             pipeline.lab.Lab.delete()
+            pipeline.summary.SubjectStatus.delete()
+            pipeline.summary.LineCount.delete()
+            pipeline.summary.CageOccupancy.delete()
+            pipeline.summary.GenotypeCount.delete()
         else:
             with QuietStdOut():
                 pipeline.genotyping.BreedingPair.delete()
@@ -97,6 +95,10 @@ def pipeline():
                 pipeline.subject.Line.delete()
                 pipeline.session.Session.delete()
                 pipeline.lab.Lab.delete()
+                pipeline.summary.SubjectStatus.delete()
+                pipeline.summary.LineCount.delete()
+                pipeline.summary.CageOccupancy.delete()
+                pipeline.summary.GenotypeCount.delete()
 
 
 # Lab fixtures
@@ -114,7 +116,7 @@ def lab_csv():
         + "Other Building,'fictional campus dedicated to imaginary"
         + "experiments.'",
     ]
-    lab_csv_path = pathlib.Path("./tests/user_data/lab/labs.csv")
+    lab_csv_path = user_data / "lab" / "labs.csv"
     write_csv(lab_content, lab_csv_path)
 
     yield lab_content, lab_csv_path
@@ -135,7 +137,7 @@ def lab_project_csv():
         + "/,element-session,https://github.com/datajoint/"
         + "element-session/tree/main/element_session",
     ]
-    lab_project_csv_path = pathlib.Path("./tests/user_data/lab/projects.csv")
+    lab_project_csv_path = user_data / "lab" / "projects.csv"
     write_csv(lab_project_content, lab_project_csv_path)
 
     yield lab_project_content, lab_project_csv_path
@@ -153,7 +155,7 @@ def lab_project_users_csv():
         "Dr. Candace Pert,ProjA",
         "User1,ProjA",
     ]
-    lab_project_user_csv_path = pathlib.Path("./tests/user_data/lab/project_users.csv")
+    lab_project_user_csv_path = user_data / "lab" / "project_users.csv"
     write_csv(lab_project_user_content, lab_project_user_csv_path)
 
     yield lab_project_user_content, lab_project_user_csv_path
@@ -168,10 +170,7 @@ def lab_publications_csv():
         "ProjA,arXiv:1807.11104",
         "ProjA,arXiv:1807.11104v1",
     ]
-    lab_publication_csv_path = pathlib.Path(
-        "./tests/user_data/lab/\
-                                             publications.csv"
-    )
+    lab_publication_csv_path = user_data / "lab" / "publications.csv"
     write_csv(lab_publication_content, lab_publication_csv_path)
 
     yield lab_publication_content, lab_publication_csv_path
@@ -187,7 +186,7 @@ def lab_keywords_csv():
         "ProjA,Example",
         "ProjB,Alternate",
     ]
-    lab_keyword_csv_path = pathlib.Path("./tests/user_data/lab/keywords.csv")
+    lab_keyword_csv_path = user_data / "lab" / "keywords.csv"
     write_csv(lab_keyword_content, lab_keyword_csv_path)
 
     yield lab_keyword_content, lab_keyword_csv_path
@@ -202,7 +201,7 @@ def lab_protocol_csv():
         "ProtA,IRB expedited review,Protocol for managing data ingestion",
         "ProtB,Alternative Method,Limited protocol for piloting only",
     ]
-    lab_protocol_csv_path = pathlib.Path("./tests/user_data/lab/protocols.csv")
+    lab_protocol_csv_path = user_data / "lab" / "protocols.csv"
     write_csv(lab_protocol_content, lab_protocol_csv_path)
 
     yield lab_protocol_content, lab_protocol_csv_path
@@ -220,7 +219,7 @@ def lab_user_csv():
         "LabA,User1,Lab Tech,fake@email.com,+44 1632 960103",
         "LabB,User2,Lab Tech,fake2@email.com,+44 1632 960102",
     ]
-    lab_user_csv_path = pathlib.Path("./tests/user_data/lab/users.csv")
+    lab_user_csv_path = user_data / "lab" / "users.csv"
     write_csv(lab_user_content, lab_user_csv_path)
 
     yield lab_user_content, lab_user_csv_path
@@ -235,7 +234,7 @@ def lab_source_csv():
         "Provider1,Example Provider,+44 1632 960663 / Example@Provider.com,UK-based "
         + "supplier of lab subjects mus musculus",
     ]
-    sources_csv_path = pathlib.Path("./tests/user_data/lab/sources.csv")
+    sources_csv_path = user_data / "lab" / "sources.csv"
     write_csv(sources_content, sources_csv_path)
 
     yield sources_content, sources_csv_path
@@ -292,7 +291,7 @@ def subjects_csv():
         "subjectY,M,2020-01-01 00:00:01,thom,2020-10-05 00:00:01,natural causes",
         "subjectZ,M,2020-01-01 00:00:01,winston,2020-10-06 00:00:01,natural causes",
     ]
-    subject_csv_path = pathlib.Path("./tests/user_data/subject/subjects.csv")
+    subject_csv_path = user_data / "subject" / "subjects.csv"
     write_csv(subject_content, subject_csv_path)
 
     yield subject_content, subject_csv_path
@@ -307,7 +306,7 @@ def subjects_part_csv():
         "subject5,ProtA,User1,Drd1a-Cre,B6.CBA,Provider1,LabA",
         "subject6,ProtA,User1,C57BL/6J,SHANK3,Provider1,LabA",
     ]
-    subject_part_csv_path = pathlib.Path("./tests/user_data/subject/subjects_part.csv")
+    subject_part_csv_path = user_data / "subject" / "subjects_part.csv"
     write_csv(subject_part_content, subject_part_csv_path)
 
     yield subject_part_content, subject_part_csv_path
@@ -323,7 +322,7 @@ def allele_csv():
         "Drd1a-Cre,Drd1a-Cre,DRd1a-Cre,Provider1,MGI:J:116774,jax.org/strain/024860",
         "Gad-Cre,Gad-Cre,Cre,Provider1,,",
     ]
-    allele_csv_path = pathlib.Path("./tests/user_data/subject/allele.csv")
+    allele_csv_path = user_data / "subject" / "allele.csv"
     write_csv(allele_content, allele_csv_path)
 
     yield allele_content, allele_csv_path
@@ -338,7 +337,7 @@ def cage_csv():
         "1,subject5,2020-01-02,User1",
         "2,subject6,2020-01-02,User2",
     ]
-    cage_csv_path = pathlib.Path("./tests/user_data/subject/cage.csv")
+    cage_csv_path = user_data / "subject" / "cage.csv"
     write_csv(cage_content, cage_csv_path)
 
     yield cage_content, cage_csv_path
@@ -362,7 +361,7 @@ def breedingpair_csv():
         "subjectZ,Drd1a-Cre,Drd_BP_001,2019-12-31,2020-01-02,subjectX,subjectY,"
         + "2020-01-01,3,2020-01-02,2,1",
     ]
-    breedingpair_csv_path = pathlib.Path("./tests/user_data/subject/breedingpair.csv")
+    breedingpair_csv_path = user_data / "subject" / "breedingpair.csv"
     write_csv(breedingpair_content, breedingpair_csv_path)
 
     yield breedingpair_content, breedingpair_csv_path
@@ -379,7 +378,7 @@ def genotype_test_csv():
         "subject5,Cre,TestB,Absent",
         "subject6,Cre,TestB,Present",
     ]
-    genotype_test_csv_path = pathlib.Path("./tests/user_data/subject/genotype_test.csv")
+    genotype_test_csv_path = user_data / "subject" / "genotype_test.csv"
     write_csv(genotype_test_content, genotype_test_csv_path)
 
     yield genotype_test_content, genotype_test_csv_path
@@ -395,7 +394,7 @@ def line_csv():
         "Drd1a-Cre,mus musculus,See MMRRC ID 30989,B6.FVB(Cg)-Tg(Drd1-cre)EY262Gsat/Mmucd,1,Drd1a-Cre",
         "Gad-IRES-Cre,mus musculus,When bred w/loxP-flanked sequences Cre-mediated recombination results in deletion of floxed seq in the GAD2 positive neurons,Gad2-Cr,1,Gad-Cre",
     ]
-    line_csv_path = pathlib.Path("./tests/user_data/subject/line.csv")
+    line_csv_path = user_data / "subject" / "line.csv"
     write_csv(line_content, line_csv_path)
 
     yield line_content, line_csv_path
@@ -410,7 +409,7 @@ def strain_csv():
         "B6.CBA,B6.CBA-Dh,congenic spontaneous mutation",
         "SHANK3,Shank3delta ex21,lacking exon 21 of the SH3/ankyrin domain gene 3 gene",
     ]
-    strain_csv_path = pathlib.Path("./tests/user_data/subject/strain.csv")
+    strain_csv_path = user_data / "subject" / "strain.csv"
     write_csv(strain_content, strain_csv_path)
 
     yield strain_content, strain_csv_path
@@ -429,7 +428,7 @@ def zygosity_csv():
         "subjectY,Drd1a-Cre,Present",
         "subjectZ,Drd1a-Cre,Present",
     ]
-    zygosity_csv_path = pathlib.Path("./tests/user_data/subject/zygosity.csv")
+    zygosity_csv_path = user_data / "subject" / "zygosity.csv"
     write_csv(zygosity_content, zygosity_csv_path)
 
     yield zygosity_content, zygosity_csv_path
@@ -482,7 +481,7 @@ def ingest_subjects(
 @pytest.fixture
 def sessions_csv():
     """Create a 'sessions.csv' file"""
-    session_csv_path = pathlib.Path("./tests/user_data/session/sessions.csv")
+    session_csv_path = user_data / "session" / "sessions.csv"
     session_content = [
         "subject,project,session_datetime,session_dir,session_note,user",
         "subject5,ProjA,2018-07-03 20:32:28,/subject5\\session1,"
@@ -0,0 +1,47 @@
+"""Fixtures every test module gets without importing them: the database
+configuration, with a schema prefix per pytest-xdist worker, and the drop of
+this worker's schemas at the end of the session
+"""
+
+import os
+import sys
+import pytest
+import pathlib
+import datajoint as dj
+
+from . import _tear_down, _worker
+
+
+@pytest.fixture(autouse=True)
+def dj_config():
+    """If dj_local_config exists, load"""
+    if pathlib.Path("./dj_local_conf.json").exists():
+        dj.config.load("./dj_local_conf.json")
+    dj.config["safemode"] = False
+    dj.config["database.host"] = os.environ.get("DJ_HOST") or dj.config["database.host"]
+    dj.config["database.password"] = (
+        os.environ.get("DJ_PASS") or dj.config["database.password"]
+    )
+    dj.config["database.user"] = os.environ.get("DJ_USER") or dj.config["database.user"]
+    custom = dj.config.get("custom") or {}
+    prefix = os.environ.get("DATABASE_PREFIX") or custom.get("database.prefix", "")
+    if _worker and not prefix.endswith(f"{_worker}_"):
+        prefix += f"{_worker}_"  # one set of schemas per pytest-xdist worker
+    dj.config["custom"] = {**custom, "database.prefix": prefix}
+    return
+
+
+@pytest.fixture(scope="session", autouse=True)
+def drop_schemas():
+    """At the end of the session, drop this worker's activated schemas,
+    downstream first, without activating any that lazy activation never reached
+    """
+    yield
+
+    if _tear_down and "workflow_session.pipeline" in sys.modules:
+        from workflow_session import pipeline
+
+        # _activators lists each schema after those it depends on
+        for name in reversed(list(pipeline._activators)):
+            if name in pipeline._activated:
+                pipeline._modules[name].schema.drop(force=True)
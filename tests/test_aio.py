@@ -0,0 +1,165 @@
+"""Test the asyncio ingest wrapper
+    1. Assert ingests run on worker threads, each with its own connection
+    2. Assert cancelling the awaiting task stops the ingest between batches
+    3. Assert the ingest module is resolved on the worker thread, not the loop
+    4. Assert overlapping uploads ingest through the ingestor's own connections
+"""
+
+import asyncio
+import sys
+import threading
+import types
+
+import pytest
+
+from workflow_session import aio, pool
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+    "sessions_csv",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+    sessions_csv,
+)
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    opened = []
+
+    def _new_connection():
+        connection = types.SimpleNamespace(
+            is_connected=True, in_transaction=False, closed=False
+        )
+        connection.close = lambda: setattr(connection, "closed", True)
+        opened.append(connection)
+        return connection
+
+    monkeypatch.setattr(pool, "new_connection", _new_connection)
+    return opened
+
+
+def test_run_on_worker_connections(connections):
+    barrier = threading.Barrier(2)
+
+    def _ingest(n, connection, cancel):
+        barrier.wait(timeout=5)  # both uploads in flight at once
+        return n, connection
+
+    async def _main():
+        async with aio.AsyncIngestor(workers=2) as ingestor:
+            return await asyncio.gather(
+                ingestor.run(_ingest, n=1), ingestor.run(_ingest, n=2)
+            )
+
+    results = asyncio.run(_main())
+    assert [n for n, _ in results] == [1, 2]
+    assert {id(c) for _, c in results} == {id(c) for c in connections}
+    assert len(connections) == 2 and all(c.closed for c in connections)
+
+
+def test_cancel_between_batches(connections):
+    started, batches = threading.Event(), []
+
+    def _ingest(connection, cancel):
+        while not cancel.is_set():
+            batches.append(len(batches))
+            started.set()
+            cancel.wait(0.01)
+        return "stopped"
+
+    async def _main():
+        async with aio.AsyncIngestor(workers=1) as ingestor:
+            task = asyncio.ensure_future(ingestor.run(_ingest))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # The worker is free again once the cancelled ingest has stopped
+            return await ingestor.run(lambda connection, cancel: cancel.is_set())
+
+    assert asyncio.run(_main()) is False
+    assert batches and connections[0].closed
+
+
+def test_ingest_resolved_on_worker(connections, monkeypatch):
+    import workflow_session
+
+    threads = []
+    ingest = types.ModuleType("workflow_session.ingest")
+
+    def _getattr(name):
+        threads.append(threading.current_thread().name)
+        return lambda connection, cancel, **kwargs: kwargs
+
+    ingest.__getattr__ = _getattr
+    monkeypatch.setitem(sys.modules, "workflow_session.ingest", ingest)
+    monkeypatch.setattr(workflow_session, "ingest", ingest, raising=False)
+
+    async def _main():
+        async with aio.AsyncIngestor(workers=1) as ingestor:
+            return await ingestor.ingest_lab(verbose=False)
+
+    assert asyncio.run(_main()) == {"verbose": False}
+    assert len(threads) == 1 and threads[0].startswith("ingest")
+
+
+def test_ingest_sessions_async(pipeline, ingest_lab, ingest_subjects, sessions_csv):
+    """Overlapping async uploads ingest through the ingestor's own connections"""
+    session = pipeline["session"]
+    _, session_csv_path = sessions_csv
+
+    async def _upload():
+        async with aio.AsyncIngestor(workers=2) as ingestor:
+            await asyncio.gather(
+                *(
+                    ingestor.ingest_sessions(
+                        session_csv_path=session_csv_path, verbose=False
+                    )
+                    for _ in range(2)
+                )
+            )
+
+    asyncio.run(_upload())
+    assert len(session.Session()) == 2
+    assert len(session.SessionExperimenter()) == 2
@@ -0,0 +1,26 @@
+"""Test the process-local TTL/LRU cache
+    1. Assert least recently used entries are evicted at maxsize
+    2. Assert expired entries are dropped
+"""
+
+from workflow_session import cache
+
+
+def test_ttl_cache_eviction(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    lookup = cache.TTLCache(maxsize=2, ttl=10)
+    lookup.set("a", 1)
+    lookup.set("b", 2)
+    assert lookup.get("a") == 1  # "b" is now least recently used
+    lookup.set("c", 3)
+    assert lookup.get("b") is None
+    assert len(lookup) == 2
+
+    now[0] = 11.0
+    assert lookup.get("a") is None
+
+    lookup.set("d", 4)
+    lookup.invalidate(lambda key: key == "d")
+    assert lookup.get("d") is None
@@ -0,0 +1,91 @@
+"""Test parallel NWB export of sessions
+    1. Assert one NWB file is written per session
+    2. Assert a second run resumes without rewriting existing files
+    3. Assert start and end restrict sessions by datetime
+"""
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+    "sessions_csv",
+    "ingest_sessions",
+]
+
+import datetime
+import pathlib
+
+import pynwb
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+    sessions_csv,
+    ingest_sessions,
+)
+
+
+def test_export_sessions_to_nwb(pipeline, ingest_sessions, tmp_path):
+    from workflow_session.export import export_sessions_to_nwb
+
+    written = export_sessions_to_nwb(tmp_path, project="ProjA", processes=2)
+    assert len(written) == 2, f"Check exported files: {written}"
+
+    with pynwb.NWBHDF5IO(written[0], "r") as io:
+        nwbfile = io.read()
+        assert nwbfile.subject.subject_id in ("subject5", "subject6")
+
+    assert export_sessions_to_nwb(tmp_path, project="ProjA", processes=2) == []
+
+
+def test_export_sessions_date_range(pipeline, ingest_sessions, tmp_path):
+    from workflow_session.export import export_sessions_to_nwb
+
+    written = export_sessions_to_nwb(
+        tmp_path,
+        start=datetime.datetime(2018, 7, 3, 20, 32, 28),
+        end=datetime.datetime(2021, 1, 1),
+        processes=1,
+    )
+    assert [pathlib.Path(path).name for path in written] == [
+        "subject5_2018-07-03T20-32-28.nwb"
+    ]
+    with pynwb.NWBHDF5IO(written[0], "r") as io:
+        nwb_subject = io.read().subject
+        assert nwb_subject.species == "['mus musculus']"
+        assert nwb_subject.genotype == "Drd1a-Cre"
@@ -0,0 +1,139 @@
+"""Test genotype encoding and Mendelian checks
+    1. Assert the latest test per subject and sequence is encoded
+    2. Assert expected offspring fractions and inconsistencies per litter
+    3. Assert the colony's tests are checked against parents in one pass
+"""
+
+import numpy as np
+
+from workflow_session.genotypes import (
+    ABSENT,
+    PRESENT,
+    UNTESTED,
+    GenotypeMatrix,
+    check_litters,
+    latest_tests,
+    offspring_present,
+)
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+)
+
+
+def test_genotype_matrix():
+    matrix = GenotypeMatrix.from_tests(
+        [
+            ("s1", "Cre", "t1", "Absent"),
+            ("s1", "Cre", "t2", " positive"),
+            ("s2", "Ai14", "t1", "Present"),
+            ("s2", "Cre", "t1", "unclear"),
+        ]
+    )
+    assert matrix.sequences == ["Ai14", "Cre"]
+    # Numbered IDs compare numerically, not as text
+    assert latest_tests(
+        [("s1", "Cre", "Test10", "Present"), ("s1", "Cre", "Test9", "Absent")]
+    ) == {("s1", "Cre"): "Present"}
+    assert matrix.codes.tolist() == [[UNTESTED, PRESENT], [PRESENT, UNTESTED]]
+    assert matrix.take(matrix.rows(["s2", "s9"])).tolist() == [
+        [PRESENT, UNTESTED],
+        [UNTESTED, UNTESTED],
+    ]
+
+    fractions = offspring_present(
+        np.array([PRESENT, PRESENT, ABSENT, UNTESTED]),
+        np.array([PRESENT, ABSENT, ABSENT, ABSENT]),
+    )
+    assert fractions[:3].tolist() == [0.75, 0.5, 0.0]
+    assert np.isnan(fractions[3])
+
+
+def test_check_litters():
+    matrix = GenotypeMatrix.from_tests(
+        [
+            ("dad", "Cre", "t1", "Absent"),
+            ("mom", "Cre", "t1", "Absent"),
+            ("pup1", "Cre", "t1", "Present"),
+            ("pup2", "Cre", "t1", "Absent"),
+            ("dad2", "Cre", "t1", "Present"),
+            ("pup3", "Cre", "t1", "Present"),
+        ]
+    )
+    parentage = [
+        ("pup1", "L", "bp1", "dad", "mom"),
+        ("pup2", "L", "bp1", "dad", "mom"),
+        ("pup3", "L", "bp2", "dad2", "mom"),
+    ]
+    expectations, errors = check_litters(matrix, parentage)
+    assert errors == [
+        dict(
+            subject="pup1",
+            sequence="Cre",
+            father="dad",
+            mother="mom",
+            error="present, but absent in both parents",
+        )
+    ]
+    by_pair = {row["breeding_pair"]: row for row in expectations}
+    assert by_pair["bp1"]["expected_present"] == 0.0
+    assert (by_pair["bp1"]["pups_tested"], by_pair["bp1"]["pups_present"]) == (2, 1)
+    assert by_pair["bp2"]["expected_present"] == 0.5
+    assert by_pair["bp2"]["father_result"] == "Present"
+
+
+def test_check_colony_litters(pipeline, ingest_subjects):
+    """Genotype tests of the colony are checked against parents in one pass"""
+    from workflow_session.genotypes import fetch_parentage
+
+    genotyping = pipeline["genotyping"]
+    matrix = GenotypeMatrix.fetch()
+    subjects, sequences = genotyping.GenotypeTest.fetch("subject", "sequence")
+    assert matrix.codes.shape == (len(set(subjects)), len(set(sequences)))
+    parentage = fetch_parentage()
+    assert len(parentage) == len(genotyping.SubjectLitter())
+    expectations, errors = check_litters(matrix, parentage)
+    assert all(row["pups_tested"] > 0 for row in expectations)
+    assert all(error["subject"] in matrix.subjects for error in errors)
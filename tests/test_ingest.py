@@ -3,8 +3,9 @@
     2. Assert exact matches of inserted data for key tables
 """
 
+import pytest
+
 __all__ = [
-    "dj_config",
     "pipeline",
     "lab_csv",
     "lab_project_csv",
@@ -30,7 +31,6 @@ __all__ = [
 ]
 
 from . import (
-    dj_config,
     pipeline,
     lab_csv,
     lab_project_csv,
@@ -53,6 +53,7 @@ from . import (
     ingest_subjects,
     sessions_csv,
     ingest_sessions,
+    user_data,
 )
 
 
@@ -193,3 +194,184 @@ def test_ingest_sessions(pipeline, sessions_csv, ingest_sessions):
             & {"subject": sess[0]}
             & {"session_datetime": sess[2]}
         ).fetch1("session_dir") == sess[3]
+
+
+def test_ingest_sessions_chunked(pipeline, ingest_lab, ingest_subjects, sessions_csv):
+    """Streamed ingest in single-row chunks matches the default path"""
+    from workflow_session.ingest import ingest_sessions
+
+    session = pipeline["session"]
+    _, session_csv_path = sessions_csv
+    ingest_sessions(session_csv_path=session_csv_path, verbose=False, chunk_size=1)
+
+    assert len(session.Session()) == 2, f"Check Session: len={len(session.Session())}"
+    assert len(session.SessionDirectory()) == 2
+    assert len(session.SessionExperimenter()) == 2
+
+
+def test_ingest_lab_parallel(
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_user_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+):
+    """Dependency-ordered concurrent ingest populates the same lab tables"""
+    from workflow_session.ingest import ingest_lab
+
+    lab = pipeline["lab"]
+    ingest_lab(
+        lab_csv_path=lab_csv[1],
+        project_csv_path=lab_project_csv[1],
+        publication_csv_path=lab_publications_csv[1],
+        keyword_csv_path=lab_keywords_csv[1],
+        protocol_csv_path=lab_protocol_csv[1],
+        users_csv_path=lab_user_csv[1],
+        project_user_csv_path=lab_project_users_csv[1],
+        sources_csv_path=lab_source_csv[1],
+        verbose=False,
+        workers=4,
+    )
+    assert len(lab.Lab()) == 2, f"Check Lab: len={len(lab.Lab())}"
+    assert len(lab.User()) == 5, f"Check User: len={len(lab.User())}"
+    assert len(lab.ProjectUser()) == 5
+    assert len(lab.Protocol()) == 2
+
+
+def test_ingest_lab_prefilter_keys(pipeline, lab_csv, ingest_lab):
+    """Prefiltering drops existing keys only when duplicates are to be skipped"""
+    import datajoint as dj
+
+    from workflow_session.ingest import ingest_csv_to_table
+
+    lab = pipeline["lab"]
+    _, lab_csv_path = lab_csv
+    ingest_csv_to_table([lab_csv_path], [lab.Lab()], verbose=False, prefilter_keys=True)
+    assert len(lab.Lab()) == 2
+    with pytest.raises(dj.errors.DuplicateError):
+        ingest_csv_to_table(
+            [lab_csv_path],
+            [lab.Lab()],
+            skip_duplicates=False,
+            verbose=False,
+            prefilter_keys=True,
+        )
+
+
+def test_ingest_sessions_bulk(pipeline, ingest_lab, ingest_subjects, sessions_csv):
+    """Bulk ingest commits all session tables in one transaction"""
+    from workflow_session.ingest import ingest_sessions
+
+    session = pipeline["session"]
+    _, session_csv_path = sessions_csv
+    ingest_sessions(session_csv_path=session_csv_path, verbose=False, bulk=True)
+
+    assert len(session.Session()) == 2, f"Check Session: len={len(session.Session())}"
+    assert len(session.SessionNote()) == 2
+    assert len(session.ProjectSession()) == 2
+
+
+def test_ingest_sessions_report(pipeline, ingest_lab, ingest_subjects, sessions_csv):
+    """The report has one record per session table with consistent counts"""
+    from workflow_session.ingest import ingest_sessions
+    from workflow_session.report import IngestReport
+
+    _, session_csv_path = sessions_csv
+    report = IngestReport()
+    ingest_sessions(session_csv_path=session_csv_path, verbose=False, report=report)
+
+    records = report.as_dict()["tables"]
+    assert len(records) == 5
+    for record in records:
+        assert record["rows_read"] == record["rows_sent"] == 2
+        assert record["rows_inserted"] == 2
+        assert record["batches"] == 1 and record["bytes"] > 0
+
+
+def test_ingest_sessions_validate(pipeline, ingest_lab, ingest_subjects, sessions_csv):
+    """Validation skips the session_dir mixing path separators, and reports it"""
+    from workflow_session.ingest import ingest_sessions
+    from workflow_session.report import IngestReport
+
+    session = pipeline["session"]
+    _, session_csv_path = sessions_csv
+    report = IngestReport()
+    ingest_sessions(
+        session_csv_path=session_csv_path, verbose=False, report=report, validate=True
+    )
+
+    assert len(session.Session()) == 2
+    assert len(session.SessionDirectory()) == 1
+    assert [(e["row"], e["column"]) for e in report.errors] == [(1, "session_dir")]
+
+
+def test_ingest_subjects_check_references(pipeline, ingest_lab, ingest_subjects):
+    """Orphaned caging rows are skipped and reported before any insert"""
+    from workflow_session.ingest import ingest_csv_to_table
+    from workflow_session.report import IngestReport
+
+    genotyping = pipeline["genotyping"]
+    cage_csv_path = user_data / "subject" / "orphan_cage.csv"
+    cage_csv_path.write_text(
+        "cage,subject,caging_datetime,user\n"
+        + "1,subject5,2021-01-02,User1\n"
+        + "1,subject99,2021-01-02,User1\n"
+    )
+    report = IngestReport()
+    try:
+        ingest_csv_to_table(
+            [cage_csv_path],
+            [genotyping.SubjectCaging()],
+            verbose=False,
+            report=report,
+            check_references=True,
+        )
+    finally:
+        cage_csv_path.unlink()
+
+    assert len(genotyping.SubjectCaging & {"subject": "subject5"}) == 2
+    assert [(e["row"], e["value"]) for e in report.errors] == [(2, "subject99")]
+
+
+def test_ingest_sessions_parquet(pipeline, ingest_lab, ingest_subjects, sessions_csv):
+    """Sessions ingest from a Parquet file with typed datetimes"""
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.csv
+    import pyarrow.parquet
+
+    from workflow_session.ingest import ingest_sessions
+
+    session = pipeline["session"]
+    _, session_csv_path = sessions_csv
+    parquet_path = session_csv_path.with_suffix(".parquet")
+    pyarrow.parquet.write_table(pyarrow.csv.read_csv(session_csv_path), parquet_path)
+    try:
+        ingest_sessions(session_csv_path=parquet_path, verbose=False)
+    finally:
+        parquet_path.unlink()
+
+    assert len(session.Session()) == 2
+    assert len(session.SessionExperimenter()) == 2
+
+
+def test_ingest_sessions_load_data(
+    pipeline, ingest_lab, ingest_subjects, sessions_csv, monkeypatch
+):
+    """LOAD DATA (or its fallback) ingests the rows a plain insert would, without
+    validating them"""
+    from workflow_session import ingest
+
+    monkeypatch.setattr(ingest, "LOAD_DATA_MIN_ROWS", 1)
+    session = pipeline["session"]
+    _, session_csv_path = sessions_csv
+    ingest.ingest_sessions(
+        session_csv_path=session_csv_path, verbose=False, load_data=True
+    )
+
+    assert len(session.Session()) == 2
+    assert len(session.SessionNote()) == 2
+    assert len(session.SessionDirectory()) == 2  # mixed path separators kept
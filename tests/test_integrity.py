@@ -0,0 +1,178 @@
+"""Test the client-side referential-integrity precheck
+    1. Assert rows referencing absent parent keys are flagged, in bulk
+    2. Assert keys added during ingest, case variants and blanks are accepted
+    3. Assert parent keys are fetched through the given connection
+    4. Assert orphans are skipped when workers insert on pooled connections
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from workflow_session import integrity
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+    user_data,
+)
+
+
+class _Table:
+    """Minimal stand-in for a table and its foreign keys"""
+
+    def __init__(self, name, primary_key, types, parents=(), keys=()):
+        self.full_table_name = name
+        self.primary_key = primary_key
+        self.heading = SimpleNamespace(
+            attributes={n: SimpleNamespace(type=t) for n, t in types.items()}
+        )
+        self.connection = None
+        self._parents = parents
+        self._keys = keys
+
+    def parents(self, as_objects=False, foreign_key_info=False):
+        return self._parents
+
+    def fetch(self, *attrs):
+        columns = [np.array(column, dtype=object) for column in zip(*self._keys)]
+        return columns[0] if len(attrs) == 1 else tuple(columns)
+
+
+def test_reference_index(monkeypatch):
+    subject = _Table(
+        "`subject`.`subject`",
+        ["subject"],
+        {"subject": "varchar(8)"},
+        keys=[("subject5",), ("subject6",)],
+    )
+    monkeypatch.setattr(integrity.dj, "FreeTable", lambda conn, name: subject)
+    caging = _Table(
+        "`genotyping`.`subject_caging`",
+        ["subject", "caging_datetime"],
+        {"subject": "varchar(8)", "caging_datetime": "datetime"},
+        parents=[(subject, {"attr_map": {"subject": "subject"}})],
+    )
+    father = _Table(
+        "`genotyping`.`breeding_pair__father`",
+        ["breeding_pair"],
+        {"breeding_pair": "varchar(32)", "father": "varchar(8)"},
+        parents=[(subject, {"attr_map": {"father": "subject"}})],
+    )
+    references = integrity.ReferenceIndex()
+
+    rows = [
+        {"subject": "Subject5", "caging_datetime": "2020-01-02"},
+        {"subject": "subject7", "caging_datetime": "2020-01-02"},
+        {"subject": "", "caging_datetime": "2020-01-02"},
+    ]
+    valid, errors = references.check(caging, rows, "cage.csv", row_offset=2)
+    assert valid.tolist() == [True, False, True]
+    assert errors == [
+        dict(
+            csv="cage.csv",
+            table="`genotyping`.`subject_caging`",
+            row=4,
+            column="subject",
+            value="subject7",
+            error="not in `subject`.`subject`",
+        )
+    ]
+
+    references.add(subject, [{"subject": "subject7"}])
+    rows = [{"breeding_pair": "BP1", "father": "subject7"}]
+    assert references.check(father, rows)[0].tolist() == [True]
+
+
+def test_parent_keys_connection(monkeypatch):
+    subject = _Table(
+        "`subject`.`subject`",
+        ["subject"],
+        {"subject": "varchar(8)"},
+        keys=[("subject5",)],
+    )
+    connections = []
+    monkeypatch.setattr(
+        integrity.dj,
+        "FreeTable",
+        lambda conn, name: connections.append(conn) or subject,
+    )
+    caging = _Table(
+        "`genotyping`.`subject_caging`",
+        ["subject", "caging_datetime"],
+        {"subject": "varchar(8)", "caging_datetime": "datetime"},
+        parents=[(subject, {"attr_map": {"subject": "subject"}})],
+    )
+    rows = [{"subject": "subject5", "caging_datetime": "2020-01-02"}]
+    valid, _ = integrity.ReferenceIndex().check(caging, rows, connection="pooled")
+    assert valid.tolist() == [True] and connections == ["pooled"]
+
+
+def test_check_references_workers(pipeline, ingest_lab, ingest_subjects):
+    """Workers on pooled connections still skip orphaned rows"""
+    from workflow_session.ingest import ingest_csv_to_table
+    from workflow_session.report import IngestReport
+
+    genotyping = pipeline["genotyping"]
+    cage_csv_path = user_data / "subject" / "orphan_cage_workers.csv"
+    cage_csv_path.write_text(
+        "cage,subject,caging_datetime,user\n"
+        + "1,subject5,2021-02-02,User1\n"
+        + "1,subject99,2021-02-02,User1\n"
+    )
+    report = IngestReport()
+    try:
+        ingest_csv_to_table(
+            [cage_csv_path],
+            [genotyping.SubjectCaging()],
+            verbose=False,
+            report=report,
+            check_references=True,
+            workers=2,
+        )
+    finally:
+        cage_csv_path.unlink()
+
+    assert len(genotyping.SubjectCaging & {"subject": "subject5"}) == 2
+    assert [(e["row"], e["value"]) for e in report.errors] == [(2, "subject99")]
@@ -0,0 +1,74 @@
+"""Test client-side primary key handling
+    1. Assert CSV strings are coerced to fetched types
+    2. Assert rows with existing or repeated keys are dropped
+    3. Assert row digests match the text the table digest query hashes
+"""
+
+import datetime
+import decimal
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+
+from workflow_session.keys import (
+    ExistingKeys,
+    coerce_value,
+    row_digest,
+    table_digest,
+)
+
+
+class _Table:
+    """Minimal stand-in for a table keyed on (subject, caging_datetime)"""
+
+    full_table_name = "`genotyping`.`subject_caging`"
+    primary_key = ["subject", "caging_datetime"]
+    heading = SimpleNamespace(
+        attributes={
+            "subject": SimpleNamespace(type="varchar(8)"),
+            "caging_datetime": SimpleNamespace(type="datetime"),
+        }
+    )
+
+    def fetch(self, *attrs):
+        return (
+            np.array(["subject5"], dtype=object),
+            np.array([datetime.datetime(2020, 1, 2)], dtype=object),
+        )
+
+
+def test_coerce_value():
+    assert coerce_value(SimpleNamespace(type="int unsigned"), "7") == 7
+    assert coerce_value(SimpleNamespace(type="date"), "2020-01-02") == datetime.date(
+        2020, 1, 2
+    )
+    assert coerce_value(SimpleNamespace(type="varchar(32)"), "LabA") == "LabA"
+
+
+def test_existing_keys_new_rows():
+    rows = [
+        {"subject": "subject5", "caging_datetime": "2020-01-02"},
+        {"subject": "subject6", "caging_datetime": "2020-01-02"},
+        {"subject": "subject6", "caging_datetime": "2020-01-02 00:00:00"},
+        {"subject": "subject7", "caging_datetime": "not a date"},
+    ]
+    assert ExistingKeys().new_rows(_Table(), rows) == [rows[1], rows[3]]
+
+
+def test_table_digest():
+    queries = []
+
+    def _query(sql, args=()):
+        queries.append((sql, args))
+        return SimpleNamespace(fetchone=lambda: (1, decimal.Decimal(digest)))
+
+    digest = zlib.crc32(b"subject5|2020-01-02 03:04:05.000006")
+    assert row_digest(["subject5", datetime.datetime(2020, 1, 2, 3, 4, 5, 6)]) == digest
+
+    table = _Table()
+    table.connection = SimpleNamespace(query=_query)
+    assert table_digest(table, "subject", "caging_datetime") == (1, digest)
+    ((sql, args),) = queries
+    assert "CONCAT_WS('|', `subject`, DATE_FORMAT(`caging_datetime`, %s))" in sql
+    assert args == ["%Y-%m-%d %H:%i:%s.%f"]
@@ -0,0 +1,128 @@
+"""Test the LOAD DATA LOCAL INFILE fast path without a database
+    1. Assert rows are staged as escaped tab-separated lines with NULLs
+    2. Assert rows needing column defaults are not staged
+    3. Assert refused local infile raises, and a short or coerced load is rolled
+       back
+    4. Assert local infile is enabled on a connection of its own
+"""
+
+import datetime
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+
+from workflow_session import loader, pool
+
+
+class _Connection:
+    """Records queries and the staged file; loads `loaded` rows, default all,
+    with `warnings` warnings"""
+
+    def __init__(self, error=None, loaded=None, warnings=0):
+        self.error = error
+        self.loaded = loaded
+        self.warnings = warnings
+        self.staged = None
+        self.sql = None
+        self.queries = []
+        self.in_transaction = False
+
+    def start_transaction(self):
+        self.in_transaction = True
+        self.queries.append("START")
+
+    def commit_transaction(self):
+        self.in_transaction = False
+        self.queries.append("COMMIT")
+
+    def cancel_transaction(self):
+        self.in_transaction = False
+        self.queries.append("ROLLBACK")
+
+    def query(self, sql, args=()):
+        self.queries.append(sql.split()[0] if sql.startswith("LOAD") else sql)
+        if sql == "SELECT ROW_COUNT(), @@warning_count":
+            staged = len(self.staged.splitlines())
+            count = staged if self.loaded is None else self.loaded
+            return SimpleNamespace(fetchone=lambda: (count, self.warnings))
+        if sql.startswith("SHOW WARNINGS"):
+            return SimpleNamespace(
+                fetchall=lambda: [("Warning", 1452, "foreign key fails")]
+            )
+        if sql.startswith("LOAD"):
+            if self.error is not None:
+                raise self.error
+            self.sql = sql
+            self.staged = pathlib.Path(args[0]).read_text()
+
+
+def _table(connection):
+    attributes = dict(
+        subject=SimpleNamespace(type="varchar(8)", numeric=False, nullable=False),
+        session_datetime=SimpleNamespace(
+            type="datetime", numeric=False, nullable=False
+        ),
+        num_of_pups=SimpleNamespace(type="int", numeric=True, nullable=False),
+        session_note=SimpleNamespace(type="varchar(8)", numeric=False, nullable=True),
+    )
+    return SimpleNamespace(
+        full_table_name="`session`.`session`",
+        primary_key=["subject", "session_datetime"],
+        heading=SimpleNamespace(names=list(attributes), attributes=attributes),
+        connection=connection,
+    )
+
+
+def test_load_rows():
+    connection = _Connection()
+    start = datetime.datetime(2018, 7, 3, 20, 32, 28)
+    rows = [
+        dict(subject="s5", session_datetime=start, num_of_pups=2, session_note="a\tb"),
+        dict(subject="s6", session_datetime=start, num_of_pups=1, session_note=None),
+        dict(subject="s7", session_datetime=start, num_of_pups="", session_note=""),
+    ]
+    remaining = loader.load_rows(_table(connection), rows)
+
+    assert remaining == rows[2:3]
+    assert connection.staged == (
+        "s5\t2018-07-03 20:32:28\t2\ta\\tb\n" + "s6\t2018-07-03 20:32:28\t1\t\\N\n"
+    )
+    assert "IGNORE INTO TABLE `session`.`session`" in connection.sql
+    assert connection.sql.endswith(
+        "(`subject`,`session_datetime`,`num_of_pups`,`session_note`)"
+    )
+    assert connection.queries[0] == "START" and connection.queries[-1] == "COMMIT"
+
+
+def test_load_rows_errors():
+    rows = [dict(subject="s5", session_datetime="2018-07-03", num_of_pups=2)]
+    refused = _Connection(error=RuntimeError(1148, "not allowed"))
+    with pytest.raises(loader.LocalInfileUnavailable):
+        loader.load_rows(_table(refused), rows)
+    assert refused.queries[-1] == "ROLLBACK"
+
+    # A row skipped by the server, e.g. orphaned, sends all rows to INSERT
+    short = _Connection(loaded=0)
+    assert loader.load_rows(_table(short), rows) == rows
+    assert "ROLLBACK TO SAVEPOINT load_rows" in short.queries
+    assert short.queries[-1] == "COMMIT"
+
+    # So does a value the server coerced, which INSERT would reject
+    coerced = _Connection(warnings=1)
+    assert loader.load_rows(_table(coerced), rows) == rows
+    assert "ROLLBACK TO SAVEPOINT load_rows" in coerced.queries
+
+
+def test_local_infile_connection(monkeypatch):
+    class _Opened:
+        def __init__(self):
+            self.conn_info, self.connects = {}, 1
+
+        def connect(self):
+            self.connects += 1
+
+    monkeypatch.setattr(pool, "new_connection", _Opened)
+    connection = loader.local_infile_connection()
+    assert loader.allows_local_infile(connection) and connection.connects == 2
+    assert not loader.allows_local_infile(_Opened())
@@ -0,0 +1,115 @@
+"""Test the read-through cache for lookup tables
+    1. Assert repeated reads of a lookup table are served from the cache
+    2. Assert inserts and cascading deletes invalidate affected entries
+    3. Assert the workflow's own inserts refresh cached lookup reads
+"""
+
+import numpy as np
+import pytest
+
+from workflow_session import lookup
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    write_csv,
+)
+
+
+class _Table:
+    """Minimal stand-in for a (restricted) table, counting fetches"""
+
+    def __init__(self, name, rows, descendants=()):
+        self.full_table_name = name
+        self.primary_key = ["strain_name"]
+        self.rows = rows
+        self.fetches = 0
+        self._descendants = list(descendants)
+
+    def make_sql(self):
+        return f"SELECT * FROM {self.full_table_name}"
+
+    def fetch(self, *attrs, as_dict=False):
+        self.fetches += 1
+        if as_dict:
+            return [dict(row) for row in self.rows]
+        return np.array([row["strain_name"] for row in self.rows], dtype=object)
+
+    def descendants(self):
+        return [self.full_table_name, *self._descendants]
+
+    def delete(self, **kwargs):
+        self.rows = []
+        return 0
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    lookup.lookup_cache.invalidate()
+    yield
+    lookup.lookup_cache.invalidate()
+
+
+def test_fetch_lookup_reads_through():
+    strain = _Table("`subject`.`#strain`", [{"strain_name": "C57BL/6"}])
+    rows = lookup.fetch_lookup(strain)
+    rows[0]["strain_name"] = "modified"
+    assert lookup.fetch_lookup(strain) == [{"strain_name": "C57BL/6"}]
+    assert lookup.fetch_lookup_keys(strain) == {("C57BL/6",)}
+    assert lookup.fetch_lookup_keys(strain) == {("C57BL/6",)}
+    assert strain.fetches == 2  # once for rows, once for keys
+
+    strain.rows.append({"strain_name": "BALB/c"})
+    lookup.invalidate_lookups(strain)
+    assert len(lookup.fetch_lookup(strain)) == 2
+
+
+def test_delete_invalidates_descendants():
+    assert lookup.is_lookup("`lab`.`#source`")
+    assert not lookup.is_lookup("`subject`.`subject`")
+
+    source = _Table(
+        "`lab`.`#source`", [{"strain_name": "Jax"}], ["`subject`.`#allele__source`"]
+    )
+    allele_source = _Table("`subject`.`#allele__source`", [{"strain_name": "Jax"}])
+    lookup.fetch_lookup(allele_source)
+    lookup.delete(source)
+    allele_source.rows = []
+    assert lookup.fetch_lookup(allele_source) == []
+    assert allele_source.fetches == 2
+
+
+def test_fetch_lookup(pipeline, ingest_lab, tmp_path):
+    """Lookup reads are cached and refreshed by the workflow's own inserts"""
+    from workflow_session.ingest import ingest_csv_to_table
+
+    lab = pipeline["lab"]
+    roles = lookup.fetch_lookup(lab.UserRole())
+    assert len(roles) == len(lab.UserRole())
+    assert lookup.fetch_lookup(lab.UserRole()) == roles
+
+    roles_csv_path = tmp_path / "roles.csv"
+    write_csv(["user_role", "Curator"], roles_csv_path)
+    ingest_csv_to_table([roles_csv_path], [lab.UserRole()], verbose=False)
+    assert len(lookup.fetch_lookup(lab.UserRole())) == len(roles) + 1
@@ -0,0 +1,56 @@
+"""Test the incremental ingest manifest
+    1. Assert unchanged files are detected after a recorded ingest
+    2. Assert only new or changed rows pass the filter
+    3. Assert rows skipped by validation are retried while the file is unchanged
+"""
+
+import pathlib
+from types import SimpleNamespace
+
+from workflow_session.manifest import IngestManifest
+
+
+def test_manifest_round_trip(tmp_path):
+    tmp_path = pathlib.Path(tmp_path)
+    csv_path = tmp_path / "subjects.csv"
+    csv_path.write_text("subject,sex\nsubject5,F\n")
+    manifest_path = tmp_path / "manifest.json"
+    table = SimpleNamespace(full_table_name="`subject`.`subject`")
+    rows = [{"subject": "subject5", "sex": "F"}]
+
+    manifest = IngestManifest(manifest_path)
+    assert not manifest.unchanged(csv_path, table)
+    assert manifest.filter_rows(csv_path, table, rows) == rows
+    manifest.mark_done(csv_path, table)
+    manifest.save()
+
+    manifest = IngestManifest(manifest_path)
+    assert manifest.unchanged(csv_path, table)
+
+    csv_path.write_text("subject,sex\nsubject5,F\nsubject6,M\n")
+    manifest = IngestManifest(manifest_path)
+    assert not manifest.unchanged(csv_path, table)
+    new_rows = rows + [{"subject": "subject6", "sex": "M"}]
+    assert manifest.filter_rows(csv_path, table, new_rows) == new_rows[1:]
+
+
+def test_manifest_skipped_rows(tmp_path):
+    tmp_path = pathlib.Path(tmp_path)
+    csv_path = tmp_path / "cage.csv"
+    csv_path.write_text("cage,subject\n1,subject5\n1,subject99\n")
+    manifest_path = tmp_path / "manifest.json"
+    table = SimpleNamespace(full_table_name="`genotyping`.`subject_caging`")
+    rows = [{"cage": "1", "subject": "subject5"}, {"cage": "1", "subject": "subject99"}]
+
+    # The orphaned subject99 row is dropped before reaching the manifest
+    manifest = IngestManifest(manifest_path)
+    assert manifest.filter_rows(csv_path, table, rows[:1]) == rows[:1]
+    manifest.mark_done(csv_path, table, skipped=1)
+    manifest.save()
+
+    manifest = IngestManifest(manifest_path)
+    assert not manifest.unchanged(csv_path, table)
+    assert manifest.filter_rows(csv_path, table, rows) == rows[1:]
+    manifest.mark_done(csv_path, table)
+    manifest.save()
+    assert IngestManifest(manifest_path).unchanged(csv_path, table)
@@ -0,0 +1,77 @@
+"""Test rebuilding the dependency graph from metadata snapshots
+    1. Assert the graph waits until every loaded schema has a snapshot
+    2. Assert aliased foreign keys are restored through alias nodes
+    3. Assert snapshots are skipped on an untested DataJoint release
+    4. Assert unreadable snapshots are ignored and concurrent writes do not clash
+"""
+
+import pathlib
+import pickle
+from types import SimpleNamespace
+
+import datajoint as dj
+from datajoint.dependencies import Dependencies
+
+from workflow_session import metadata_cache
+
+
+def test_restore_dependencies(monkeypatch):
+    subject, pair = "`subject`.`subject`", "`genotyping`.`breeding_pair__father`"
+    monkeypatch.setattr(
+        metadata_cache,
+        "_snapshots",
+        {
+            "subject": dict(nodes={subject: {"subject"}}, edges=[]),
+        },
+    )
+    connection = SimpleNamespace(
+        schemas={"subject": None, "genotyping": None},
+        dependencies=Dependencies(),
+    )
+    metadata_cache._restore_dependencies(connection)
+    assert not connection.dependencies._loaded
+
+    father = dict(primary=True, attr_map={"father": "subject"}, aliased=True)
+    metadata_cache._snapshots["genotyping"] = dict(
+        nodes={pair: {"breeding_pair", "father"}},
+        edges=[(subject, pair, father), (subject, pair, father)],
+    )
+    metadata_cache._restore_dependencies(connection)
+    dependencies = connection.dependencies
+    assert dependencies._loaded
+    (alias,) = [node for node in dependencies if node.isdigit()]
+    assert list(dependencies.successors(subject)) == [alias]
+    assert list(dependencies.successors(alias)) == [pair]
+
+
+def test_apply_snapshot_version_guard(tmp_path, monkeypatch):
+    assert metadata_cache._supported(dj.__version__)
+    monkeypatch.setattr(dj, "__version__", "0.15.0")
+    monkeypatch.setattr(metadata_cache, "_snapshots", {})
+
+    # Returns before touching the module or the connection
+    metadata_cache.apply_snapshot(SimpleNamespace(), tmp_path)
+    assert metadata_cache._snapshots == {}
+    assert not list(pathlib.Path(tmp_path).iterdir())
+
+
+def test_read_write_snapshot(tmp_path, monkeypatch):
+    cache_dir = pathlib.Path(tmp_path)
+    path = cache_dir / "subject.1_2-3_4.pkl"
+    assert metadata_cache._read_snapshot(path) is None
+
+    path.write_bytes(pickle.dumps({"headings": {}})[:-3])  # truncated
+    assert metadata_cache._read_snapshot(path) is None
+    path.write_bytes(pickle.dumps(["foreign"]))
+    assert metadata_cache._read_snapshot(path) is None
+
+    # Another process removes the stale snapshot between listing and unlinking,
+    # and a second writer replaces the first one's file
+    stale = cache_dir / "subject.0_0-0_0.pkl"
+    monkeypatch.setattr(pathlib.Path, "glob", lambda self, pattern: iter([stale]))
+    snapshot = dict(headings={}, nodes={}, edges=[])
+    metadata_cache._write_snapshot(cache_dir, "subject", path, pickle.dumps(snapshot))
+    metadata_cache._write_snapshot(cache_dir, "subject", path, pickle.dumps(snapshot))
+    assert not stale.exists()
+    assert metadata_cache._read_snapshot(path) == snapshot
+    assert sorted(p.name for p in cache_dir.iterdir()) == [path.name]
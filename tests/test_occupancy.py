@@ -0,0 +1,138 @@
+"""Test the cage occupancy index
+    1. Assert point-in-time and range occupancy, and each subject's cage
+    2. Assert cage density over time, including deaths
+    3. Assert new cagings end the stays they follow
+    4. Assert cagings load from SubjectCaging, following updates
+"""
+
+import numpy as np
+import pytest
+
+from workflow_session.occupancy import OccupancyIndex
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+)
+
+
+@pytest.fixture
+def index():
+    """s1 in cage1 from day 1, moved to cage2 on day 5; s2 in cage1 from day 2,
+    dead on day 4; s3 in cage2 from day 3."""
+    index = OccupancyIndex()
+    index.add_cagings(
+        [
+            ("s1", "2021-01-05 09:00", "cage2"),
+            ("s1", "2021-01-01 09:00", "cage1"),
+            ("s2", "2021-01-02 09:00", "cage1"),
+            ("s3", "2021-01-03 09:00", "cage2"),
+        ]
+    )
+    index.add_deaths([("s2", "2021-01-04")])
+    return index
+
+
+def test_occupants(index):
+    assert index.cages == ["cage1", "cage2"]
+    assert index.occupants("cage1", "2021-01-01 08:59") == []
+    assert index.occupants("cage1", "2021-01-01 09:00") == ["s1"]
+    assert index.occupants("cage1", "2021-01-03") == ["s1", "s2"]
+    assert index.occupants("cage1", "2021-01-04") == ["s1"]
+    assert index.occupants("cage1", "2021-01-05 09:00") == []
+    assert index.occupants("cage2", "2021-01-05 09:00") == ["s1", "s3"]
+    assert index.occupants_between("cage1", "2021-01-04", "2021-01-06") == ["s1"]
+    assert index.occupants_between("cage1", "2020-12-01", "2021-01-02 09:00") == ["s1"]
+    assert index.occupants("cage3", "2021-01-03") == []
+    assert index.cage_of("s1", "2021-01-05 08:59") == "cage1"
+    assert index.cage_of("s1", "2030-01-01") == "cage2"
+    assert index.cage_of("s2", "2021-01-04") is None
+    assert index.cage_of("s3", "2021-01-01") is None
+
+
+def test_density(index):
+    cages, counts = index.density(
+        np.arange("2021-01-01", "2021-01-07", dtype="datetime64[D]")
+    )
+    assert cages == ["cage1", "cage2"]
+    assert counts.tolist() == [[0, 1, 2, 1, 1, 0], [0, 0, 0, 1, 1, 2]]
+    _, counts = index.density(["2021-01-06"], cages=["cage2"])
+    assert counts.tolist() == [[2]]
+
+
+def test_incremental_cagings(index):
+    assert index.occupants("cage2", "2021-01-10") == ["s1", "s3"]
+    index.add_cagings([("s3", "2021-01-08 09:00", "cage3")])
+    assert index.occupants("cage2", "2021-01-10") == ["s1"]
+    assert index.occupants("cage3", "2021-01-10") == ["s3"]
+    assert index.occupants("cage2", "2021-01-07") == ["s1", "s3"]
+    index.add_deaths([("s1", "2021-01-09")])
+    assert index.occupants("cage2", "2021-01-10") == []
+
+
+def test_occupancy_refresh(pipeline, ingest_subjects):
+    """The occupancy index loads cagings and answers point-in-time queries"""
+    genotyping = pipeline["genotyping"]
+    index = OccupancyIndex()
+    assert index.refresh() == len(genotyping.SubjectCaging())
+    subject, cage = (genotyping.SubjectCaging & "subject='subject6'").fetch1(
+        "subject", "cage"
+    )
+    assert index.cage_of(subject, "2020-01-03") == cage
+    assert subject in index.occupants(cage, "2020-01-03")
+    assert index.occupants(cage, "2020-01-01") == []
+    _, counts = index.density(["2020-01-01", "2020-01-03"], cages=[cage])
+    assert counts[0, 0] == 0 and counts[0, 1] >= 1
+    assert index.refresh() == len(genotyping.SubjectCaging())  # nothing new
+
+    # Moving a caging to another cage keeps the row count
+    caging = (genotyping.SubjectCaging & "subject='subject6'").fetch1()
+    other = next(c for c in index.cages if c != cage)
+    genotyping.SubjectCaging.update1(dict(caging, cage=other))
+    try:
+        index.refresh()
+        assert index.cage_of(subject, "2020-01-03") == other
+        assert subject not in index.occupants(cage, "2020-01-03")
+    finally:
+        genotyping.SubjectCaging.update1(caging)
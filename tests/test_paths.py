@@ -0,0 +1,75 @@
+"""Test session directory lookups
+    1. Assert batched lookups resolve every session, caching only on request
+"""
+
+from workflow_session import paths
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+    "sessions_csv",
+    "ingest_sessions",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+    sessions_csv,
+    ingest_sessions,
+)
+
+
+def test_get_session_directories(pipeline, sessions_csv, ingest_sessions):
+    """Batched lookup resolves every session in one call, caching only on request"""
+    session = pipeline["session"]
+    paths.invalidate_session_directories()
+    keys = session.Session.fetch("KEY")
+    directories = paths.get_session_directories(keys)
+    assert len(directories) == 2
+    assert len(paths.session_directory_cache) == 0
+
+    assert paths.get_session_directories(keys, use_cache=True) == directories
+    assert len(paths.session_directory_cache) == 2
+    paths.invalidate_session_directories(session.SessionDirectory)
+    assert len(paths.session_directory_cache) == 0
+
+    for key in keys:
+        assert paths.get_session_directory(key) == (
+            session.SessionDirectory & key
+        ).fetch1("session_dir")
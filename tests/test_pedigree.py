@@ -0,0 +1,144 @@
+"""Test the in-memory pedigree engine
+    1. Assert ancestors, descendants and common ancestors across generations
+    2. Assert inbreeding coefficients of sib, half-sib and backcross matings
+    3. Assert a subject recorded as its own ancestor is reported
+    4. Assert parentage loads from breeding pairs and litters, following updates
+"""
+
+import pytest
+
+from workflow_session.pedigree import Pedigree
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+)
+
+
+@pytest.fixture
+def pedigree():
+    """Founders f1 x m1 -> a, b (full sibs); a x b -> c; m1 x c -> d (backcross);
+    f2 x m1 -> e (half sib of a); a x e -> g. Litters added before their pairs."""
+    pedigree = Pedigree()
+    pedigree.add_litters(
+        [
+            ("a", "L", "bp1"),
+            ("b", "L", "bp1"),
+            ("c", "L", "bp2"),
+            ("d", "L", "bp3"),
+            ("e", "L", "bp4"),
+            ("g", "L", "bp5"),
+        ]
+    )
+    pedigree.add_pairs(
+        [("L", "bp1", "m1"), ("L", "bp2", "a"), ("L", "bp3", "m1")]
+        + [("L", "bp4", "m1"), ("L", "bp5", "a")],
+        [("L", "bp1", "f1"), ("L", "bp2", "b"), ("L", "bp3", "c")]
+        + [("L", "bp4", "f2"), ("L", "bp5", "e")],
+    )
+    return pedigree
+
+
+def test_lineage(pedigree):
+    assert pedigree.parents("c") == ("a", "b")
+    assert pedigree.parents("m1") == (None, None)
+    assert pedigree.ancestors(["d"]) == {"m1", "f1", "a", "b", "c"}
+    assert pedigree.ancestors("d", generations=1) == {"m1", "c"}
+    assert pedigree.descendants(["f1"]) == {"a", "b", "c", "d", "g"}
+    assert pedigree.descendants(["a", "e"], generations=1) == {"c", "g"}
+    assert pedigree.common_ancestors("c", "e") == {"m1"}
+    with pytest.raises(KeyError):
+        pedigree.ancestors(["unknown"])
+
+
+def test_inbreeding(pedigree):
+    coefficients = pedigree.inbreeding(["a", "c", "d", "g"])
+    assert coefficients["a"] == 0
+    assert coefficients["c"] == pytest.approx(0.25)  # full sibs
+    assert coefficients["d"] == pytest.approx(0.25)  # backcross to grandsire
+    assert coefficients["g"] == pytest.approx(0.125)  # half sibs
+
+    # New litters extend the pedigree without recomputing cached ancestors
+    pedigree.add_litters([("h", "L", "bp6")])
+    pedigree.add_pairs([("L", "bp6", "c")], [("L", "bp6", "d")])
+    assert "h" in pedigree and len(pedigree) == 10
+    assert pedigree.inbreeding(["h"])["h"] == pytest.approx(0.4375)
+
+
+def test_inbreeding_cycle(pedigree):
+    pedigree.add_litters([("m1", "L", "bp7")])
+    pedigree.add_pairs([("L", "bp7", "c")], [("L", "bp7", "f2")])
+    assert "m1" in pedigree.ancestors(["m1"])
+    with pytest.raises(ValueError):
+        pedigree.inbreeding(["d"])
+
+
+def test_pedigree_refresh(pipeline, ingest_subjects):
+    """The pedigree loads parentage from breeding pairs and litters"""
+    genotyping = pipeline["genotyping"]
+    pedigree = Pedigree()
+    assert pedigree.refresh() == len(pedigree) > 0
+    assert pedigree.parents("subjectZ") == ("subjectX", "subjectY")
+    assert {"subjectX", "subjectY"} <= pedigree.ancestors(["subjectZ"])
+    assert "subjectZ" in pedigree.descendants(["subjectX"])
+
+    loaded = len(genotyping.SubjectLitter())
+    assert pedigree.refresh() == len(pedigree)  # nothing new to load
+    assert len(genotyping.SubjectLitter()) == loaded
+
+    # Moving a subject to another litter keeps the row count
+    litter = (genotyping.SubjectLitter & "subject='subjectZ'").fetch1()
+    genotyping.SubjectLitter.update1(
+        dict(
+            subject="subjectZ",
+            line="C57BL/6J",
+            breeding_pair="C57_BP_001",
+            litter_birth_date="2020-10-20",
+        )
+    )
+    try:
+        pedigree.refresh()
+        assert pedigree.parents("subjectZ") == ("subject5", "subject6")
+    finally:
+        genotyping.SubjectLitter.update1(litter)
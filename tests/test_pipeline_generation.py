@@ -2,13 +2,55 @@
     1. Assert lab link to within-schema children
     2. Assert lab link to subject
     3. Assert subject link to session
+    4. Assert lazy activation activates nothing before first attribute access,
+       then the accessed schema after its upstream schemas
+    5. Assert concurrent first access activates each schema once
 """
 
+import importlib.util
+import threading
+import time
+
+import datajoint as dj
+import pytest
+
 __all__ = ["pipeline"]
 
 from . import pipeline
 
 
+@pytest.fixture
+def lazy_pipeline(monkeypatch):
+    """A separate copy of workflow_session.pipeline imported with lazy activation
+    set, its activators replaced by stand-ins that record the activation order"""
+    monkeypatch.setitem(dj.config["custom"], "lazy_activation", True)
+    spec = importlib.util.find_spec("workflow_session.pipeline")
+    module = importlib.util.module_from_spec(
+        importlib.util.spec_from_file_location("_lazy_pipeline", spec.origin)
+    )
+    module.__spec__.loader.exec_module(module)
+
+    activated = []
+
+    def activator(name):
+        def activate():
+            time.sleep(0.01)  # widen the window for concurrent first access
+            activated.append(name)
+
+        return activate
+
+    monkeypatch.setattr(
+        module,
+        "_activators",
+        {
+            name: (upstream, activator(name))
+            for name, (upstream, _) in module._activators.items()
+        },
+    )
+    monkeypatch.setattr(module, "metadata_cache_dir", None)
+    yield module, activated
+
+
 def test_generate_pipeline(pipeline):
     session = pipeline["session"]
     genotyping = pipeline["genotyping"]
@@ -54,3 +96,31 @@ def test_generate_pipeline(pipeline):
     # test connection Subject->Session
     session_parents = session.Session.parents()
     assert subject.Subject.full_table_name in session_parents
+
+
+def test_lazy_activation(lazy_pipeline):
+    pipeline, activated = lazy_pipeline
+    assert activated == [] and not pipeline._activated
+
+    assert pipeline.session.Session.__name__ == "Session"
+    assert activated == ["lab", "subject", "session"]
+
+    assert pipeline.Subject.__name__ == "Subject"  # already activated
+    assert pipeline.summary.SubjectStatus.__name__ == "SubjectStatus"
+    assert activated == ["lab", "subject", "session", "genotyping", "summary"]
+
+
+def test_lazy_activation_concurrent(lazy_pipeline):
+    pipeline, activated = lazy_pipeline
+    barrier = threading.Barrier(8)
+
+    def access():
+        barrier.wait()
+        pipeline.genotyping.GenotypeTest
+
+    threads = [threading.Thread(target=access) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert activated == ["lab", "subject", "genotyping"]
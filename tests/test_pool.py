@@ -0,0 +1,151 @@
+"""Test the connection pool
+    1. Assert connections are reused, bounded by size, and closed with the pool
+    2. Assert idle connections are pinged and reconnected on checkout
+    3. Assert threads query the activated tables through pooled connections
+"""
+
+import threading
+
+import pytest
+
+from workflow_session import pool
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+)
+
+
+class _Connection:
+    """Minimal stand-in for dj.Connection"""
+
+    def __init__(self):
+        self.is_connected = True
+        self.in_transaction = False
+        self.connects = 0
+        self.closed = False
+
+    def connect(self):
+        self.connects += 1
+        self.is_connected = True
+
+    def cancel_transaction(self):
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    connections = []
+
+    def _new_connection():
+        connections.append(_Connection())
+        return connections[-1]
+
+    monkeypatch.setattr(pool, "new_connection", _new_connection)
+    return connections
+
+
+def test_pool_bounds_and_reuse(opened):
+    connections = pool.ConnectionPool(size=2, timeout=0.05)
+    with connections.connection() as first:
+        first.in_transaction = True
+        with connections.connection() as second:
+            assert first is not second
+            with pytest.raises(TimeoutError):
+                with connections.connection():
+                    pass
+    assert not first.in_transaction  # rolled back on return
+
+    checked_out = []
+
+    def _worker():
+        with connections.connection() as connection:
+            checked_out.append(connection)
+
+    threads = [threading.Thread(target=_worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) == 2 and {id(c) for c in checked_out} <= {id(c) for c in opened}
+
+    connections.close()
+    assert all(connection.closed for connection in opened)
+    with pytest.raises(RuntimeError):
+        with connections.connection():
+            pass
+
+
+def test_pool_reconnects_idle(opened, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(pool.time, "monotonic", lambda: now[0])
+    connections = pool.ConnectionPool(size=1, ping_interval=30)
+    with connections.connection() as connection:
+        pass
+    connection.is_connected = False
+    now[0] = 10.0
+    with connections.connection():
+        assert connection.connects == 0  # recently used, not checked
+    now[0] = 50.0
+    with connections.connection() as again:
+        assert again is connection and connection.connects == 1
+
+
+def test_pooled_queries(pipeline, ingest_subjects):
+    """Threads query the activated tables through pooled connections"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    subject = pipeline["subject"]
+    with pool.ConnectionPool(size=2) as connections:
+
+        def _count(_):
+            with connections.connection() as connection:
+                return len(pool.bind(subject.Subject, connection))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            counts = list(executor.map(_count, range(4)))
+    assert counts == [len(subject.Subject())] * 4
@@ -0,0 +1,153 @@
+"""Test CSV parsing helpers that do not need a database connection
+    1. Assert columnar read matches csv.DictReader
+    2. Assert each CSV is parsed once per ingest call, different CSVs in parallel
+    3. Assert duplicate headers are rejected
+    4. Assert Parquet and Arrow files are read with their column types
+    5. Assert a missing pyarrow is reported with the extra that installs it
+"""
+
+import csv
+import datetime
+import pathlib
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from workflow_session import readers
+
+
+def _table(*names):
+    """Minimal stand-in exposing the `heading.names` used for projection"""
+    return SimpleNamespace(heading=SimpleNamespace(names=list(names)))
+
+
+def test_read_csv_columns(tmp_path):
+    csv_path = pathlib.Path(tmp_path) / "subjects.csv"
+    csv_path.write_text("subject,sex,cull_method\nsubject5,F,natural\n\nsubject6,M\n")
+
+    columns = readers.read_csv_columns(csv_path)
+    assert columns == {
+        "subject": ["subject5", "subject6"],
+        "sex": ["F", "M"],
+        "cull_method": ["natural", None],
+    }
+
+    rows = readers.project_rows(columns, _table("subject", "sex", "death_date"))
+    with open(csv_path, newline="") as f:
+        expected = [
+            {k: v for k, v in row.items() if k in ("subject", "sex")}
+            for row in csv.DictReader(f)
+        ]
+    assert rows == expected
+
+
+def test_csv_cache_parses_once(tmp_path, monkeypatch):
+    csv_path = pathlib.Path(tmp_path) / "labs.csv"
+    csv_path.write_text("lab,lab_name,location\nLabA,The Example Lab,Building\n")
+
+    calls = []
+    read = readers.read_csv_columns
+    monkeypatch.setattr(
+        readers, "read_csv_columns", lambda p: calls.append(p) or read(p)
+    )
+
+    cache = readers.CsvCache([csv_path, csv_path])
+    assert cache.rows(csv_path, _table("lab", "lab_name")) == [
+        {"lab": "LabA", "lab_name": "The Example Lab"}
+    ]
+    assert cache.rows(csv_path, _table("lab", "location")) == [
+        {"lab": "LabA", "location": "Building"}
+    ]
+    assert len(calls) == 1
+
+
+def test_csv_cache_parses_files_in_parallel(tmp_path, monkeypatch):
+    paths = [pathlib.Path(tmp_path) / name for name in ("labs.csv", "users.csv")]
+    for path in paths:
+        path.write_text("lab\nLabA\n")
+
+    # Each parse waits for the other; a single parse lock would time out
+    barrier = threading.Barrier(2, timeout=5)
+    read = readers.read_csv_columns
+
+    def read_together(path):
+        barrier.wait()
+        return read(path)
+
+    monkeypatch.setattr(readers, "read_csv_columns", read_together)
+
+    cache = readers.CsvCache(paths)
+    results = {}
+    threads = [
+        threading.Thread(target=lambda p=p: results.update({p: cache.columns(p)}))
+        for p in paths
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {p: {"lab": ["LabA"]} for p in paths}
+
+
+def test_duplicate_headers(tmp_path):
+    csv_path = pathlib.Path(tmp_path) / "subjects.csv"
+    csv_path.write_text("subject,sex,subject\nsubject5,F,subject6\n")
+
+    with pytest.raises(ValueError, match="subject"):
+        readers.read_csv_columns(csv_path)
+
+
+def test_iter_csv_chunks(tmp_path):
+    csv_path = pathlib.Path(tmp_path) / "sessions.csv"
+    csv_path.write_text("subject,user\nsubject5,User1\nsubject6,User2\n\nsubjectX,\n")
+
+    chunks = list(readers.iter_csv_chunks(csv_path, chunk_size=2))
+    assert chunks == [
+        {"subject": ["subject5", "subject6"], "user": ["User1", "User2"]},
+        {"subject": ["subjectX"], "user": [""]},
+    ]
+
+
+def test_read_arrow_columns(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather
+    import pyarrow.parquet
+
+    data = pa.table(
+        {
+            "subject": ["subject5", "subject6", "subject7"],
+            "session_datetime": [
+                datetime.datetime(2018, 7, 3, 20, 32, 28),
+                datetime.datetime(2021, 6, 2, 14, 4, 22),
+                None,
+            ],
+            "unused": [1, 2, 3],
+        }
+    )
+    tmp_path = pathlib.Path(tmp_path)
+    pyarrow.parquet.write_table(data, tmp_path / "sessions.parquet")
+    pyarrow.feather.write_feather(data, tmp_path / "sessions.arrow")
+
+    for path in (tmp_path / "sessions.parquet", tmp_path / "sessions.arrow"):
+        columns = readers.read_columns(path)
+        rows = readers.project_rows(columns, _table("subject", "session_datetime"))
+        assert rows[0] == {
+            "subject": "subject5",
+            "session_datetime": datetime.datetime(2018, 7, 3, 20, 32, 28),
+        }
+        assert rows[2]["session_datetime"] is None
+        assert "unused" in columns and "unused" not in columns._columns
+
+        chunks = list(readers.iter_chunks(path, chunk_size=2))
+        assert [chunk["subject"] for chunk in chunks] == [
+            ["subject5", "subject6"],
+            ["subject7"],
+        ]
+
+
+def test_read_arrow_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+    with pytest.raises(ImportError, match=r"workflow-session\[arrow\]"):
+        readers.read_columns(pathlib.Path(tmp_path) / "sessions.parquet")
@@ -0,0 +1,58 @@
+"""Test the ingest instrumentation report
+    1. Assert counters accumulate per (CSV, table) record
+    2. Assert hooks receive finished records and the report saves as JSON
+    3. Assert typed error values are saved as strings
+"""
+
+import datetime
+import decimal
+import json
+import pathlib
+from types import SimpleNamespace
+
+from workflow_session.report import IngestReport, row_bytes
+
+
+def test_ingest_report(tmp_path):
+    table = SimpleNamespace(full_table_name="`subject`.`subject`")
+    finished = []
+    report = IngestReport(hooks=[finished.append])
+    rows = [{"subject": "subject5", "sex": "F"}, {"subject": "subject6", "sex": "M"}]
+
+    with report.timer("subjects.csv", table, "parse_s"):
+        pass
+    record = report.record("subjects.csv", table)
+    record["rows_read"] += 2
+    record["rows_sent"] += 2
+    report.add_insert("subjects.csv", table, rows[:1], 0.5)
+    report.add_insert("subjects.csv", table, rows[1:], 0.25)
+    report.finish("subjects.csv", table, rows_inserted=2)
+
+    assert finished == [record]
+    assert record["batches"] == 2
+    assert record["insert_s"] == 0.75 and record["max_insert_s"] == 0.5
+    assert record["bytes"] == sum(row_bytes(row) for row in rows)
+    assert record["parse_s"] >= 0
+
+    path = pathlib.Path(tmp_path) / "report.json"
+    report.save(path)
+    saved = json.loads(path.read_text())
+    assert saved["tables"] == [record]
+    assert saved["totals"]["rows_inserted"] == 2
+
+
+def test_save_typed_errors(tmp_path):
+    table = SimpleNamespace(full_table_name="`session`.`session`")
+    report = IngestReport()
+    when = datetime.datetime(2021, 6, 2, 14, 4, 22)
+    errors = [
+        dict(row=1, column="session_datetime", value=when, error="future date"),
+        dict(row=2, column="weight", value=decimal.Decimal("1.50"), error="range"),
+    ]
+    report.add_errors("sessions.parquet", table, errors, 2)
+
+    path = pathlib.Path(tmp_path) / "report.json"
+    report.save(path)
+    saved = json.loads(path.read_text())
+    assert [e["value"] for e in saved["errors"]] == ["2021-06-02 14:04:22", "1.50"]
+    assert saved["totals"]["rows_invalid"] == 2
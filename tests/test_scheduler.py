@@ -0,0 +1,29 @@
+"""Test ordering of ingest tables by foreign-key dependencies
+    1. Assert independent tables share a level
+    2. Assert children follow all of their in-list ancestors
+"""
+
+from workflow_session.scheduler import dependency_levels
+
+
+class _Table:
+    """Minimal stand-in exposing the attributes used to build the DAG"""
+
+    def __init__(self, name, *ancestors):
+        self.full_table_name = name
+        self._ancestors = [name, *ancestors]
+
+    def ancestors(self):
+        return self._ancestors
+
+
+def test_dependency_levels():
+    tables = [
+        _Table("subject", "lab", "user"),  # 0
+        _Table("strain"),  # 1
+        _Table("subject__strain", "subject", "strain", "lab", "user"),  # 2
+        _Table("source"),  # 3
+        _Table("allele", "source"),  # 4
+        _Table("zygosity", "subject", "allele", "source", "lab", "user"),  # 5
+    ]
+    assert dependency_levels(tables) == [[0, 1, 3], [2, 4], [5]]
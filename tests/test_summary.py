@@ -0,0 +1,203 @@
+"""Test colony summary states and counts
+    1. Assert the latest caging and genotype test define a subject's state
+    2. Assert counts cover only the requested lines and cages
+    3. Assert only subjects whose source digests changed are refreshed
+    4. Assert refreshed subjects move counts, dropping rows left at zero
+    5. Assert refresh follows deaths in the colony, from persisted digests
+"""
+
+import datetime
+from types import SimpleNamespace
+
+from workflow_session import summary
+from workflow_session.summary import refresh, subject_states, summarize
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+)
+
+
+def test_subject_states():
+    day = datetime.datetime(2021, 1, 1)
+    states = subject_states(
+        ["s1", "s2", "s3"],
+        [("s1", "LineA"), ("s2", "LineA")],
+        [
+            ("s1", day, "C1"),
+            ("s1", day + datetime.timedelta(days=7), "C2"),
+            ("s3", day, "C2"),
+        ],
+        ["s2"],
+        [
+            ("s1", "Cre", "t2", "Present"),
+            ("s1", "Cre", "t1", "Absent"),
+            ("s1", "Ai14", "t1", "Absent"),
+        ],
+    )
+    assert states == {
+        "s1": ("LineA", "C2", True, (("Ai14", "Absent"), ("Cre", "Present"))),
+        "s2": ("LineA", "", False, ()),
+        "s3": ("", "C2", True, ()),
+    }
+
+    line_rows, cage_rows, genotype_rows = summarize(states)
+    assert sorted(line_rows, key=lambda row: row["line"]) == [
+        dict(line="", live=1, dead=0),
+        dict(line="LineA", live=1, dead=1),
+    ]
+    assert cage_rows == [dict(cage="C2", occupants=2)]
+    assert len(genotype_rows) == 2
+
+    line_rows, cage_rows, genotype_rows = summarize(states, {"LineB"}, {"C1"})
+    assert line_rows == cage_rows == genotype_rows == []
+
+
+class _Restrictable:
+    """Stand-in for a table or query, restricted to itself"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def __and__(self, restriction):
+        if isinstance(restriction, list):
+            keys = [tuple(key.items()) for key in restriction]
+            return _Restrictable(
+                row
+                for row in self.rows
+                if any(all(row[a] == v for a, v in key) for key in keys)
+            )
+        return self
+
+    def fetch(self, as_dict=False):
+        return [dict(row) for row in self.rows]
+
+    def delete_quick(self):
+        self.deleted = True
+
+
+def test_changed_subjects(monkeypatch):
+    sources = [
+        (SimpleNamespace(full_table_name="`s`.`subject`"), ("subject",)),
+        (SimpleNamespace(full_table_name="`s`.`death`"), ("subject",)),
+    ]
+    stored = {
+        "`s`.`subject`": {"s1": (1, 10), "s2": (1, 20), "s3": (1, 30)},
+        "`s`.`death`": {"s1": (1, 11)},
+    }
+    current = {
+        "`s`.`subject`": {"s1": (1, 10), "s2": (1, 21), "s4": (1, 40)},
+        "`s`.`death`": {"s1": (1, 11)},
+    }
+    queried = []
+
+    def total(digests):
+        return sum(n for n, _ in digests.values()), sum(d for _, d in digests.values())
+
+    def fetch(query, attrs, subjects=None):
+        if attrs[0] == "source":
+            return [(name, *total(digests)) for name, digests in stored.items()]
+        name = queried[-1]
+        return [(subject, *digest) for subject, digest in stored[name].items()]
+
+    def grouped_digests(table, group, *attrs):
+        queried.append(table.full_table_name)
+        return current[table.full_table_name]
+
+    monkeypatch.setattr(summary, "SourceDigest", _Restrictable())
+    monkeypatch.setattr(summary, "_fetch", fetch)
+    monkeypatch.setattr(
+        summary, "table_digest", lambda t, *a: total(current[t.full_table_name])
+    )
+    monkeypatch.setattr(summary, "grouped_digests", grouped_digests)
+
+    subjects, digests = summary._changed_subjects(sources)
+    assert subjects == {"s2", "s3", "s4"}
+    assert queried == ["`s`.`subject`"]  # unchanged death table not grouped
+    assert digests == [
+        ("`s`.`subject`", (3, 71), {"s2": (1, 21), "s3": None, "s4": (1, 40)})
+    ]
+
+
+def test_add_counts():
+    inserted = []
+    table = _Restrictable(
+        [dict(line="LineA", live=2, dead=0), dict(line="LineB", live=1, dead=0)]
+    )
+    table.insert = inserted.extend
+    before = [dict(line="LineA", live=1, dead=0), dict(line="LineB", live=1, dead=0)]
+    after = [dict(line="LineA", live=0, dead=1), dict(line="LineC", live=1, dead=0)]
+    summary._add_counts(table, ("line",), ("live", "dead"), before, after)
+    assert sorted(inserted, key=lambda row: row["line"]) == [
+        dict(line="LineA", live=1, dead=1),
+        dict(line="LineC", live=1, dead=0),
+    ]
+
+
+def test_refresh_summary(pipeline, ingest_subjects):
+    """Summary counts match the colony and follow deaths incrementally"""
+    subject, summary = pipeline["subject"], pipeline["summary"]
+    refresh(verbose=False)
+    assert len(summary.SubjectStatus()) == len(subject.Subject())
+    # Every subject in the fixture data has a death date
+    assert sum(summary.LineCount.fetch("live")) == 0
+    assert sum(summary.LineCount.fetch("dead")) == len(subject.Subject())
+    # Digests persist, so a later refresh in any process starts from them
+    assert len(summary.SourceDigest & "subject=''") == 5
+    assert refresh(verbose=False) == 0
+
+    key = dict(subject="subject6")
+    death = (subject.SubjectDeath & key).fetch1()
+    (subject.SubjectDeath & key).delete_quick()
+    assert refresh(verbose=False) == 1
+    assert (summary.SubjectStatus & key).fetch1("alive")
+    assert sum(summary.LineCount.fetch("live")) == 1
+    assert sum(summary.LineCount.fetch("dead")) == len(subject.Subject()) - 1
+    assert (summary.CageOccupancy & "cage='2'").fetch1("occupants") == 1
+
+    subject.SubjectDeath.insert1(death)
+    assert refresh(verbose=False) == 1
+    assert not (summary.SubjectStatus & key).fetch1("alive")
+    assert sum(summary.LineCount.fetch("live")) == 0
+    assert not (summary.CageOccupancy & "cage='2'")
@@ -0,0 +1,164 @@
+"""Test the session timeline index
+    1. Assert range queries per subject, project, and subject within a project
+    2. Assert nearest sessions, and age and alive status at each session
+    3. Assert new sessions are picked up by later queries
+    4. Assert sessions load from the session schema, following project changes
+"""
+
+import datetime
+
+import pytest
+
+from workflow_session.timeline import SessionTimeline
+
+__all__ = [
+    "pipeline",
+    "lab_csv",
+    "lab_project_csv",
+    "lab_user_csv",
+    "lab_publications_csv",
+    "lab_keywords_csv",
+    "lab_protocol_csv",
+    "lab_project_users_csv",
+    "lab_source_csv",
+    "ingest_lab",
+    "subjects_csv",
+    "subjects_part_csv",
+    "allele_csv",
+    "cage_csv",
+    "breedingpair_csv",
+    "genotype_test_csv",
+    "line_csv",
+    "strain_csv",
+    "zygosity_csv",
+    "ingest_subjects",
+    "sessions_csv",
+    "ingest_sessions",
+]
+
+from . import (
+    pipeline,
+    lab_csv,
+    lab_project_csv,
+    lab_user_csv,
+    lab_publications_csv,
+    lab_keywords_csv,
+    lab_protocol_csv,
+    lab_project_users_csv,
+    lab_source_csv,
+    ingest_lab,
+    subjects_csv,
+    subjects_part_csv,
+    allele_csv,
+    cage_csv,
+    breedingpair_csv,
+    genotype_test_csv,
+    line_csv,
+    strain_csv,
+    zygosity_csv,
+    ingest_subjects,
+    sessions_csv,
+    ingest_sessions,
+)
+
+
+@pytest.fixture
+def timeline():
+    """s1, born 2021-01-01, has sessions on days 10, 20 (ProjA) and 30 (ProjB);
+    s2, birth date unknown and dead on 2021-01-25, on day 15 and 25 (ProjA)."""
+    timeline = SessionTimeline()
+    timeline.add_sessions(
+        [
+            ("s1", "2021-01-20 10:00"),
+            ("s1", "2021-01-10 10:00"),
+            ("s1", "2021-01-30 10:00"),
+            ("s2", "2021-01-15 10:00"),
+            ("s2", "2021-01-25 10:00"),
+        ]
+    )
+    timeline.add_projects(
+        [
+            ("ProjA", "s1", "2021-01-10 10:00"),
+            ("ProjA", "s1", "2021-01-20 10:00"),
+            ("ProjB", "s1", "2021-01-30 10:00"),
+            ("ProjA", "s2", "2021-01-15 10:00"),
+            ("ProjA", "s2", "2021-01-25 10:00"),
+        ]
+    )
+    timeline.add_subjects([("s1", "2021-01-01"), ("s2", None)], [("s2", "2021-01-25")])
+    return timeline
+
+
+def _days(rows):
+    return [(row["subject"], row["session_datetime"].day) for row in rows]
+
+
+def test_sessions(timeline):
+    assert len(timeline) == 5
+    assert _days(timeline.sessions("s1")) == [("s1", 10), ("s1", 20), ("s1", 30)]
+    assert _days(timeline.sessions(project="ProjA", start="2021-01-12")) == [
+        ("s2", 15),
+        ("s1", 20),
+        ("s2", 25),
+    ]
+    assert _days(
+        timeline.sessions(project="ProjA", start="2021-01-10 10:00", end="2021-01-20")
+    ) == [("s1", 10), ("s2", 15)]
+    assert _days(timeline.sessions("s1", project="ProjA")) == [("s1", 10), ("s1", 20)]
+    assert timeline.sessions("s3") == []
+    with pytest.raises(ValueError):
+        timeline.sessions()
+
+
+def test_nearest_and_age(timeline):
+    session = timeline.nearest("2021-01-14", subject="s1")
+    assert session["session_datetime"] == datetime.datetime(2021, 1, 10, 10)
+    assert session["age_days"] == pytest.approx(9 + 10 / 24)
+    assert session["alive"]
+    assert (
+        timeline.nearest("2021-01-15 10:00", subject="s1")["session_datetime"].day == 10
+    )
+    assert timeline.nearest("2022-01-01", project="ProjA")["subject"] == "s2"
+    assert timeline.nearest("2021-01-01", subject="s3") is None
+    last = timeline.nearest("2021-01-25 10:00", subject="s2")
+    assert last["age_days"] != last["age_days"]  # NaN: birth date unknown
+    assert not last["alive"]
+
+
+def test_incremental_sessions(timeline):
+    assert _days(timeline.sessions(project="ProjB")) == [("s1", 30)]
+    timeline.add_sessions([("s2", "2021-01-05 10:00")])
+    timeline.add_projects([("ProjB", "s2", "2021-01-05 10:00")])
+    assert _days(timeline.sessions(project="ProjB")) == [("s2", 5), ("s1", 30)]
+    assert timeline.nearest("2021-01-01", subject="s2")["session_datetime"].day == 5
+    assert len(timeline) == 6
+
+
+def test_session_timeline(pipeline, ingest_sessions):
+    """The session timeline answers range and nearest queries after ingest"""
+    session = pipeline["session"]
+    timeline = SessionTimeline()
+    assert timeline.refresh() == len(session.Session())
+    project_sessions = timeline.sessions(project="ProjA")
+    assert len(project_sessions) == len(session.ProjectSession & "project='ProjA'")
+    assert [
+        s["subject"] for s in timeline.sessions(project="ProjA", end="2020-01-01")
+    ] == ["subject5"]
+    nearest = timeline.nearest("2021-06-01", subject="subject6")
+    assert nearest["session_datetime"] == datetime.datetime(2021, 6, 2, 14, 4, 22)
+    assert timeline.refresh() == len(session.Session())  # nothing new
+
+    # Moving an old session to another project keeps the row counts
+    link = (session.ProjectSession & "project='ProjA'" & "subject='subject5'").fetch(
+        "KEY", order_by="session_datetime", limit=1
+    )[0]
+    (session.ProjectSession & link).delete_quick()
+    session.ProjectSession.insert1(dict(link, project="ProjB"))
+    try:
+        timeline.refresh()
+        assert [
+            s["subject"] for s in timeline.sessions(project="ProjB", end="2020-01-01")
+        ] == ["subject5"]
+    finally:
+        (session.ProjectSession & dict(link, project="ProjB")).delete_quick()
+        session.ProjectSession.insert1(link)
@@ -0,0 +1,65 @@
+"""Test heading-based CSV validation
+    1. Assert type, length, enum and path checks flag the offending rows
+    2. Assert missing values are allowed only where a default exists
+"""
+
+from types import SimpleNamespace
+
+from workflow_session.validation import validate_columns
+
+
+def _attribute(name, sql_type, numeric=False, string=False, nullable=False):
+    return SimpleNamespace(
+        name=name,
+        type=sql_type,
+        numeric=numeric,
+        string=string,
+        nullable=nullable,
+        default="null" if nullable else None,
+        autoincrement=False,
+    )
+
+
+def test_validate_columns():
+    attributes = {
+        attr.name: attr
+        for attr in (
+            _attribute("subject", "varchar(8)", string=True),
+            _attribute("sex", "enum('M','F','U')"),
+            _attribute("session_datetime", "datetime"),
+            _attribute("num_of_pups", "tinyint unsigned", numeric=True),
+            _attribute("session_dir", "varchar(255)", string=True),
+            _attribute("weight", "float", numeric=True, nullable=True),
+        )
+    }
+    table = SimpleNamespace(
+        full_table_name="`subject`.`subject`",
+        heading=SimpleNamespace(names=list(attributes), attributes=attributes),
+    )
+    columns = dict(
+        subject=["subject5", "subject_too_long", "subject7", "subject8"],
+        sex=["F", "X", "m", None],
+        session_datetime=["2018-07-03 20:32:28", "2018-13-03", "2018-07-03", ""],
+        num_of_pups=["2", "300", "", "2.5"],
+        session_dir=["/subject5/session1", "/subject6\\session1", "s7", "s8"],
+        weight=["", "heavy", "21.5", None],
+        unused=["a", "b", "c", "d"],
+    )
+
+    valid, errors = validate_columns(columns, table, "subjects.csv", row_offset=10)
+
+    assert valid.tolist() == [True, False, False, False]
+    flagged = {(error["row"], error["column"]) for error in errors}
+    assert flagged == {
+        (12, "subject"),
+        (12, "sex"),
+        (12, "session_datetime"),
+        (12, "num_of_pups"),
+        (12, "session_dir"),
+        (12, "weight"),
+        (13, "num_of_pups"),  # blank, no default
+        (14, "sex"),  # missing, no default
+        (14, "session_datetime"),
+        (14, "num_of_pups"),
+    }
+    assert all(error["csv"] == "subjects.csv" for error in errors)
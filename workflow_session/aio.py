@@ -0,0 +1,99 @@
+import asyncio
+import contextlib
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from workflow_session.pool import ConnectionPool
+
+
+def _deferred(name: str):
+    """Ingest function `name` of `workflow_session.ingest`, imported when called.
+
+    The import activates the pipeline, which queries the database, so it is
+    left to the worker thread rather than run on the event loop.
+    """
+
+    def call(**kwargs):
+        from workflow_session import ingest
+
+        return getattr(ingest, name)(**kwargs)
+
+    return call
+
+
+class AsyncIngestor:
+    """Run ingest functions from asyncio code without blocking the event loop.
+
+    Each ingest runs on a bounded thread pool, through a connection checked out
+    of a `ConnectionPool` of the same size, so up to `workers` uploads proceed
+    concurrently while the loop keeps serving requests; further calls wait for
+    a free worker.
+    Cancelling the awaiting task stops the ingest before its next insert batch.
+
+    Use as an async context manager, or call `close` when done:
+
+        async with AsyncIngestor(workers=4) as ingestor:
+            await ingestor.ingest_sessions(session_csv_path=path, verbose=False)
+
+    Args:
+        workers (int): Default 4. Number of worker threads and connections
+    """
+
+    def __init__(self, workers: int = 4):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ingest"
+        )
+        self._pool = ConnectionPool(size=workers)
+
+    def _call(self, ingest, cancel: threading.Event, kwargs: dict):
+        with self._pool.connection() as connection:
+            return ingest(connection=connection, cancel=cancel, **kwargs)
+
+    async def run(self, ingest, **kwargs):
+        """Await `ingest(**kwargs)` run on a worker thread and connection.
+
+        Args:
+            ingest (callable): ingest function accepting `connection` and `cancel`,
+                e.g. `workflow_session.ingest.ingest_csv_to_table`
+            **kwargs: passed to `ingest`
+
+        Raises:
+            asyncio.CancelledError: once the ingest has stopped, if the awaiting
+                task was cancelled
+        """
+        cancel = threading.Event()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(self._call, ingest, cancel, kwargs)
+        )
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            cancel.set()
+            # The worker's connection must be idle before it takes the next call
+            with contextlib.suppress(Exception):
+                await future
+            raise
+
+    async def ingest_lab(self, **kwargs):
+        """Awaitable `workflow_session.ingest.ingest_lab`, with the same options"""
+        return await self.run(_deferred("ingest_lab"), **kwargs)
+
+    async def ingest_subjects(self, **kwargs):
+        """Awaitable `workflow_session.ingest.ingest_subjects`, with the same options"""
+        return await self.run(_deferred("ingest_subjects"), **kwargs)
+
+    async def ingest_sessions(self, **kwargs):
+        """Awaitable `workflow_session.ingest.ingest_sessions`, with the same options"""
+        return await self.run(_deferred("ingest_sessions"), **kwargs)
+
+    def close(self):
+        """Wait for running ingests, then close the worker connections"""
+        self._executor.shutdown(wait=True)
+        self._pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -1,3 +1,201 @@
+import concurrent.futures
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import pathlib
+
 import datajoint as dj
+import numpy as np
+import pynwb
 
 from element_session.export.nwb import session_to_nwb
+
+logger = logging.getLogger(__name__)
+
+# NWBFile.subject fields rebuilt in workers from prefetched metadata
+_SUBJECT_FIELDS = (
+    "subject_id",
+    "sex",
+    "date_of_birth",
+    "description",
+    "species",
+    "genotype",
+)
+
+
+def _nwb_filename(session_key: dict) -> str:
+    """File name from a session key, e.g. subject5_2018-07-03T20-32-28.nwb"""
+    parts = [
+        value.isoformat() if isinstance(value, datetime.datetime) else str(value)
+        for value in session_key.values()
+    ]
+    return "_".join(parts).replace(":", "-").replace("/", "-") + ".nwb"
+
+
+def _subject_metadata(subject_keys: list) -> dict:
+    """NWBFile.subject fields of the given subjects, as `subject_to_nwb` builds
+    them, fetched in one query per table rather than three per subject
+
+    Returns:
+        subjects (dict): subject primary key values (tuple) -> fields
+    """
+    from .pipeline import subject
+
+    subjects = subject.Subject & subject_keys
+    query = (
+        subjects.join(subject.Subject.Line, left=True)
+        .join(subject.Subject.Strain, left=True)
+        .join(subject.Subject.Source, left=True)
+    )
+    species, alleles = {}, {}
+    for name, value in zip(
+        *(subject.Line * subject.Subject.Line & subjects).fetch("subject", "species")
+    ):
+        species.setdefault(name, []).append(value)
+    for name, value in zip(
+        *(subject.Line.Allele * subject.Subject.Line & subjects).fetch(
+            "subject", "allele", order_by=("subject", "line", "allele")
+        )
+    ):
+        alleles.setdefault(name, []).append(value)
+
+    metadata = {}
+    for info in query.fetch(as_dict=True):
+        nwb_subject = pynwb.file.Subject(
+            subject_id=info["subject"],
+            sex=info["sex"],
+            date_of_birth=datetime.datetime.combine(
+                info["subject_birth_date"], datetime.time()
+            ),
+            description=json.dumps(info, default=str),
+            species=str(np.array(species.get(info["subject"], []), dtype=object)),
+            genotype=" x ".join(alleles.get(info["subject"], [])),
+        )
+        metadata[tuple(info[name] for name in subject.Subject.primary_key)] = {
+            field: getattr(nwb_subject, field) for field in _SUBJECT_FIELDS
+        }
+    return metadata
+
+
+def _init_worker(subjects: dict, lab_info: dict):
+    """Give each worker its own connection and the prefetched metadata"""
+    from .pipeline import session, subject
+
+    # A forked worker inherits the parent's socket; open a fresh one in place
+    # so every table bound to this connection object uses it
+    dj.conn().connect()
+
+    # session_to_nwb looks these up on the linking module
+    linking_module = session._linking_module
+    primary_key = subject.Subject.primary_key
+    linking_module.subject_to_nwb = lambda session_key: pynwb.file.Subject(
+        **subjects[tuple(session_key[name] for name in primary_key)]
+    )
+    linking_module.element_lab_to_nwb_dict = lambda **keys: dict(lab_info)
+
+
+def _export_session(session_key: dict, nwb_path: str, lab_keys: dict) -> str:
+    """Build one NWB file and write it, via a temporary file, to `nwb_path`"""
+    nwb_path = pathlib.Path(nwb_path)
+    nwbfile = session_to_nwb(session_key, **lab_keys)
+    tmp_path = nwb_path.with_suffix(".nwb.part")
+    with pynwb.NWBHDF5IO(str(tmp_path), "w") as io:
+        io.write(nwbfile)
+    tmp_path.replace(nwb_path)
+    return str(nwb_path)
+
+
+def export_sessions_to_nwb(
+    output_dir: str,
+    restriction=None,
+    project: str = None,
+    subject_restriction=None,
+    start: datetime.datetime = None,
+    end: datetime.datetime = None,
+    lab_key: dict = None,
+    project_key: dict = None,
+    protocol_key: dict = None,
+    processes: int = None,
+    overwrite: bool = False,
+    verbose: bool = True,
+) -> list:
+    """Export many sessions to NWB files in parallel, one file per session
+
+    Subject and lab metadata are fetched once in this process and shared with
+    the workers. Each worker builds its file with `session_to_nwb` on its own
+    connection and writes it straight to disk. Sessions whose file already
+    exists are skipped, so an interrupted export resumes where it stopped.
+
+    Args:
+        output_dir (str): Directory receiving one `.nwb` file per session
+        restriction: Optional. Any DataJoint restriction on session.Session
+        project (str): Optional. Only sessions in this project
+        subject_restriction: Optional. Restriction on subject.Subject, e.g.
+            {"subject": "subject5"}
+        start (datetime): Optional. Earliest session_datetime, inclusive
+        end (datetime): Optional. Latest session_datetime, exclusive
+        lab_key (dict): Optional. Lab metadata for every file, see session_to_nwb
+        project_key (dict): Optional. Project metadata for every file
+        protocol_key (dict): Optional. Protocol metadata for every file
+        processes (int): Default os.cpu_count(). Number of worker processes
+        overwrite (bool): Default False. Re-export sessions with existing files
+        verbose (bool): Log progress after each file
+
+    Returns:
+        paths (list): Paths of the files written by this call
+    """
+    from element_lab.export.nwb import element_lab_to_nwb_dict
+    from .pipeline import session, subject
+
+    sessions = session.Session & (restriction if restriction is not None else {})
+    if project is not None:
+        sessions &= session.ProjectSession & {"project": project}
+    if subject_restriction is not None:
+        sessions &= subject.Subject & subject_restriction
+
+    output_dir = pathlib.Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pending = []
+    for session_key in sessions.fetch("KEY", order_by="session_datetime"):
+        session_datetime = session_key["session_datetime"]
+        if (start is not None and session_datetime < start) or (
+            end is not None and session_datetime >= end
+        ):
+            continue
+        nwb_path = output_dir / _nwb_filename(session_key)
+        if overwrite or not nwb_path.exists():
+            pending.append((session_key, nwb_path))
+    if verbose:
+        logger.info(f"Exporting {len(pending)} session(s) to {output_dir}")
+    if not pending:
+        return []
+
+    subjects = _subject_metadata(
+        [
+            {name: session_key[name] for name in subject.Subject.primary_key}
+            for session_key, _ in pending
+        ]
+    )
+    lab_keys = dict(lab_key=lab_key, project_key=project_key, protocol_key=protocol_key)
+    lab_info = element_lab_to_nwb_dict(**lab_keys) if any(lab_keys.values()) else {}
+
+    start_methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in start_methods else None)
+    written = []
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=processes or os.cpu_count(),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(subjects, lab_info),
+    ) as pool:
+        futures = [
+            pool.submit(_export_session, session_key, str(nwb_path), lab_keys)
+            for session_key, nwb_path in pending
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            written.append(future.result())
+            if verbose:
+                logger.info(f"[{len(written)}/{len(pending)}] {written[-1]}")
+    return written
@@ -0,0 +1,216 @@
+import re
+
+import numpy as np
+
+# Codes of the genotype matrix
+UNTESTED, ABSENT, PRESENT = -1, 0, 1
+
+_RESULTS = {
+    "absent": ABSENT,
+    "negative": ABSENT,
+    "neg": ABSENT,
+    "-": ABSENT,
+    "present": PRESENT,
+    "positive": PRESENT,
+    "pos": PRESENT,
+    "+": PRESENT,
+}
+
+
+def encode_result(test_result) -> int:
+    """Code of a free-text test result: PRESENT, ABSENT, or UNTESTED if unknown"""
+    return _RESULTS.get(str(test_result).strip().lower(), UNTESTED)
+
+
+def test_order(genotype_test_id) -> tuple:
+    """Sort key of a genotype test ID: digit runs compare as numbers, so
+    "Test10" follows "Test9", and ISO dates and times sort chronologically"""
+    genotype_test_id = str(genotype_test_id)
+    runs = re.split(r"(\d+)", genotype_test_id)
+    return (
+        tuple((int(run), "") if run.isdigit() else (-1, run) for run in runs if run),
+        genotype_test_id,
+    )
+
+
+def latest_tests(tests) -> dict:
+    """Result of the latest test of each subject for each sequence, the latest
+    being the greatest ID by `test_order`.
+
+    Args:
+        tests (iterable): (subject, sequence, genotype_test_id, test_result)
+
+    Returns:
+        results (dict): (subject, sequence) -> test_result
+    """
+    latest = {}
+    for subject, sequence, test_id, test_result in tests:
+        order = test_order(test_id)
+        previous = latest.get((subject, sequence))
+        if previous is None or order > previous[0]:
+            latest[subject, sequence] = (order, test_result)
+    return {key: test_result for key, (_, test_result) in latest.items()}
+
+
+class GenotypeMatrix:
+    """Latest test result of every subject for every sequence, as int8 codes.
+
+    Rows follow `subjects` and columns `sequences`; cells are PRESENT, ABSENT
+    or UNTESTED.
+
+    Args:
+        subjects (list): subject IDs, one per row
+        sequences (list): sequence names, one per column
+        codes (np.ndarray): int8 array of shape (len(subjects), len(sequences))
+    """
+
+    def __init__(self, subjects: list, sequences: list, codes: np.ndarray):
+        self.subjects = list(subjects)
+        self.sequences = list(sequences)
+        self.codes = codes
+        self._rows = {subject: i for i, subject in enumerate(self.subjects)}
+        # Extra last row of UNTESTED, taken for row -1
+        self._padded = np.vstack(
+            [codes, np.full((1, len(self.sequences)), UNTESTED, dtype=np.int8)]
+        )
+
+    @classmethod
+    def from_tests(cls, tests):
+        """Build the matrix from test records; the latest test per subject and
+        sequence counts (see `latest_tests`), and unrecognized results count as
+        untested.
+
+        Args:
+            tests (iterable): (subject, sequence, genotype_test_id, test_result)
+        """
+        latest = latest_tests(tests)
+        subjects = sorted({subject for subject, _ in latest})
+        sequences = sorted({sequence for _, sequence in latest})
+        rows = {subject: i for i, subject in enumerate(subjects)}
+        columns = {sequence: j for j, sequence in enumerate(sequences)}
+        codes = np.full((len(subjects), len(sequences)), UNTESTED, dtype=np.int8)
+        for (subject, sequence), test_result in latest.items():
+            codes[rows[subject], columns[sequence]] = encode_result(test_result)
+        return cls(subjects, sequences, codes)
+
+    @classmethod
+    def fetch(cls):
+        """Build the matrix from `genotyping.GenotypeTest` in one query"""
+        from .pipeline import genotyping
+
+        return cls.from_tests(
+            zip(
+                *genotyping.GenotypeTest.fetch(
+                    "subject", "sequence", "genotype_test_id", "test_result"
+                )
+            )
+        )
+
+    def rows(self, subjects) -> np.ndarray:
+        """Row of each subject, -1 for subjects without tests"""
+        return np.array([self._rows.get(s, -1) for s in subjects], dtype=np.int64)
+
+    def take(self, rows: np.ndarray) -> np.ndarray:
+        """Codes of `rows`, all UNTESTED for row -1"""
+        return self._padded[rows]
+
+
+def offspring_present(father: np.ndarray, mother: np.ndarray) -> np.ndarray:
+    """Expected fraction of offspring testing Present, from the parents' codes.
+
+    A Present parent is taken to carry one copy (hemizygous or heterozygous),
+    the usual case when breeding transgenic lines, and passes it to half its
+    offspring; an Absent parent passes none.
+
+    Returns:
+        fraction (np.ndarray): 0, 0.5 or 0.75; NaN where a parent is untested
+    """
+    transmits = np.select([father == PRESENT, father == ABSENT], [0.5, 0.0], np.nan)
+    transmits_mother = np.select(
+        [mother == PRESENT, mother == ABSENT], [0.5, 0.0], np.nan
+    )
+    return 1 - (1 - transmits) * (1 - transmits_mother)
+
+
+def fetch_parentage() -> list:
+    """(subject, line, breeding_pair, father, mother) of every subject with a
+    litter, in one query"""
+    from .pipeline import genotyping
+
+    return list(
+        zip(
+            *(
+                genotyping.SubjectLitter
+                * genotyping.BreedingPair.Father
+                * genotyping.BreedingPair.Mother
+            ).fetch("subject", "line", "breeding_pair", "father", "mother")
+        )
+    )
+
+
+def check_litters(matrix: GenotypeMatrix, parentage: list) -> tuple:
+    """Compare every tested subject with its parents, for all sequences at once.
+
+    Args:
+        matrix (GenotypeMatrix): test results of subjects and parents
+        parentage (list): (subject, line, breeding_pair, father, mother) tuples,
+            see `fetch_parentage`
+
+    Returns:
+        expectations (list): per breeding pair and sequence tested in its
+            offspring, a dict with the line, breeding_pair, sequence, the
+            parents' results, expected_present fraction (None if a parent is
+            untested), pups_tested and pups_present
+        errors (list): per Mendelian inconsistency, a dict with the subject,
+            sequence, father, mother and error message
+    """
+    if not parentage or not matrix.sequences:
+        return [], []
+    subjects, lines, pairs, fathers, mothers = map(list, zip(*parentage))
+    child = matrix.take(matrix.rows(subjects))
+    father = matrix.take(matrix.rows(fathers))
+    mother = matrix.take(matrix.rows(mothers))
+    expected = offspring_present(father, mother)
+
+    # Present in a pup of two parents tested Absent
+    inconsistent = (child == PRESENT) & (expected == 0)
+    errors = [
+        dict(
+            subject=subjects[i],
+            sequence=matrix.sequences[j],
+            father=fathers[i],
+            mother=mothers[i],
+            error="present, but absent in both parents",
+        )
+        for i, j in zip(*np.nonzero(inconsistent))
+    ]
+
+    pair_keys, first, pair_index = np.unique(
+        np.array([f"{line}\0{pair}" for line, pair in zip(lines, pairs)], dtype=object),
+        return_index=True,
+        return_inverse=True,
+    )
+    n_pairs, n_sequences = len(pair_keys), len(matrix.sequences)
+    tested = np.zeros((n_pairs, n_sequences), dtype=np.int64)
+    present = np.zeros((n_pairs, n_sequences), dtype=np.int64)
+    np.add.at(tested, pair_index, child != UNTESTED)
+    np.add.at(present, pair_index, child == PRESENT)
+    names = {ABSENT: "Absent", PRESENT: "Present", UNTESTED: None}
+    expectations = [
+        dict(
+            line=lines[first[k]],
+            breeding_pair=pairs[first[k]],
+            sequence=matrix.sequences[j],
+            father_result=names[int(father[first[k], j])],
+            mother_result=names[int(mother[first[k], j])],
+            expected_present=(
+                None
+                if np.isnan(expected[first[k], j])
+                else float(expected[first[k], j])
+            ),
+            pups_tested=int(tested[k, j]),
+            pups_present=int(present[k, j]),
+        )
+        for k, j in zip(*np.nonzero(tested))
+    ]
+    return expectations, errors
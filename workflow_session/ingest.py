@@ -1,6 +1,497 @@
+import argparse
+import contextlib
 import csv
-from element_interface.utils import ingest_csv_to_table
+import itertools
+import logging
+import pathlib
+import threading
+import time
+import datajoint as dj
+import numpy as np
+from datajoint.utils import to_camel_case
+from workflow_session.integrity import ReferenceIndex
+from workflow_session.keys import ExistingKeys
+from workflow_session.loader import (
+    LocalInfileUnavailable,
+    allows_local_infile,
+    load_rows,
+    loadable,
+    local_infile_connection,
+)
+from workflow_session.lookup import invalidate_lookups
+from workflow_session.manifest import IngestManifest
 from workflow_session.pipeline import lab, subject, session, genotyping
+from workflow_session.readers import CsvCache, iter_chunks, project_rows
+from workflow_session.report import IngestReport, row_bytes
+from workflow_session.scheduler import run_by_level
+from workflow_session.validation import validate_columns
+
+logger = logging.getLogger(__name__)
+
+# Stays under MySQL's smallest default max_allowed_packet (4 MiB, before 8.0)
+BULK_BATCH_BYTES = 4 * 1024 * 1024 - 64 * 1024
+# Below this many rows per insert, staging a file for LOAD DATA does not pay off
+LOAD_DATA_MIN_ROWS = 10000
+
+
+class IngestCancelled(Exception):
+    """An ingest stopped between batches because its `cancel` event was set"""
+
+
+def _log_inserted(table, insert_len: int):
+    logger.info(
+        f"\n---- Inserting {insert_len} entry(s) "
+        + f"into {to_camel_case(table.table_name)} ----"
+    )
+
+
+def _byte_batches(rows: list, batch_bytes: int):
+    """Split rows into consecutive batches whose estimated size fits `batch_bytes`"""
+    batch, size = [], 0
+    for row in rows:
+        row_size = row_bytes(row)
+        if batch and size + row_size > batch_bytes:
+            yield batch
+            batch, size = [], 0
+        batch.append(row)
+        size += row_size
+    if batch:
+        yield batch
+
+
+class _IngestRun:
+    """Options and shared state for inserting rows during one ingest call"""
+
+    def __init__(
+        self,
+        manifest,
+        existing_keys,
+        batch_bytes,
+        report=None,
+        validate=False,
+        references=None,
+        load_data=False,
+        connection=None,
+        cancel=None,
+        bulk=False,
+        **insert_kwargs,
+    ):
+        self.manifest = manifest
+        self.existing_keys = existing_keys
+        self.batch_bytes = batch_bytes
+        self.report = report
+        self.validate = validate
+        self.references = references
+        self.load_data = load_data
+        self.connection = connection
+        self.cancel = cancel
+        self.bulk = bulk
+        self.insert_kwargs = insert_kwargs
+        self._targets = {}
+        self._loaders = {}  # thread -> (local infile connection, its tables)
+        self._skipped = {}  # (CSV, table name) -> rows dropped as invalid
+        self._lock = threading.Lock()
+
+    def target(self, table):
+        """`table`, or the same table on the run's own `connection` if it has one"""
+        if self.connection is None:
+            return table
+        if table.full_table_name not in self._targets:
+            self._targets[table.full_table_name] = dj.FreeTable(
+                self.connection, table.full_table_name
+            )
+        return self._targets[table.full_table_name]
+
+    def check_cancelled(self):
+        """Raise IngestCancelled if the run's `cancel` event is set"""
+        if self.cancel is not None and self.cancel.is_set():
+            raise IngestCancelled("Ingest cancelled")
+
+    def timed(self, table, csv_path: str, field: str = "parse_s"):
+        """Context accounting its duration to a report field of (CSV, table)"""
+        if self.report is None:
+            return contextlib.nullcontext()
+        return self.report.timer(csv_path, table, field)
+
+    def project(
+        self, table, columns: dict, csv_path: str, row_offset: int = 0, target=None
+    ):
+        """Project CSV columns onto `table`, dropping rows that fail validation
+        or reference missing keys.
+
+        Headings are read through `target`, the copy of `table` on the run's or
+        worker's connection, so threads do not share the class's connection.
+        """
+        target = table if target is None else target
+        with self.timed(table, csv_path):
+            rows = project_rows(columns, target)
+        if self.report is not None:
+            self.report.record(csv_path, table)["rows_read"] += len(rows)
+        if not self.validate and self.references is None:
+            return rows
+
+        valid, errors = np.ones(len(rows), dtype=bool), []
+        with self.timed(table, csv_path, "validate_s"):
+            if self.validate:
+                checked, found = validate_columns(columns, target, csv_path, row_offset)
+                valid &= checked
+                errors += found
+            if self.references is not None:
+                # Foreign keys are known to the activated table's connection
+                checked, found = self.references.check(
+                    table, rows, csv_path, row_offset, connection=target.connection
+                )
+                valid &= checked
+                errors += found
+        if errors:
+            n_invalid = len(rows) - int(valid.sum())
+            logger.warning(
+                f"{csv_path}: skipping {n_invalid} invalid row(s) for "
+                + f"{to_camel_case(table.table_name)}, e.g. row {errors[0]['row']} "
+                + f"{errors[0]['column']}={errors[0]['value']!r}: {errors[0]['error']}"
+            )
+            if self.report is not None:
+                self.report.add_errors(csv_path, table, errors, n_invalid)
+            with self._lock:
+                key = (str(csv_path), table.full_table_name)
+                self._skipped[key] = self._skipped.get(key, 0) + n_invalid
+            rows = list(itertools.compress(rows, valid))
+        return rows
+
+    def insert(self, table, rows: list, csv_path: str, target=None):
+        """Insert rows projected from `csv_path` into `table` (or its `target` copy)"""
+        target = table if target is None else target
+        if self.manifest is not None:
+            rows = self.manifest.filter_rows(csv_path, table, rows)
+        if self.existing_keys is not None:
+            rows = self.existing_keys.new_rows(target, rows)
+        if self.report is not None:
+            self.report.record(csv_path, table)["rows_sent"] += len(rows)
+        if self._use_load_data(table, target, rows):
+            rows = self._load(table, target, csv_path, rows)
+            if not rows:
+                return
+        batches = _byte_batches(rows, self.batch_bytes) if self.batch_bytes else [rows]
+        for batch in batches:
+            self.check_cancelled()
+            start = time.perf_counter()
+            target.insert(batch, **self.insert_kwargs)
+            self._inserted(table, target, csv_path, batch, start)
+
+    def _use_load_data(self, table, target, rows: list) -> bool:
+        """Whether to send `rows` with LOAD DATA rather than INSERT"""
+        return (
+            self.load_data
+            and self.insert_kwargs["skip_duplicates"]
+            and len(rows) >= LOAD_DATA_MIN_ROWS
+            and loadable(target)
+            and (
+                self.insert_kwargs["allow_direct_insert"]
+                or not isinstance(table, (dj.Imported, dj.Computed))
+            )
+        )
+
+    def _load_target(self, table, target):
+        """`table` on a connection allowing local infile, or None if there is none.
+
+        Each thread loads through a dedicated connection, opened on first use;
+        a `bulk` load must instead join the transaction on `target`'s.
+        """
+        if self.bulk:
+            return target if allows_local_infile(target.connection) else None
+        thread = threading.get_ident()
+        with self._lock:
+            loader = self._loaders.get(thread)
+        if loader is None:
+            loader = (local_infile_connection(), {})
+            with self._lock:
+                self._loaders[thread] = loader
+        connection, tables = loader
+        if table.full_table_name not in tables:
+            tables[table.full_table_name] = dj.FreeTable(
+                connection, table.full_table_name
+            )
+        return tables[table.full_table_name]
+
+    def _load(self, table, target, csv_path: str, rows: list) -> list:
+        """Send rows with LOAD DATA; return those left for INSERT"""
+        load_target = self._load_target(table, target)
+        if load_target is None:
+            logger.warning(
+                "LOAD DATA LOCAL INFILE in a `bulk` transaction needs a `connection`"
+                + " allowing it, see `loader.local_infile_connection`; inserting"
+            )
+            self.load_data = False
+            return rows
+        self.check_cancelled()
+        start = time.perf_counter()
+        try:
+            remaining = load_rows(load_target, rows)
+        except LocalInfileUnavailable as e:
+            logger.warning(f"LOAD DATA LOCAL INFILE unavailable, inserting: {e}")
+            self.load_data = False
+            return rows
+        unloaded = {id(row) for row in remaining}
+        loaded = [row for row in rows if id(row) not in unloaded]
+        if loaded:
+            self._inserted(table, target, csv_path, loaded, start)
+        return remaining
+
+    def close(self):
+        """Close the connections opened for LOAD DATA"""
+        with self._lock:
+            loaders, self._loaders = self._loaders, {}
+        for connection, _ in loaders.values():
+            with contextlib.suppress(Exception):
+                connection.close()
+
+    def _inserted(self, table, target, csv_path: str, rows: list, start: float):
+        """Account for rows sent to `target` since `start`"""
+        invalidate_lookups(target)
+        if self.references is not None:
+            self.references.add(target, rows)
+        if self.report is not None:
+            self.report.add_insert(csv_path, table, rows, time.perf_counter() - start)
+
+    def done(self, table, csv_path: str, inserted: int = None):
+        """Record a completed (CSV, table) pair and the rows it added"""
+        if self.manifest is not None:
+            skipped = self._skipped.get((str(csv_path), table.full_table_name), 0)
+            self.manifest.mark_done(csv_path, table, skipped)
+        if self.report is not None:
+            self.report.finish(csv_path, table, inserted)
+
+
+def _stream_csv_to_tables(
+    run: _IngestRun, csv_path: str, tables: list, chunk_size: int, verbose: bool
+):
+    """Stream one CSV into the tables it feeds, inserting chunk by chunk"""
+    counting = verbose or run.report is not None
+    targets = [run.target(table) for table in tables]
+    if counting:
+        prev_lens = [len(target) for target in targets]
+    chunks = iter_chunks(csv_path, chunk_size)
+    rows_read = 0
+    for chunk_idx in itertools.count():
+        # Reading the file is accounted to the first table it feeds
+        with run.timed(tables[0], csv_path):
+            columns = next(chunks, None)
+        if columns is None:
+            break
+        for table, target in zip(tables, targets):
+            rows = run.project(table, columns, csv_path, rows_read, target)
+            run.insert(table, rows, csv_path, target)
+        rows_read += len(next(iter(columns.values()), []))
+        if verbose:
+            logger.info(f"{csv_path}: chunk {chunk_idx + 1}, {rows_read} row(s) read")
+    for i, table in enumerate(tables):
+        inserted = len(targets[i]) - prev_lens[i] if counting else None
+        run.done(table, csv_path, inserted)
+        if verbose:
+            _log_inserted(table, inserted)
+
+
+def ingest_csv_to_table(
+    csvs: list,
+    tables: list,
+    skip_duplicates: bool = True,
+    verbose: bool = True,
+    allow_direct_insert: bool = False,
+    chunk_size: int = None,
+    workers: int = 1,
+    manifest_path: str = None,
+    prefilter_keys: bool = False,
+    bulk: bool = False,
+    batch_bytes: int = BULK_BATCH_BYTES,
+    report: IngestReport = None,
+    validate: bool = False,
+    check_references: bool = False,
+    load_data: bool = False,
+    connection: dj.Connection = None,
+    cancel: threading.Event = None,
+):
+    """Insert data from a series of CSVs into their corresponding tables.
+
+    Each CSV is parsed once per call, however many tables it feeds. Every table
+    receives only the columns matching its attributes. Paths ending in
+    `.parquet`/`.pq` or `.arrow`/`.feather`/`.ipc` are read with pyarrow instead,
+    keeping their column types. See `workflow_session.readers.read_columns`.
+
+    With `chunk_size`, CSVs are streamed instead: consecutive tables fed by the
+    same CSV share one pass over the file, and rows are inserted in batches of
+    `chunk_size` so memory stays bounded regardless of file size.
+
+    With `workers` above 1, tables are ordered by their foreign-key dependencies
+    rather than list position, and tables on the same dependency level are
+    inserted concurrently, each worker on its own connection.
+
+    With `manifest_path`, ingest is incremental: (CSV, table) pairs whose file is
+    unchanged since the last run are skipped, and otherwise only rows not sent
+    in the last run are inserted. See `workflow_session.manifest.IngestManifest`.
+
+    With `prefilter_keys`, each table's existing primary keys are fetched once
+    and rows already present are dropped client-side instead of being sent for
+    the server to ignore. It has no effect without `skip_duplicates`, so that
+    duplicates still raise, and is implied by `load_data`. See
+    `workflow_session.keys.ExistingKeys`.
+
+    With `bulk`, the whole call runs in one transaction, so a failure leaves no
+    table partially populated, and rows are sent as multi-row INSERTs of at most
+    `batch_bytes` each.
+
+    With `report`, parse time, row counts, bytes and insert latency of every
+    (CSV, table) pair are collected into it. See
+    `workflow_session.report.IngestReport`.
+
+    With `validate`, each CSV is checked column by column against the types,
+    lengths and enum values in the table heading before insert. Invalid rows
+    are skipped with a warning and, with `report`, listed in its `errors`. See
+    `workflow_session.validation.validate_columns`.
+
+    With `check_references`, the keys of every table referenced by a foreign
+    key are fetched once, and rows referencing absent keys are skipped and
+    reported like invalid rows, instead of failing on the server. See
+    `workflow_session.integrity.ReferenceIndex`.
+
+    With `load_data`, each insert of at least `LOAD_DATA_MIN_ROWS` rows is staged
+    as a temporary file and sent with `LOAD DATA LOCAL INFILE`, MySQL's native
+    bulk loader, through a dedicated connection per thread allowing it. Within
+    a `bulk` transaction, the load must share the transaction, so it is only
+    used if `connection` allows local infile (see
+    `workflow_session.loader.local_infile_connection`). Where the server
+    refuses it, or for tables with blobs, non-skipped duplicates, or missing
+    values taking a default, rows are inserted as usual, as are all rows of a
+    load the server skipped or coerced any of (then rolled back). See
+    `workflow_session.loader.load_rows`.
+
+    With `connection`, every table is queried and inserted through it instead of
+    the connection the table classes are bound to, so concurrent callers do not
+    share one. With `cancel`, the ingest raises `IngestCancelled` before the
+    next insert batch once the event is set; rows already inserted stay unless
+    `bulk` rolls them back. See `workflow_session.aio.AsyncIngestor`.
+
+    Args:
+        csvs (list): paths of CSVs, one per table. Repeats share one parse.
+            Parquet and Arrow IPC files are accepted too.
+        tables (list): DataJoint tables with terminal `()`
+        skip_duplicates (bool): Default True. See DataJoint `insert` function
+        verbose (bool): Print number inserted (i.e., table length change)
+        allow_direct_insert (bool): Default False. See DataJoint `insert` function
+        chunk_size (int): Optional. Number of rows per streamed insert batch
+        workers (int): Default 1. Number of concurrent insert connections
+        manifest_path (str): Optional. JSON manifest enabling incremental ingest
+        prefilter_keys (bool): Default False. Drop rows with existing primary keys
+            before insert
+        bulk (bool): Default False. Single transaction with byte-sized batches
+        batch_bytes (int): Default just under 4 MiB. Approximate size of each INSERT
+        report (IngestReport): Optional. Collects per-table instrumentation
+        validate (bool): Default False. Skip rows that fail heading-based checks
+        check_references (bool): Default False. Skip rows with foreign keys
+            absent from their parent tables
+        load_data (bool): Default False. Send large inserts with LOAD DATA LOCAL
+            INFILE, falling back to INSERT
+        connection (dj.Connection): Optional. Connection to ingest through
+        cancel (threading.Event): Optional. Set to stop between insert batches
+    """
+    if chunk_size and workers > 1:
+        raise ValueError("Streaming (`chunk_size`) runs serially; use `workers=1`")
+    if bulk and workers > 1:
+        raise ValueError("A `bulk` transaction uses one connection; use `workers=1`")
+    if connection is not None and workers > 1:
+        raise ValueError("Workers open their own connections; use `workers=1`")
+
+    manifest = IngestManifest(manifest_path) if manifest_path else None
+    if manifest is not None:
+        pairs = [
+            (csv_path, table)
+            for csv_path, table in zip(csvs, tables)
+            if not manifest.unchanged(csv_path, table)
+        ]
+        if verbose and len(pairs) < len(tables):
+            logger.info(
+                f"Skipping {len(tables) - len(pairs)} table(s) with unchanged CSVs"
+            )
+        csvs, tables = [p[0] for p in pairs], [p[1] for p in pairs]
+
+    run = _IngestRun(
+        manifest,
+        ExistingKeys() if skip_duplicates and (prefilter_keys or load_data) else None,
+        batch_bytes if bulk else None,
+        report,
+        validate,
+        ReferenceIndex() if check_references else None,
+        load_data,
+        connection,
+        cancel,
+        bulk,
+        skip_duplicates=skip_duplicates,
+        ignore_extra_fields=True,
+        allow_direct_insert=allow_direct_insert,
+    )
+    if connection is None and tables:
+        connection = tables[0].connection
+    transaction = (
+        connection.transaction if bulk and tables else contextlib.nullcontext()
+    )
+
+    committed = False
+    try:
+        with transaction:
+            if chunk_size:
+                runs = itertools.groupby(
+                    zip(csvs, tables), key=lambda pair: pathlib.Path(pair[0]).resolve()
+                )
+                for _, csv_run in runs:
+                    csv_run = list(csv_run)
+                    _stream_csv_to_tables(
+                        run,
+                        csv_run[0][0],
+                        [table for _, table in csv_run],
+                        chunk_size,
+                        verbose,
+                    )
+            else:
+                _insert_csvs_to_tables(run, csvs, tables, verbose, workers)
+        committed = True
+    finally:
+        run.close()
+        # A rolled-back bulk transaction must not be recorded as ingested
+        if manifest is not None and (committed or not bulk):
+            manifest.save()
+
+
+def _insert_csvs_to_tables(
+    run: _IngestRun, csvs: list, tables: list, verbose: bool, workers: int
+):
+    """Insert each table from the shared parse of its CSV"""
+    cache = CsvCache(csvs)
+
+    def _insert(i, connection=None):
+        run.check_cancelled()
+        csv_path, table = csvs[i], tables[i]
+        # Concurrent workers insert through their own connection
+        target = (
+            run.target(table)
+            if connection is None
+            else dj.FreeTable(connection, table.full_table_name)
+        )
+        counting = verbose or run.report is not None
+        if counting:
+            prev_len = len(target)
+        with run.timed(table, csv_path):
+            columns = cache.columns(csv_path)
+        rows = run.project(table, columns, csv_path, target=target)
+        run.insert(table, rows, csv_path, target)
+        inserted = len(target) - prev_len if counting else None
+        run.done(table, csv_path, inserted)
+        if verbose:
+            _log_inserted(target, inserted)
+
+    if workers > 1:
+        run_by_level(tables, _insert, workers)
+    else:
+        for i in range(len(tables)):
+            _insert(i)
 
 
 def ingest_lab(
@@ -14,10 +505,22 @@ def ingest_lab(
     sources_csv_path: str = "./user_data/lab/sources.csv",
     skip_duplicates: bool = True,
     verbose: bool = True,
+    chunk_size: int = None,
+    workers: int = 1,
+    manifest_path: str = None,
+    prefilter_keys: bool = False,
+    bulk: bool = False,
+    report: IngestReport = None,
+    validate: bool = False,
+    check_references: bool = False,
+    load_data: bool = False,
+    connection: dj.Connection = None,
+    cancel: threading.Event = None,
 ):
     """Insert data from a CSVs into their corresponding lab schema tables.
 
-    By default, uses data from workflow_session/user_data/lab/
+    By default, uses data from workflow_session/user_data/lab/. Any path may
+    instead be a Parquet or Arrow IPC file with the same columns.
 
     Args:
         lab_csv_path (str):            relative path of lab csv
@@ -30,6 +533,23 @@ def ingest_lab(
         sources_csv_path (str):        relative path of sources csv
         skip_duplicates (bool): Default True. See DataJoint `insert` function
         verbose (bool): Print number inserted (i.e., table length change)
+        chunk_size (int): Optional. Stream CSVs, inserting this many rows at a time
+        workers (int): Default 1. Insert independent tables concurrently
+        manifest_path (str): Optional. Ingest incrementally, tracked in this file
+        prefilter_keys (bool): Default False. Send only rows with new primary keys
+        bulk (bool): Default False. One transaction, with byte-sized multi-row
+            INSERTs
+        report (IngestReport): Optional. Collects per-table timings and counts
+        validate (bool): Default False. Check rows against table headings and
+            skip invalid ones
+        check_references (bool): Default False. Skip rows referencing missing
+            keys, checked locally
+        load_data (bool): Default False. Send large inserts with LOAD DATA LOCAL
+            INFILE when the server allows it
+        connection (dj.Connection): Optional. Ingest through this connection
+            rather than the one the pipeline is bound to
+        cancel (threading.Event): Optional. Set to stop before the next insert
+            batch, raising IngestCancelled
     """
 
     # List with repeats for when mult dj.tables fed by same CSV
@@ -64,7 +584,23 @@ def ingest_lab(
         lab.Source(),  # 13
     ]
 
-    ingest_csv_to_table(csvs, tables, skip_duplicates=skip_duplicates, verbose=verbose)
+    ingest_csv_to_table(
+        csvs,
+        tables,
+        skip_duplicates=skip_duplicates,
+        verbose=verbose,
+        chunk_size=chunk_size,
+        workers=workers,
+        manifest_path=manifest_path,
+        prefilter_keys=prefilter_keys,
+        bulk=bulk,
+        report=report,
+        validate=validate,
+        check_references=check_references,
+        load_data=load_data,
+        connection=connection,
+        cancel=cancel,
+    )
 
 
 def ingest_subjects(
@@ -79,10 +615,22 @@ def ingest_subjects(
     zygosity_csv_path: str = "./user_data/subject/zygosity.csv",
     skip_duplicates: bool = True,
     verbose: bool = True,
+    chunk_size: int = None,
+    workers: int = 1,
+    manifest_path: str = None,
+    prefilter_keys: bool = False,
+    bulk: bool = False,
+    report: IngestReport = None,
+    validate: bool = False,
+    check_references: bool = False,
+    load_data: bool = False,
+    connection: dj.Connection = None,
+    cancel: threading.Event = None,
 ):
     """Insert data from a subject csv into corresponding subject schema tables
 
-    By default, uses data from workflow_session/user_data/subject/
+    By default, uses data from workflow_session/user_data/subject/. Any path may
+    instead be a Parquet or Arrow IPC file with the same columns.
 
     Args:
         subject_csv_path (str):        relative path of csv for subject data
@@ -96,6 +644,23 @@ def ingest_subjects(
         zygosity_csv_path (str):       relative path of csv for zygotsky
         skip_duplicates (bool): Default True. See DataJoint `insert` function
         verbose (bool): Print number inserted (i.e., table length change)
+        chunk_size (int): Optional. Stream CSVs, inserting this many rows at a time
+        workers (int): Default 1. Insert independent tables concurrently
+        manifest_path (str): Optional. Ingest incrementally, tracked in this file
+        prefilter_keys (bool): Default False. Send only rows with new primary keys
+        bulk (bool): Default False. One transaction, with byte-sized multi-row
+            INSERTs
+        report (IngestReport): Optional. Collects per-table timings and counts
+        validate (bool): Default False. Check rows against table headings and
+            skip invalid ones
+        check_references (bool): Default False. Skip rows referencing missing
+            keys, checked locally
+        load_data (bool): Default False. Send large inserts with LOAD DATA LOCAL
+            INFILE when the server allows it
+        connection (dj.Connection): Optional. Ingest through this connection
+            rather than the one the pipeline is bound to
+        cancel (threading.Event): Optional. Set to stop before the next insert
+            batch, raising IngestCancelled
     """
     csvs = [
         subject_csv_path,  # 0
@@ -154,20 +719,65 @@ def ingest_subjects(
         genotyping.GenotypeTest(),  # 25
     ]
 
-    ingest_csv_to_table(csvs, tables, skip_duplicates=skip_duplicates, verbose=verbose)
+    ingest_csv_to_table(
+        csvs,
+        tables,
+        skip_duplicates=skip_duplicates,
+        verbose=verbose,
+        chunk_size=chunk_size,
+        workers=workers,
+        manifest_path=manifest_path,
+        prefilter_keys=prefilter_keys,
+        bulk=bulk,
+        report=report,
+        validate=validate,
+        check_references=check_references,
+        load_data=load_data,
+        connection=connection,
+        cancel=cancel,
+    )
 
 
 def ingest_sessions(
     session_csv_path: str = "./user_data/session/sessions.csv",
     skip_duplicates: bool = True,
     verbose: bool = True,
+    chunk_size: int = None,
+    workers: int = 1,
+    manifest_path: str = None,
+    prefilter_keys: bool = False,
+    bulk: bool = False,
+    report: IngestReport = None,
+    validate: bool = False,
+    check_references: bool = False,
+    load_data: bool = False,
+    connection: dj.Connection = None,
+    cancel: threading.Event = None,
 ):
     """
     Inserts data from a sessions csv into corresponding session schema tables
-    By default, uses data from workflow_session/user_data/session/
+    By default, uses data from workflow_session/user_data/session/. The path may
+    instead be a Parquet or Arrow IPC file with the same columns.
         session_csv_path (str):     relative path of session csv
         skip_duplicates (bool): Default True. See DataJoint `insert` function
         verbose (bool): Print number inserted (i.e., table length change)
+        chunk_size (int): Optional. Stream CSVs, inserting this many rows at a time
+        workers (int): Default 1. Insert independent tables concurrently
+        manifest_path (str): Optional. Ingest incrementally, tracked in this file
+        prefilter_keys (bool): Default False. Send only rows with new primary keys
+        bulk (bool): Default False. One transaction, with byte-sized multi-row
+            INSERTs
+        report (IngestReport): Optional. Collects per-table timings and counts
+        validate (bool): Default False. Check rows against table headings and
+            skip invalid ones
+        check_references (bool): Default False. Skip rows referencing missing
+            keys, checked locally
+        load_data (bool): Default False. Send large inserts with LOAD DATA LOCAL
+            INFILE when the server allows it
+        connection (dj.Connection): Optional. Ingest through this connection
+            rather than the one the pipeline is bound to
+        cancel (threading.Event): Optional. Set to stop before the next insert
+            batch, raising IngestCancelled
     """
     csvs = [
         session_csv_path,
@@ -184,10 +794,61 @@ def ingest_sessions(
         session.SessionExperimenter(),
     ]
 
-    ingest_csv_to_table(csvs, tables, skip_duplicates=skip_duplicates, verbose=verbose)
+    ingest_csv_to_table(
+        csvs,
+        tables,
+        skip_duplicates=skip_duplicates,
+        verbose=verbose,
+        chunk_size=chunk_size,
+        workers=workers,
+        manifest_path=manifest_path,
+        prefilter_keys=prefilter_keys,
+        bulk=bulk,
+        report=report,
+        validate=validate,
+        check_references=check_references,
+        load_data=load_data,
+        connection=connection,
+        cancel=cancel,
+    )
 
 
 if __name__ == "__main__":
-    ingest_lab()
-    ingest_subjects()
-    ingest_sessions()
+    parser = argparse.ArgumentParser(description="Ingest CSVs under ./user_data")
+    parser.add_argument(
+        "--manifest",
+        help="JSON manifest path; skip CSVs and rows unchanged since the last run",
+    )
+    parser.add_argument(
+        "--report", help="write per-table timings and row counts to this JSON file"
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="skip rows failing type checks; listed in the --report file",
+    )
+    parser.add_argument(
+        "--check-references",
+        action="store_true",
+        help="skip rows referencing missing keys; listed in the --report file",
+    )
+    parser.add_argument(
+        "--load-data",
+        action="store_true",
+        help="send large tables with LOAD DATA LOCAL INFILE when allowed",
+    )
+    args = parser.parse_args()
+
+    report = IngestReport() if args.report else None
+    options = dict(
+        manifest_path=args.manifest,
+        report=report,
+        validate=args.validate,
+        check_references=args.check_references,
+        load_data=args.load_data,
+    )
+    ingest_lab(**options)
+    ingest_subjects(**options)
+    ingest_sessions(**options)
+    if report is not None:
+        report.save(args.report)
@@ -0,0 +1,137 @@
+import threading
+
+import datajoint as dj
+import numpy as np
+
+from workflow_session.keys import coerce_value, fetch_keys
+
+
+def _normalize(value):
+    """Compare strings as MySQL's default collation does: no case, no pad spaces"""
+    return value.lower().rstrip(" ") if isinstance(value, str) else value
+
+
+class ReferenceIndex:
+    """Keys of referenced tables, fetched once and checked locally.
+
+    For each foreign key of a target table, the parent's primary keys are held
+    in a hash set, so every dependent row is checked without a round-trip and
+    all orphans are found before anything is sent. Keys inserted through `add`
+    during the same ingest count as present. Parent keys are read fresh once per
+    index, lookup tables included, since a stale key would drop valid rows.
+
+    Rows are only flagged when no match is possible: strings are compared
+    case-insensitively and without trailing spaces, and rows whose foreign key
+    is missing (a nullable reference) or cannot be parsed are left to the
+    server.
+    """
+
+    def __init__(self):
+        self._keys = {}
+        self._foreign_keys = {}
+        self._lock = threading.Lock()
+
+    def _parent_keys(self, connection, parent_name: str) -> set:
+        with self._lock:
+            if parent_name not in self._keys:
+                keys = fetch_keys(dj.FreeTable(connection, parent_name))
+                self._keys[parent_name] = {
+                    tuple(_normalize(value) for value in key) for key in keys
+                }
+            return self._keys[parent_name]
+
+    def _table_foreign_keys(self, table) -> list:
+        """Per foreign key: parent name, its key attributes, matching child names.
+
+        Read from the dependency graph of `table`'s connection, which only knows
+        the foreign keys of the schemas activated on it.
+        """
+        with self._lock:
+            if table.full_table_name not in self._foreign_keys:
+                foreign_keys = []
+                for parent, props in table.parents(
+                    as_objects=True, foreign_key_info=True
+                ):
+                    parent_to_child = {p: c for c, p in props["attr_map"].items()}
+                    foreign_keys.append(
+                        (
+                            parent.full_table_name,
+                            [parent.heading.attributes[p] for p in parent.primary_key],
+                            [parent_to_child[p] for p in parent.primary_key],
+                        )
+                    )
+                self._foreign_keys[table.full_table_name] = foreign_keys
+            return self._foreign_keys[table.full_table_name]
+
+    def add(self, table, rows: list):
+        """Count the keys of `rows`, just inserted into `table`, as present"""
+        keys = self._keys.get(table.full_table_name)
+        if keys is None:
+            return  # fetched, with these rows, on first use
+        attributes = table.heading.attributes
+        for row in rows:
+            try:
+                keys.add(
+                    tuple(
+                        _normalize(coerce_value(attributes[name], row[name]))
+                        for name in table.primary_key
+                    )
+                )
+            except (KeyError, ValueError):
+                continue
+
+    def check(
+        self,
+        table,
+        rows: list,
+        csv_path: str = None,
+        row_offset: int = 0,
+        connection=None,
+    ) -> tuple:
+        """Find rows referencing keys absent from a parent table.
+
+        Args:
+            table (dj.Table): table of an activated schema, with terminal `()`.
+                A `dj.FreeTable` on another connection, such as a pooled one,
+                has no foreign keys to check.
+            rows (list): rows projected onto `table`
+            csv_path (str): Optional. Source file, recorded in each error
+            row_offset (int): Default 0. Rows of the file preceding `rows`
+            connection (dj.Connection): Optional. Connection to fetch parent keys
+                through. Default `table`'s
+
+        Returns:
+            valid (np.ndarray): one bool per row, False for orphans
+            errors (list): one dict per missing reference, with the csv, table,
+                1-based data row number, columns, value and error message
+        """
+        valid = np.ones(len(rows), dtype=bool)
+        errors = []
+        for parent_name, attributes, names in self._table_foreign_keys(table):
+            parent_keys = self._parent_keys(
+                table.connection if connection is None else connection, parent_name
+            )
+            for i, row in enumerate(rows):
+                values = [row.get(name) for name in names]
+                if any(value is None or value == "" for value in values):
+                    continue
+                try:
+                    key = tuple(
+                        _normalize(coerce_value(attr, value))
+                        for attr, value in zip(attributes, values)
+                    )
+                except ValueError:
+                    continue
+                if key not in parent_keys:
+                    valid[i] = False
+                    errors.append(
+                        dict(
+                            csv=None if csv_path is None else str(csv_path),
+                            table=table.full_table_name,
+                            row=row_offset + i + 1,
+                            column=",".join(names),
+                            value=values[0] if len(values) == 1 else values,
+                            error=f"not in {parent_name}",
+                        )
+                    )
+        return valid, errors
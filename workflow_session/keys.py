@@ -0,0 +1,167 @@
+import datetime
+import decimal
+import threading
+import zlib
+
+
+def coerce_value(attr, value):
+    """Convert a CSV string to the Python type fetched for a heading attribute.
+
+    Args:
+        attr (dj.heading.Attribute): attribute from `table.heading.attributes`
+        value (str): raw CSV value. Non-strings are returned unchanged.
+
+    Returns:
+        value: int, Decimal, float, datetime or date per `attr.type`; else unchanged
+
+    Raises:
+        ValueError: if `value` cannot be parsed as `attr.type`
+    """
+    if not isinstance(value, str) or value == "":
+        return value
+    attr_type = attr.type.lower()
+    if attr_type.startswith(("datetime", "timestamp")):
+        return datetime.datetime.fromisoformat(value)
+    if attr_type == "date":
+        return datetime.date.fromisoformat(value)
+    if attr_type.startswith(("tinyint", "smallint", "mediumint", "int", "bigint")):
+        return int(value)
+    if attr_type.startswith("decimal"):
+        try:
+            return decimal.Decimal(value)
+        except decimal.InvalidOperation:
+            raise ValueError(f"invalid decimal: {value!r}")
+    if attr_type.startswith(("float", "double")):
+        return float(value)
+    return value
+
+
+def row_key(table, row: dict) -> tuple:
+    """Return the primary key of a CSV row as a tuple of fetched-type values.
+
+    Raises:
+        KeyError: if the row lacks a primary key attribute
+        ValueError: if a primary key value cannot be coerced
+    """
+    attributes = table.heading.attributes
+    return tuple(
+        coerce_value(attributes[name], row[name]) for name in table.primary_key
+    )
+
+
+def fetch_keys(table) -> set:
+    """Fetch the primary keys present in `table` as a set of tuples"""
+    primary_key = table.primary_key
+    if not primary_key:
+        return set()
+    values = table.fetch(*primary_key)
+    if len(primary_key) == 1:
+        values = [values]
+    return set(zip(*(column.tolist() for column in values)))
+
+
+# Text of datetimes in `row_digest`, as MySQL DATE_FORMAT and strftime patterns
+_DIGEST_DATETIME = ("%Y-%m-%d %H:%i:%s.%f", "%Y-%m-%d %H:%M:%S.%f")
+
+
+def row_digest(values) -> int:
+    """CRC32 of fetched values, as computed per row by `table_digest`.
+
+    Digests add up, so the digest of loaded rows can be kept as a running sum
+    and compared to the table's without fetching it again.
+    """
+    text = "|".join(
+        (
+            value.strftime(_DIGEST_DATETIME[1])
+            if isinstance(value, datetime.datetime)
+            else str(value)
+        )
+        for value in values
+    )
+    return zlib.crc32(text.encode())
+
+
+def _digest_sql(table, attrs) -> tuple:
+    """SQL summing `row_digest` of `attrs` over rows, and its query arguments"""
+    attributes = table.heading.attributes
+    columns, args = [], []
+    for name in attrs:
+        if attributes[name].type.lower().startswith(("datetime", "timestamp")):
+            columns.append(f"DATE_FORMAT(`{name}`, %s)")
+            args.append(_DIGEST_DATETIME[0])
+        else:
+            columns.append(f"`{name}`")
+    return (
+        "COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', {}))), 0)".format(
+            ", ".join(columns)
+        ),
+        args,
+    )
+
+
+def table_digest(table, *attrs) -> tuple:
+    """(row count, sum of `row_digest` of `attrs` over the rows) of `table`, in
+    one aggregate query.
+
+    Unlike a row count, it changes when a row is updated or replaced by another
+    one, barring a CRC32 collision. `attrs` are strings, numbers, dates or
+    datetimes and never NULL, e.g. primary or foreign key attributes.
+    """
+    digest_sql, args = _digest_sql(table, attrs)
+    count, digest = table.connection.query(
+        f"SELECT {digest_sql} FROM {table.full_table_name}", args=args
+    ).fetchone()
+    return int(count), int(digest)
+
+
+def grouped_digests(table, group: str, *attrs) -> dict:
+    """`table_digest` of the rows of each value of `group`, in one query.
+
+    Returns:
+        digests (dict): value of `group` -> (row count, digest)
+    """
+    digest_sql, args = _digest_sql(table, attrs)
+    return {
+        value: (int(count), int(digest))
+        for value, count, digest in table.connection.query(
+            f"SELECT `{group}`, {digest_sql} FROM {table.full_table_name} "
+            f"GROUP BY `{group}`",
+            args=args,
+        ).fetchall()
+    }
+
+
+class ExistingKeys:
+    """Primary keys already in each target table, fetched once per table.
+
+    Rows whose key is present, or repeated earlier in the same ingest, are
+    dropped before insert, as `skip_duplicates=True` would drop them on the
+    server. A row is only dropped on an exact match of its coerced key, so
+    anything ambiguous, such as a case-only difference under MySQL's
+    case-insensitive collation, is still sent.
+    """
+
+    def __init__(self):
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def _table_keys(self, table) -> set:
+        with self._lock:
+            if table.full_table_name not in self._keys:
+                self._keys[table.full_table_name] = fetch_keys(table)
+            return self._keys[table.full_table_name]
+
+    def new_rows(self, table, rows: list) -> list:
+        """Return the rows of `rows` whose primary key is not yet in `table`"""
+        keys = self._table_keys(table)
+        new = []
+        for row in rows:
+            try:
+                key = row_key(table, row)
+            except (KeyError, ValueError):
+                new.append(row)
+                continue
+            if key not in keys:
+                keys.add(key)
+                new.append(row)
+        return new
@@ -0,0 +1,172 @@
+import datetime
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning the client or server refuses LOAD DATA LOCAL INFILE
+_LOCAL_INFILE_ERRORS = {1148, 2068, 3948, 3950}
+_SAVEPOINT = "load_rows"
+_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"}
+)
+_NULL = "\\N"
+
+_LOAD_SQL = (
+    "LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {table} CHARACTER SET utf8mb4 "
+    "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+    "({columns})"
+)
+
+
+class LocalInfileUnavailable(Exception):
+    """LOAD DATA LOCAL INFILE is disabled on the client or the server"""
+
+
+def allows_local_infile(connection) -> bool:
+    """Whether `connection` was opened with LOAD DATA LOCAL INFILE allowed"""
+    return bool(connection.conn_info.get("local_infile"))
+
+
+def local_infile_connection():
+    """Open a connection allowing LOAD DATA LOCAL INFILE, using the same dj.config.
+
+    Connections other code shares, such as `dj.conn()`, are left as they are:
+    enabling local infile takes a reconnect, which drops their session state.
+    """
+    from .pool import new_connection
+
+    connection = new_connection()
+    connection.conn_info["local_infile"] = True
+    connection.connect()
+    return connection
+
+
+def loadable(table) -> bool:
+    """Whether every attribute of `table` is a plain SQL type LOAD DATA can fill"""
+    return not any(
+        attr.is_blob
+        or attr.is_attachment
+        or attr.is_filepath
+        or attr.uuid
+        or attr.json
+        or attr.adapter
+        for attr in table.heading.attributes.values()
+    )
+
+
+def _field(value) -> str:
+    if value is None:
+        return _NULL
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    return str(value).translate(_ESCAPES)
+
+
+def _needs_default(attr, value) -> bool:
+    """Whether DataJoint's insert would send DEFAULT for this value"""
+    return value is None or (attr.numeric and value == "")
+
+
+def _stage(f, table, rows: list, names: list) -> list:
+    """Write loadable rows to `f` as tab-separated lines; return the others"""
+    attributes = table.heading.attributes
+    remaining = []
+    for row in rows:
+        values = [row[name] for name in names]
+        if any(
+            _needs_default(attributes[name], value) and not attributes[name].nullable
+            for name, value in zip(names, values)
+        ):
+            remaining.append(row)
+            continue
+        f.write(
+            "\t".join(
+                _NULL if _needs_default(attributes[name], value) else _field(value)
+                for name, value in zip(names, values)
+            )
+            + "\n"
+        )
+    return remaining
+
+
+def load_rows(table, rows: list) -> list:
+    """Insert rows with one LOAD DATA LOCAL INFILE from a staged temporary file.
+
+    Rows with missing values for attributes that are not nullable take their
+    column default in DataJoint's insert, which LOAD DATA cannot express; they
+    are returned for the normal insert instead.
+
+    The load runs in a transaction (a savepoint within an open one). The server
+    must load every row staged without a warning: if it skipped a row, e.g. a
+    duplicate or one with a missing foreign key, or coerced a value that INSERT
+    would reject, the load is rolled back and every row is returned for the
+    normal insert, which handles or reports it exactly.
+
+    Args:
+        table (dj.Table): target table, on a connection that allows local infile
+        rows (list): rows projected onto `table`, without primary keys already
+            in it or repeated, e.g. from the ingest's shared
+            `workflow_session.keys.ExistingKeys`
+
+    Returns:
+        remaining (list): rows not loaded, to insert the usual way
+
+    Raises:
+        LocalInfileUnavailable: if the client or server refuses local infile
+    """
+    if not rows:
+        return []
+    names = [name for name in table.heading.names if name in rows[0]]
+    sql = _LOAD_SQL.format(
+        table=table.full_table_name,
+        columns=",".join(f"`{name}`" for name in names),
+    )
+    connection = table.connection
+    path = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".tsv", encoding="utf-8", newline="", delete=False
+        ) as f:
+            path = f.name
+            remaining = _stage(f, table, rows, names)
+        staged = len(rows) - len(remaining)
+        if not staged:
+            return remaining
+
+        own_transaction = not connection.in_transaction
+        if own_transaction:
+            connection.start_transaction()
+        try:
+            connection.query(f"SAVEPOINT {_SAVEPOINT}")
+            try:
+                connection.query(sql, args=(path,))
+            except Exception as e:
+                if e.args and e.args[0] in _LOCAL_INFILE_ERRORS:
+                    raise LocalInfileUnavailable(str(e)) from e
+                raise
+            loaded, n_warnings = connection.query(
+                "SELECT ROW_COUNT(), @@warning_count"
+            ).fetchone()
+            if loaded != staged or n_warnings:
+                warnings = connection.query("SHOW WARNINGS LIMIT 1").fetchall()
+                connection.query(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT}")
+                logger.warning(
+                    f"LOAD DATA into {table.full_table_name} loaded {loaded} of "
+                    + f"{staged} row(s) with {n_warnings} warning(s), e.g. "
+                    + f"{warnings[0][2] if warnings else '?'}; inserting them instead"
+                )
+                remaining = rows
+        except BaseException:
+            if own_transaction:
+                connection.cancel_transaction()
+            raise
+        if own_transaction:
+            connection.commit_transaction()
+    finally:
+        if path is not None:
+            os.unlink(path)
+    return remaining
@@ -0,0 +1,72 @@
+from .cache import TTLCache
+from .keys import fetch_keys
+
+# (full table name, query) -> fetched rows or keys, shared within the process
+lookup_cache = TTLCache(maxsize=10000, ttl=300)
+
+
+def is_lookup(table_name: str) -> bool:
+    """Whether a full table name belongs to a `dj.Lookup` table or its parts,
+    e.g. `lab.UserRole`, `subject.Strain` or `genotyping.Sequence`"""
+    return table_name.rsplit(".", 1)[-1].startswith("`#")
+
+
+def fetch_lookup(query, *attrs) -> list:
+    """Fetch rows of a (restricted) table as dicts, read through `lookup_cache`
+
+    Meant for lookup tables, which change rarely but are read constantly. The
+    workflow's own inserts and `delete` calls invalidate affected entries;
+    changes made by other processes show once `lookup_cache.ttl` expires.
+
+    Args:
+        query (dj.Table): table with terminal `()`, optionally restricted,
+            e.g. `subject.Strain & "strain_standard_name LIKE 'C57%'"`
+        *attrs (str): Optional. Attributes to fetch, default all
+
+    Returns:
+        rows (list): one dict per row, copies safe to modify
+    """
+    key = (query.full_table_name, query.make_sql(), attrs)
+    rows = lookup_cache.get(key)
+    if rows is None:
+        rows = query.fetch(*attrs, as_dict=True)
+        lookup_cache.set(key, rows)
+    return [dict(row) for row in rows]
+
+
+def fetch_lookup_keys(table) -> frozenset:
+    """Primary keys of a table as tuples, as `keys.fetch_keys`, read through
+    `lookup_cache`"""
+    key = (table.full_table_name, "primary keys")
+    keys = lookup_cache.get(key)
+    if keys is None:
+        keys = frozenset(fetch_keys(table))
+        lookup_cache.set(key, keys)
+    return keys
+
+
+def invalidate_lookups(table, cascade: bool = False):
+    """Drop cached entries of `table`, after inserting into or deleting from it
+
+    Args:
+        table (dj.Table): table whose content changed
+        cascade (bool): Default False. Also drop entries of its descendants,
+            which a delete cascades to
+    """
+    names = {table.full_table_name}
+    if cascade:
+        names.update(table.descendants())
+    if any(is_lookup(name) for name in names):
+        lookup_cache.invalidate(lambda key: key[0] in names)
+
+
+def delete(query, **kwargs):
+    """Delete `query` as `query.delete(**kwargs)`, keeping `lookup_cache` current
+
+    Returns:
+        count: as returned by DataJoint's `delete`
+    """
+    try:
+        return query.delete(**kwargs)
+    finally:
+        invalidate_lookups(query, cascade=True)
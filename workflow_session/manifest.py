@@ -0,0 +1,134 @@
+import base64
+import hashlib
+import json
+import pathlib
+import threading
+
+import numpy as np
+
+# Row fingerprints as stored: sorted 8-byte big-endian integers, base64-encoded
+_DIGEST_DTYPE = np.dtype(">u8")
+
+
+def file_fingerprint(path: str, block_size: int = 1 << 20) -> str:
+    """Return the sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def row_fingerprint(row: dict) -> str:
+    """Return a short, order-independent digest of one projected row"""
+    encoded = json.dumps(row, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def _encode_digests(digests: np.ndarray) -> str:
+    return base64.b64encode(digests.astype(_DIGEST_DTYPE).tobytes()).decode()
+
+
+def _decode_digests(entry: dict) -> np.ndarray:
+    """Sorted row fingerprints of a manifest entry, as uint64"""
+    packed = base64.b64decode(entry.get("row_digests", ""))
+    return np.frombuffer(packed, dtype=_DIGEST_DTYPE).astype(np.uint64)
+
+
+class IngestManifest:
+    """Local record of what each (CSV, table) pair last ingested.
+
+    For every pair, the manifest keeps the file's content fingerprint and the
+    fingerprints of the rows it sent to the table. A pair whose file is
+    unchanged is skipped, unless rows were left out of its last ingest, e.g. by
+    validation, so they are retried. Otherwise, only rows not sent in the last
+    ingest are sent. Rows with a changed non-key value are sent too, but
+    `skip_duplicates=True` still keeps the existing entry.
+
+    Row fingerprints are stored packed, 8 bytes each, and decoded once per pair
+    into a sorted array, so filtering a chunk is one vectorized lookup.
+
+    The manifest assumes the tables are only written through this ingest.
+    Delete the manifest file to force a full re-ingest.
+
+    Args:
+        path (str): location of the JSON manifest. Created on first `save`.
+    """
+
+    def __init__(self, path: str):
+        self.path = pathlib.Path(path)
+        self._entries = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self._files = {}
+        self._seen = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(csv_path: str, table) -> str:
+        return f"{pathlib.Path(csv_path).resolve()}::{table.full_table_name}"
+
+    def _file_fingerprint(self, csv_path: str) -> str:
+        resolved = pathlib.Path(csv_path).resolve()
+        with self._lock:
+            if resolved not in self._files:
+                self._files[resolved] = file_fingerprint(resolved)
+            return self._files[resolved]
+
+    def unchanged(self, csv_path: str, table) -> bool:
+        """Whether `csv_path` is identical to when it was last ingested into `table`"""
+        entry = self._entries.get(self._key(csv_path, table))
+        return (
+            bool(entry)
+            and not entry.get("skipped")
+            and entry["file"] == self._file_fingerprint(csv_path)
+        )
+
+    def filter_rows(self, csv_path: str, table, rows: list) -> list:
+        """Return the rows not sent to `table` in the last ingest of `csv_path`.
+
+        May be called once per chunk; fingerprints accumulate until `mark_done`.
+        """
+        key = self._key(csv_path, table)
+        digests = np.array(
+            [int(row_fingerprint(row), 16) for row in rows], dtype=np.uint64
+        )
+        with self._lock:
+            if key not in self._seen:
+                self._seen[key] = _decode_digests(self._entries.get(key, {}))
+            seen = self._seen[key]
+            self._pending.setdefault(key, []).append(digests)
+        if not len(seen):
+            return list(rows)
+        found = np.minimum(np.searchsorted(seen, digests), len(seen) - 1)
+        return [row for row, known in zip(rows, seen[found] == digests) if not known]
+
+    def mark_done(self, csv_path: str, table, skipped: int = 0):
+        """Record a successful ingest of `csv_path` into `table`.
+
+        Args:
+            csv_path (str): ingested file
+            table (dj.Table): table it was ingested into
+            skipped (int): Default 0. Rows of the file left out, not passed to
+                `filter_rows`. The pair is then ingested again on the next run,
+                sending only these rows if the file is unchanged.
+        """
+        key = self._key(csv_path, table)
+        fingerprint = self._file_fingerprint(csv_path)
+        with self._lock:
+            digests = np.unique(
+                np.concatenate(self._pending.pop(key, []) + [np.empty(0, np.uint64)])
+            )
+            self._entries[key] = dict(
+                file=fingerprint, row_digests=_encode_digests(digests)
+            )
+            if skipped:
+                self._entries[key]["skipped"] = skipped
+            self._seen.pop(key, None)
+
+    def save(self):
+        """Write the manifest to disk"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with self._lock:
+            tmp_path.write_text(json.dumps(self._entries))
+        tmp_path.replace(self.path)
@@ -0,0 +1,205 @@
+import inspect
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+
+import datajoint as dj
+
+logger = logging.getLogger(__name__)
+
+_FINGERPRINT_SQL = """
+SELECT
+    (SELECT CONCAT(COUNT(*), ':', COALESCE(SUM(CRC32(CONCAT_WS('|',
+        table_name, column_name, ordinal_position, column_type, is_nullable,
+        column_default, column_key, extra, column_comment))), 0))
+     FROM information_schema.columns WHERE table_schema = %s),
+    (SELECT CONCAT(COUNT(*), ':', COALESCE(SUM(CRC32(CONCAT_WS('|',
+        table_schema, table_name, constraint_name, column_name,
+        referenced_table_schema, referenced_table_name,
+        referenced_column_name))), 0))
+     FROM information_schema.key_column_usage
+     WHERE table_schema = %s OR referenced_table_schema = %s)
+"""
+
+# Snapshots applied in this process, by database name
+_snapshots = {}
+
+# DataJoint releases (major.minor) whose Heading and Dependencies internals
+# the snapshots are written against
+SUPPORTED_DATAJOINT = ("0.13", "0.14")
+
+
+def _supported(version: str) -> bool:
+    return ".".join(version.split(".")[:2]) in SUPPORTED_DATAJOINT
+
+
+def schema_fingerprint(schema: dj.Schema) -> str:
+    """Return a digest of a schema's columns and foreign keys, in one query"""
+    columns, keys = schema.connection.query(
+        _FINGERPRINT_SQL, args=(schema.database,) * 3
+    ).fetchone()
+    return f"{columns}-{keys}".replace(":", "_")
+
+
+def _table_classes(module, database: str):
+    """Yield the table classes and parts that `module` declares in `database`"""
+    for obj in vars(module).values():
+        if (
+            inspect.isclass(obj)
+            and issubclass(obj, dj.user_tables.UserTable)
+            and getattr(obj, "database", None) == database
+        ):
+            yield obj
+            for part in vars(obj).values():
+                if inspect.isclass(part) and issubclass(part, dj.Part):
+                    yield part
+
+
+def _edge_key(parent: str, child: str, props: dict) -> tuple:
+    return parent, child, tuple(sorted(props["attr_map"].items()))
+
+
+def _take_snapshot(module, schema: dj.Schema) -> dict:
+    """Introspect headings and foreign keys touching `schema`"""
+    headings = {}
+    for table in _table_classes(module, schema.database):
+        heading = table().heading
+        heading.attributes  # load from the database if not yet loaded
+        headings[table.table_name] = (
+            heading._table_status,
+            heading._attributes,
+            heading.indexes,
+        )
+
+    dependencies = schema.connection.dependencies
+    dependencies.load(force=True)
+    prefix = f"`{schema.database}`."
+    nodes = {
+        node: data.get("primary_key")
+        for node, data in dependencies.nodes(data=True)
+        if node.startswith(prefix)
+    }
+    edges = []
+    for parent, child, props in dependencies.edges(data=True):
+        if parent.isdigit():  # alias node: record one edge to the real parent
+            continue
+        if child.isdigit():
+            child = next(iter(dependencies.successors(child)))
+        if parent.startswith(prefix) or child.startswith(prefix):
+            edges.append((parent, child, props))
+    return dict(headings=headings, nodes=nodes, edges=edges)
+
+
+def _restore_dependencies(connection):
+    """Rebuild the dependency graph once every loaded schema has a snapshot"""
+    dependencies = connection.dependencies
+    dependencies.clear()
+    if not set(connection.schemas) <= set(_snapshots):
+        return  # DataJoint introspects on next use
+    for snapshot in _snapshots.values():
+        for node, primary_key in snapshot["nodes"].items():
+            dependencies.add_node(node, primary_key=primary_key)
+    seen = set()
+    for snapshot in _snapshots.values():
+        for parent, child, props in snapshot["edges"]:
+            key = _edge_key(parent, child, props)
+            if key in seen:
+                continue
+            seen.add(key)
+            if props["aliased"]:
+                alias_node = "%d" % next(dependencies._node_alias_count)
+                dependencies.add_node(alias_node)
+                dependencies.add_edge(parent, alias_node, **props)
+                dependencies.add_edge(alias_node, child, **props)
+            else:
+                dependencies.add_edge(parent, child, **props)
+    dependencies._loaded = True
+
+
+def _read_snapshot(path: pathlib.Path):
+    """The snapshot at `path`, or None if it is missing or unreadable"""
+    try:
+        snapshot = pickle.loads(path.read_bytes())
+        if not isinstance(snapshot, dict) or "headings" not in snapshot:
+            raise ValueError("not a metadata snapshot")
+        return snapshot
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable metadata snapshot {path}: {e!r}")
+        return None
+
+
+def _write_snapshot(cache_dir: pathlib.Path, database: str, path, data: bytes):
+    """Replace the snapshots of `database` with `data` at `path`.
+
+    Each writer stages its own temporary file, renamed into place at once, so
+    processes filling a cold cache together never read a partial snapshot.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for stale in cache_dir.glob(f"{database}.*.pkl"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=cache_dir, prefix=f"{database}.", suffix=".tmp", delete=False
+    ) as f:
+        f.write(data)
+    os.replace(f.name, path)
+
+
+def apply_snapshot(module, cache_dir: str):
+    """Load or create the metadata snapshot for an activated element module.
+
+    A snapshot holds the headings of the schema's tables and the foreign keys
+    touching it, in a file keyed by schema name and a DDL fingerprint. A schema
+    change alters the fingerprint, and the stale snapshot is replaced.
+
+    It is applied after activation, which still checks every table with
+    `SHOW TABLES` and loads the headings of Lookup tables with contents. What
+    it saves is the heading queries of the other tables, otherwise run on
+    their first use, and the foreign-key introspection of the dependency
+    graph, for one fingerprint query.
+
+    It writes Heading and Dependencies internals, so it is skipped with a
+    warning, leaving DataJoint to introspect as usual, unless the installed
+    DataJoint is one of `SUPPORTED_DATAJOINT`. A snapshot that cannot be read
+    is likewise ignored and replaced.
+
+    Snapshots are unpickled, which can run arbitrary code: `cache_dir` must be
+    writable only by users trusted to run code in this process.
+
+    Args:
+        module (module): activated element module, e.g. `element_lab.lab`
+        cache_dir (str): directory holding `<schema>.<fingerprint>.pkl` snapshots
+    """
+    if not _supported(dj.__version__):
+        logger.warning(
+            f"Not applying metadata snapshots: DataJoint {dj.__version__} is not"
+            f" one of {', '.join(SUPPORTED_DATAJOINT)}"
+        )
+        return
+    schema = module.schema
+    cache_dir = pathlib.Path(cache_dir)
+    fingerprint = schema_fingerprint(schema)
+    path = cache_dir / f"{schema.database}.{fingerprint}.pkl"
+
+    snapshot = _read_snapshot(path)
+    if snapshot is not None:
+        for table in _table_classes(module, schema.database):
+            cached = snapshot["headings"].get(table.table_name)
+            heading = table._heading
+            if cached and heading._attributes is None:
+                heading._table_status, heading._attributes, heading.indexes = cached
+    else:
+        snapshot = _take_snapshot(module, schema)
+        try:
+            data = pickle.dumps(snapshot)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Not caching metadata of {schema.database}: {e}")
+            return
+        _write_snapshot(cache_dir, schema.database, path, data)
+
+    _snapshots[schema.database] = snapshot
+    _restore_dependencies(schema.connection)
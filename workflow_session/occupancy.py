@@ -0,0 +1,206 @@
+import bisect
+
+import numpy as np
+
+from .keys import row_digest, table_digest
+
+# End of a stay that has not ended
+_OPEN = np.datetime64("9999-12-31T00:00:00", "us")
+
+
+def _timestamp(value) -> np.datetime64:
+    return np.datetime64(value, "us")
+
+
+class OccupancyIndex:
+    """Cage occupancy over time, from `genotyping.SubjectCaging` moves.
+
+    Each caging starts a stay that lasts until the subject's next caging or
+    its death. Stays are held per cage in arrays sorted by start and by end,
+    so occupancy at any time is a pair of binary searches rather than a scan
+    of the caging history. Cages touched by new cagings or deaths are rebuilt
+    on their next query.
+
+        index = OccupancyIndex()
+        index.refresh()
+        index.occupants("cage1", "2021-01-01 12:00")
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._history = {}  # subject -> sorted [(caging time, cage)]
+        self._deaths = {}  # subject -> time of death
+        self._cage_subjects = {}  # cage -> subjects ever caged in it
+        self._stays = {}  # cage -> (starts, ends, subjects, sorted ends)
+        self._dirty = set()
+        self._latest_caging = None
+        self._loaded_cagings = 0
+        self._digest = 0  # sum of `row_digest` of the cagings loaded
+
+    def add_cagings(self, cagings):
+        """Register cage moves.
+
+        Args:
+            cagings (iterable): (subject, caging_datetime, cage) triples
+        """
+        for subject, caging_datetime, cage in cagings:
+            history = self._history.setdefault(subject, [])
+            caging = (_timestamp(caging_datetime), cage)
+            i = bisect.bisect(history, caging)
+            history.insert(i, caging)
+            self._cage_subjects.setdefault(cage, set()).add(subject)
+            self._dirty.add(cage)
+            if i:
+                # The stay before this move now ends at it
+                self._dirty.add(history[i - 1][1])
+
+    def add_deaths(self, deaths):
+        """Register deaths, ending the subjects' last stays.
+
+        Args:
+            deaths (iterable): (subject, death_date) pairs
+        """
+        for subject, death_date in deaths:
+            death = _timestamp(death_date)
+            if self._deaths.get(subject) != death:
+                self._deaths[subject] = death
+                self._dirty.update(cage for _, cage in self._history.get(subject, ()))
+
+    def refresh(self, full: bool = False) -> int:
+        """Load cagings and deaths added to the database since the last refresh.
+
+        Cagings at or after the latest one already loaded are fetched; if the
+        table's row count or digest (see `keys.table_digest`) then differs from
+        that of the rows loaded, because of a backfill, a deletion or a caging
+        moved to another cage, everything is reloaded.
+
+        Args:
+            full (bool): Default False. Reload everything
+
+        Returns:
+            cagings (int): number of cagings loaded
+        """
+        from .pipeline import genotyping, subject
+
+        if full:
+            self._reset()
+        caging_attrs = ("subject", "caging_datetime", "cage")
+        total = table_digest(genotyping.SubjectCaging(), *caging_attrs)
+        cagings = genotyping.SubjectCaging()
+        if self._latest_caging is not None:
+            cagings &= f"caging_datetime >= '{self._latest_caging}'"
+        rows = [
+            row
+            for row in zip(*cagings.fetch(*caging_attrs))
+            if (_timestamp(row[1]), row[2]) not in self._history.get(row[0], ())
+        ]
+        digest = self._digest + sum(map(row_digest, rows))
+        if not full and (self._loaded_cagings + len(rows), digest) != total:
+            return self.refresh(full=True)
+
+        self.add_cagings(rows)
+        self.add_deaths(zip(*subject.SubjectDeath.fetch("subject", "death_date")))
+        self._loaded_cagings += len(rows)
+        self._digest = digest
+        if rows:
+            latest = max(row[1] for row in rows)
+            if self._latest_caging is None or latest > self._latest_caging:
+                self._latest_caging = latest
+        return self._loaded_cagings
+
+    def _rebuild(self):
+        """Rebuild the stays of outdated cages in one pass over the histories of
+        every subject ever caged in them"""
+        dirty = sorted(self._dirty)
+        code = {cage: i for i, cage in enumerate(dirty)}  # -1: cage not rebuilt
+        subjects = set().union(*(self._cage_subjects.get(c, ()) for c in dirty))
+        names, starts, cages = [], [], []
+        for subject in subjects:
+            history = self._history[subject]
+            names += [subject] * len(history)
+            starts += [start for start, _ in history]
+            cages += [code.get(cage, -1) for _, cage in history]
+        names = np.array(names, dtype=object)
+        starts = np.array(starts, dtype="datetime64[us]")
+        cages = np.array(cages, dtype=np.int64)
+
+        # A stay ends at the subject's next caging, or its death if earlier
+        last = np.append(names[1:] != names[:-1], True)
+        ends = np.where(last, _OPEN, np.roll(starts, -1))
+        deaths = np.array(
+            [self._deaths.get(subject, _OPEN) for subject in names],
+            dtype="datetime64[us]",
+        )
+        ends = np.maximum(starts, np.minimum(ends, deaths))
+
+        keep = cages != -1
+        names, starts, ends, cages = names[keep], starts[keep], ends[keep], cages[keep]
+        order = np.lexsort((starts, cages))
+        names, starts, ends = names[order], starts[order], ends[order]
+        bounds = np.searchsorted(cages[order], np.arange(len(dirty) + 1))
+        for i, cage in enumerate(dirty):
+            lo, hi = bounds[i], bounds[i + 1]
+            self._stays[cage] = (
+                starts[lo:hi],
+                ends[lo:hi],
+                names[lo:hi],
+                np.sort(ends[lo:hi]),
+            )
+        self._dirty = set()
+
+    def _cage_stays(self, cage) -> tuple:
+        """(starts, ends, subjects, sorted ends) of a cage"""
+        if self._dirty:
+            self._rebuild()
+        empty = np.array([], dtype="datetime64[us]")
+        return self._stays.get(cage, (empty, empty, np.array([], dtype=object), empty))
+
+    @property
+    def cages(self) -> list:
+        """Cages with at least one caging"""
+        return sorted(self._cage_subjects)
+
+    def occupants(self, cage, at) -> list:
+        """Subjects in `cage` at time `at`"""
+        return self.occupants_between(
+            cage, at, _timestamp(at) + np.timedelta64(1, "us")
+        )
+
+    def occupants_between(self, cage, start, end) -> list:
+        """Subjects in `cage` at any time in [`start`, `end`)"""
+        starts, ends, subjects, _ = self._cage_stays(cage)
+        started = np.searchsorted(starts, _timestamp(end), side="left")
+        overlapping = ends[:started] > _timestamp(start)
+        return sorted(set(subjects[:started][overlapping]))
+
+    def cage_of(self, subject, at):
+        """Cage of `subject` at time `at`, None if not caged or dead by then"""
+        at = _timestamp(at)
+        history = self._history.get(subject, [])
+        i = bisect.bisect_right(history, (at, chr(0x10FFFF))) - 1
+        if i < 0 or self._deaths.get(subject, _OPEN) <= at:
+            return None
+        return history[i][1]
+
+    def density(self, times, cages=None) -> tuple:
+        """Number of subjects in each cage at each of `times`.
+
+        Args:
+            times (iterable): timestamps, e.g. `pd.date_range(...)`
+            cages (list): Optional. Default all cages
+
+        Returns:
+            cages (list): cage of each row
+            counts (np.ndarray): int array of shape (len(cages), len(times))
+        """
+        cages = self.cages if cages is None else list(cages)
+        times = np.array([_timestamp(t) for t in times], dtype="datetime64[us]")
+        counts = np.zeros((len(cages), len(times)), dtype=np.int64)
+        for row, cage in enumerate(cages):
+            starts, _, _, sorted_ends = self._cage_stays(cage)
+            counts[row] = np.searchsorted(
+                starts, times, side="right"
+            ) - np.searchsorted(sorted_ends, times, side="right")
+        return cages, counts
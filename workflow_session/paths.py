@@ -1,3 +1,71 @@
+from .cache import TTLCache
+from .keys import row_key
+
+# (full table name, *primary key values) -> session_dir, for `use_cache=True`
+session_directory_cache = TTLCache(maxsize=100000, ttl=600)
+
+_BATCH_SIZE = 1000  # keys per query, keeping the restriction well under packet size
+
+
+def invalidate_session_directories(table=None):
+    """Drop cached session directories, of `table` only if given.
+
+    Call after updating or deleting `SessionDirectory` entries in a process
+    that looks them up with `use_cache=True`.
+    """
+    if table is None:
+        session_directory_cache.invalidate()
+    else:
+        session_directory_cache.invalidate(lambda key: key[0] == table.full_table_name)
+
+
+def get_session_directories(session_keys: list, use_cache: bool = False) -> dict:
+    """Return relative paths from SessionDirectory for many sessions at once
+
+    Keys are fetched in batched queries. With `use_cache`, paths found are kept
+    in `session_directory_cache` for up to 10 minutes, and keys already there
+    cost no query; entries are not refreshed when SessionDirectory changes, see
+    `invalidate_session_directories`.
+
+    Args:
+        session_keys (list): Full primary keys (dicts) of sessions
+        use_cache (bool): Default False. Read through `session_directory_cache`
+
+    Returns:
+        paths (dict): Primary key values as a tuple, in `session.Session`
+            primary key order -> relative path of session directory. Sessions
+            without a SessionDirectory entry are omitted.
+    """
+    from .pipeline import session
+
+    table = session.SessionDirectory()
+    paths, missing = {}, []
+    for key in session_keys:
+        key_values = row_key(table, key)
+        session_dir = (
+            session_directory_cache.get((table.full_table_name, *key_values))
+            if use_cache
+            else None
+        )
+        if session_dir is None:
+            missing.append(dict(zip(table.primary_key, key_values)))
+        else:
+            paths[key_values] = session_dir
+
+    for start in range(0, len(missing), _BATCH_SIZE):
+        batch = missing[start : start + _BATCH_SIZE]
+        for entry in (table & batch).fetch(
+            *table.primary_key, "session_dir", as_dict=True
+        ):
+            key_values = tuple(entry[name] for name in table.primary_key)
+            if use_cache:
+                session_directory_cache.set(
+                    (table.full_table_name, *key_values), entry["session_dir"]
+                )
+            paths[key_values] = entry["session_dir"]
+    return paths
+
+
 def get_session_directory(session_key: dict) -> str:
     """Return relative path from SessionDirectory table given key
 
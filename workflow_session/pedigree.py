@@ -0,0 +1,326 @@
+import numpy as np
+
+from .keys import row_digest, table_digest
+
+_UNKNOWN = -1
+
+
+class Pedigree:
+    """In-memory parentage of the colony, from breeding pairs and their litters.
+
+    Subjects are encoded as consecutive integers, and each one's father and
+    mother are held in integer arrays (-1 where unknown), so ancestry queries
+    walk whole generations with array operations instead of one query per
+    generation. Children lists are built from the same arrays on demand.
+
+    Load and later update it from the database with `refresh`, e.g. after each
+    `ingest_subjects`, or feed rows directly with `add_pairs` and `add_litters`:
+
+        pedigree = Pedigree()
+        pedigree.refresh()
+        pedigree.ancestors(["subject9"], generations=2)
+        pedigree.inbreeding(["subject9"])
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._index = {}
+        self._names = []
+        self._father = np.full(1024, _UNKNOWN, dtype=np.int64)
+        self._mother = np.full(1024, _UNKNOWN, dtype=np.int64)
+        self._pairs = {}  # (line, breeding_pair) -> [father, mother] indices
+        self._litters = {}  # (line, breeding_pair) -> indices of their pups
+        self._children = None  # (indptr, children) for descendants, built lazily
+        self._generation = None  # per index, 0 for founders, built lazily
+        self._inbreeding = np.empty(0)  # per index, NaN until computed
+        self._is_parent = set()
+        self._born = set()  # indices with a known litter
+        self._latest_litter = None
+        self._litter_digest = 0  # sum of `row_digest` of the litters loaded
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, subject):
+        return subject in self._index
+
+    def _encode(self, subject) -> int:
+        """Integer of `subject`, allocated on first sight"""
+        i = self._index.get(subject)
+        if i is None:
+            i = self._index[subject] = len(self._names)
+            self._names.append(subject)
+            if i == len(self._father):
+                grow = np.full(len(self._father), _UNKNOWN, dtype=np.int64)
+                self._father = np.concatenate([self._father, grow])
+                self._mother = np.concatenate([self._mother, grow])
+        return i
+
+    def _indices(self, subjects) -> np.ndarray:
+        """Integers of known `subjects`, raising KeyError for others"""
+        if isinstance(subjects, str):
+            subjects = [subjects]
+        return np.array([self._index[s] for s in subjects], dtype=np.int64)
+
+    def _set_parents(self, child: int, father: int, mother: int):
+        if self._father[child] == father and self._mother[child] == mother:
+            return
+        if child < len(self._inbreeding) or child in self._is_parent:
+            # Cached coefficients of `child` or its descendants are outdated
+            self._inbreeding = np.empty(0)
+        self._father[child], self._mother[child] = father, mother
+        self._is_parent.update(p for p in (father, mother) if p != _UNKNOWN)
+        self._children = self._generation = None
+
+    def add_pairs(self, fathers, mothers):
+        """Register the parents of breeding pairs.
+
+        Args:
+            fathers (iterable): (line, breeding_pair, father) triples
+            mothers (iterable): (line, breeding_pair, mother) triples
+        """
+        for parents, position in ((fathers, 0), (mothers, 1)):
+            for line, breeding_pair, parent in parents:
+                pair = self._pairs.setdefault((line, breeding_pair), [_UNKNOWN] * 2)
+                pair[position] = self._encode(parent)
+        for key, pups in self._litters.items():
+            if key in self._pairs:
+                father, mother = self._pairs[key]
+                for pup in pups:
+                    self._set_parents(pup, father, mother)
+
+    def add_litters(self, litters):
+        """Register the litters subjects were born in.
+
+        Args:
+            litters (iterable): (subject, line, breeding_pair) triples. Pairs
+                may be added before or after their litters.
+        """
+        for subject, line, breeding_pair in litters:
+            pup = self._encode(subject)
+            self._born.add(pup)
+            self._litters.setdefault((line, breeding_pair), []).append(pup)
+            father, mother = self._pairs.get((line, breeding_pair), [_UNKNOWN] * 2)
+            self._set_parents(pup, father, mother)
+
+    def refresh(self, full: bool = False) -> int:
+        """Load breeding pairs and litters added to the database since the last
+        refresh.
+
+        Litters born on or after the latest one already loaded are fetched;
+        if the table's row count or digest (see `keys.table_digest`) then
+        differs from that of the rows loaded, because an older litter was
+        backfilled, a row deleted or a subject moved to another litter,
+        everything is reloaded.
+
+        Args:
+            full (bool): Default False. Reload everything
+
+        Returns:
+            subjects (int): number of subjects known after the refresh
+        """
+        from .pipeline import genotyping
+
+        if full:
+            self._reset()
+        litter_attrs = ("subject", "line", "breeding_pair")
+        total = table_digest(genotyping.SubjectLitter(), *litter_attrs)
+        litters = genotyping.SubjectLitter()
+        if self._latest_litter is not None:
+            litters &= f"litter_birth_date >= '{self._latest_litter}'"
+        rows = litters.fetch(
+            "subject", "line", "breeding_pair", "litter_birth_date", as_dict=True
+        )
+        new_rows = [
+            row
+            for row in rows
+            if self._index.get(row["subject"], _UNKNOWN) not in self._born
+        ]
+        digest = self._litter_digest + sum(
+            row_digest(row[name] for name in litter_attrs) for row in new_rows
+        )
+        if not full and (len(self._born) + len(new_rows), digest) != total:
+            return self.refresh(full=True)
+
+        self.add_pairs(
+            zip(
+                *genotyping.BreedingPair.Father.fetch("line", "breeding_pair", "father")
+            ),
+            zip(
+                *genotyping.BreedingPair.Mother.fetch("line", "breeding_pair", "mother")
+            ),
+        )
+        self.add_litters(
+            (row["subject"], row["line"], row["breeding_pair"]) for row in new_rows
+        )
+        self._litter_digest = digest
+        if rows:
+            latest = max(row["litter_birth_date"] for row in rows)
+            if self._latest_litter is None or latest > self._latest_litter:
+                self._latest_litter = latest
+        return len(self)
+
+    def parents(self, subject) -> tuple:
+        """(father, mother) of `subject`, None where unknown"""
+        i = self._index[subject]
+        return tuple(
+            None if parent == _UNKNOWN else self._names[parent]
+            for parent in (self._father[i], self._mother[i])
+        )
+
+    def _walk(self, start: np.ndarray, step, generations: int = None) -> np.ndarray:
+        """Indices reached from `start` by repeated `step`, excluding `start`"""
+        seen = np.zeros(len(self), dtype=bool)
+        frontier = np.unique(start)
+        depth = 0
+        while len(frontier) and (generations is None or depth < generations):
+            frontier = step(frontier)
+            frontier = np.unique(frontier[frontier != _UNKNOWN])
+            frontier = frontier[~seen[frontier]]
+            seen[frontier] = True
+            depth += 1
+        return np.flatnonzero(seen)
+
+    def _parents_of(self, frontier: np.ndarray) -> np.ndarray:
+        return np.concatenate([self._father[frontier], self._mother[frontier]])
+
+    def _children_of(self, frontier: np.ndarray) -> np.ndarray:
+        if self._children is None:
+            n = len(self)
+            parents = np.concatenate([self._father[:n], self._mother[:n]])
+            children = np.concatenate([np.arange(n), np.arange(n)])
+            known = parents != _UNKNOWN
+            parents, children = parents[known], children[known]
+            order = np.argsort(parents, kind="stable")
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(parents, minlength=n), out=indptr[1:])
+            self._children = (indptr, children[order])
+        indptr, children = self._children
+        starts, stops = indptr[frontier], indptr[frontier + 1]
+        lengths = stops - starts
+        # Concatenated ranges [start, stop) of every frontier subject
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return children[offsets + np.arange(lengths.sum())]
+
+    def ancestors(self, subjects, generations: int = None) -> set:
+        """Subjects descended from by any of `subjects`, up to `generations` back
+
+        Raises:
+            KeyError: if a subject is not in the pedigree
+        """
+        found = self._walk(self._indices(subjects), self._parents_of, generations)
+        return {self._names[i] for i in found}
+
+    def descendants(self, subjects, generations: int = None) -> set:
+        """Offspring of any of `subjects`, up to `generations` down
+
+        Raises:
+            KeyError: if a subject is not in the pedigree
+        """
+        found = self._walk(self._indices(subjects), self._children_of, generations)
+        return {self._names[i] for i in found}
+
+    def common_ancestors(self, subject_a, subject_b) -> set:
+        """Ancestors shared by two subjects"""
+        return self.ancestors([subject_a]) & self.ancestors([subject_b])
+
+    def inbreeding(self, subjects) -> dict:
+        """Inbreeding coefficients: the probability that both alleles of a
+        subject at a locus are identical by descent.
+
+        Computed with the method of Meuwissen and Luo (1992) over the subjects
+        and their ancestors only, tracing each one's ancestors a generation at
+        a time with array operations. Full sibs share one computation, and
+        results are cached until parentage changes.
+
+        Returns:
+            coefficients (dict): subject -> coefficient, 0 for founders
+
+        Raises:
+            KeyError: if a subject is not in the pedigree
+            ValueError: if a subject is recorded as its own ancestor
+        """
+        targets = self._indices(subjects)
+        n = len(self)
+        if len(self._inbreeding) < n:
+            self._inbreeding = np.concatenate(
+                [self._inbreeding, np.full(n - len(self._inbreeding), np.nan)]
+            )
+        pending = np.unique(targets[np.isnan(self._inbreeding[targets])])
+        if len(pending):
+            pending = np.union1d(pending, self._walk(pending, self._parents_of))
+            pending = pending[np.isnan(self._inbreeding[pending])]
+            generation = self._generations()
+            # Filled in place, with a last -1.0 read for unknown parents
+            inbreeding = np.append(self._inbreeding, -1.0)
+            by_parents = {}
+            for i in pending[np.argsort(generation[pending], kind="stable")]:
+                parents = (self._father[i], self._mother[i])
+                if parents not in by_parents:
+                    by_parents[parents] = self._coefficient(i, generation, inbreeding)
+                inbreeding[i] = by_parents[parents]
+            self._inbreeding = inbreeding[:-1]
+        return {self._names[i]: float(self._inbreeding[i]) for i in targets}
+
+    def _generations(self) -> np.ndarray:
+        """Generation of every subject: 0 for founders, else one more than its
+        later-born parent
+
+        Raises:
+            ValueError: if a subject is its own ancestor
+        """
+        if self._generation is None:
+            n = len(self)
+            father, mother = self._father[:n], self._mother[:n]
+            generation = np.full(n, _UNKNOWN, dtype=np.int64)
+            # Parents' generations, with -1 for unknown parents
+            known = np.append(generation, -1)
+            while True:
+                unassigned = generation == _UNKNOWN
+                if not unassigned.any():
+                    break
+                ready = unassigned & (
+                    ((father == _UNKNOWN) | (known[father] != _UNKNOWN))
+                    & ((mother == _UNKNOWN) | (known[mother] != _UNKNOWN))
+                )
+                if not ready.any():
+                    cycle = [self._names[i] for i in np.flatnonzero(unassigned)[:5]]
+                    raise ValueError(f"Pedigree has a cycle among e.g. {cycle}")
+                generation[ready] = 1 + np.maximum(
+                    np.where(father[ready] == _UNKNOWN, -1, known[father[ready]]),
+                    np.where(mother[ready] == _UNKNOWN, -1, known[mother[ready]]),
+                )
+                known[:n] = generation
+            self._generation = generation
+        return self._generation
+
+    def _coefficient(
+        self, i: int, generation: np.ndarray, inbreeding: np.ndarray
+    ) -> float:
+        """Inbreeding of `i`, given `inbreeding` holding the coefficients of all
+        its ancestors and a last -1.0 for unknown parents"""
+        if self._father[i] == _UNKNOWN or self._mother[i] == _UNKNOWN:
+            return 0.0
+
+        # Contributions of ancestors to `i`, passed on to their parents one
+        # generation at a time, youngest first, so each is complete when used
+        nodes, weights = np.array([i]), np.array([1.0])
+        relationship = 0.0
+        while len(nodes):
+            youngest = generation[nodes] == generation[nodes].max()
+            current, inverse = np.unique(nodes[youngest], return_inverse=True)
+            contribution = np.bincount(inverse, weights=weights[youngest])
+            father, mother = self._father[current], self._mother[current]
+            within_family_variance = 0.5 - 0.25 * (
+                inbreeding[father] + inbreeding[mother]
+            )
+            relationship += np.sum(contribution**2 * within_family_variance)
+            parents = np.concatenate([father, mother])
+            known = parents != _UNKNOWN
+            nodes = np.concatenate([nodes[~youngest], parents[known]])
+            weights = np.concatenate(
+                [weights[~youngest], np.tile(0.5 * contribution, 2)[known]]
+            )
+        return relationship - 1.0
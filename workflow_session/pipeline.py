@@ -1,9 +1,16 @@
+import sys
+import threading
+import types
+
 import datajoint as dj
 
 from element_lab import lab
 from element_animal import subject, genotyping
 from element_session import session
 
+from workflow_session import summary
+from workflow_session.metadata_cache import apply_snapshot
+
 from element_animal.subject import Subject
 from element_animal.genotyping import (
     Sequence,
@@ -35,10 +42,13 @@ if "custom" not in dj.config:
     dj.config["custom"] = {}
 
 db_prefix = dj.config["custom"].get("database.prefix", "")
+lazy_activation = dj.config["custom"].get("lazy_activation", False)
+metadata_cache_dir = dj.config["custom"].get("metadata_cache_dir")
 
 __all__ = [
     "genotyping",
     "session",
+    "summary",
     "Subject",
     "Source",
     "Lab",
@@ -61,18 +71,144 @@ __all__ = [
     "GenotypeTest",
 ]
 
-# Activate "lab", "subject", "session", "genotyping" schemas -------------
-
-lab.activate(db_prefix + "lab")
-
-subject.activate(db_prefix + "subject", linking_module=__name__)
+# Activate "lab", "subject", "session", "genotyping", "summary" schemas -----
 
 from element_animal.export.nwb import subject_to_nwb
 from element_lab.export.nwb import element_lab_to_nwb_dict
 
 Experimenter = lab.User
-session.activate(db_prefix + "session", linking_module=__name__)
 
-genotyping.activate(
-    db_prefix + "genotyping", db_prefix + "subject", linking_module=__name__
+# Table classes handed to the elements, by the schema that declares them
+_schema_tables = {
+    "lab": [
+        "Source",
+        "Lab",
+        "Protocol",
+        "User",
+        "Experimenter",
+        "Project",
+        "ProjectUser",
+        "ProjectKeywords",
+        "ProjectPublication",
+        "ProjectSourceCode",
+    ],
+    "subject": ["Subject"],
+    "session": [
+        "Session",
+        "SessionDirectory",
+        "SessionExperimenter",
+        "SessionNote",
+        "ProjectSession",
+    ],
+    "genotyping": ["Sequence", "BreedingPair", "Cage", "SubjectCaging", "GenotypeTest"],
+}
+
+if lazy_activation:
+    # Elements read dependencies from the linking module's __dict__, so keep
+    # them there; removing them from this module routes access to __getattr__
+    _linking_module = types.ModuleType(__name__ + "._linking")
+    for _schema_name, _names in _schema_tables.items():
+        for _name in _names:
+            setattr(_linking_module, _name, globals().pop(_name))
+    # Export functions element-session looks up on the linking module
+    _linking_module.subject_to_nwb = subject_to_nwb
+    _linking_module.element_lab_to_nwb_dict = element_lab_to_nwb_dict
+else:
+    _linking_module = sys.modules[__name__]
+
+# Element modules as imported, kept unwrapped for activation
+_modules = dict(
+    lab=lab, subject=subject, session=session, genotyping=genotyping, summary=summary
 )
+_activators = {
+    "lab": ([], lambda: _modules["lab"].activate(db_prefix + "lab")),
+    "subject": (
+        ["lab"],
+        lambda: _modules["subject"].activate(
+            db_prefix + "subject", linking_module=_linking_module
+        ),
+    ),
+    "session": (
+        ["lab", "subject"],
+        lambda: _modules["session"].activate(
+            db_prefix + "session", linking_module=_linking_module
+        ),
+    ),
+    "genotyping": (
+        ["subject"],
+        lambda: _modules["genotyping"].activate(
+            db_prefix + "genotyping",
+            db_prefix + "subject",
+            linking_module=_linking_module,
+        ),
+    ),
+    "summary": (
+        ["subject", "genotyping"],
+        lambda: _modules["summary"].activate(db_prefix + "summary"),
+    ),
+}
+_activated = set()
+_activation_lock = threading.RLock()
+
+
+def activate(schema_name: str = None):
+    """Activate a schema, after the schemas it depends on, if not yet activated.
+
+    Called at import unless `dj.config["custom"]["lazy_activation"]` is set. In
+    that case, each schema is activated on first attribute access, e.g.
+    `pipeline.lab.Lab` or `pipeline.Subject`.
+
+    If `dj.config["custom"]["metadata_cache_dir"]` is set, table headings and
+    dependencies are loaded from snapshots there after activation instead of
+    being introspected on first use.
+    See `workflow_session.metadata_cache.apply_snapshot`.
+
+    Args:
+        schema_name (str): One of "lab", "subject", "session", "genotyping" or
+            "summary". Default None activates all five.
+    """
+    with _activation_lock:
+        for name in [schema_name] if schema_name else list(_activators):
+            if name in _activated:
+                continue
+            upstream, activator = _activators[name]
+            for upstream_name in upstream:
+                activate(upstream_name)
+            activator()
+            if metadata_cache_dir:
+                apply_snapshot(_modules[name], metadata_cache_dir)
+            _activated.add(name)
+
+
+class _LazySchemaModule:
+    """Stand-in for an element module that activates its schema on first use"""
+
+    def __init__(self, module, schema_name: str):
+        self._module = module
+        self._schema_name = schema_name
+
+    def __getattr__(self, name):
+        activate(self._schema_name)
+        return getattr(self._module, name)
+
+    def __repr__(self):
+        return f"<lazily activated {self._module.__name__}>"
+
+
+def __getattr__(name):
+    """Activate the declaring schema on first access to a table class (lazy mode)"""
+    for schema_name, names in _schema_tables.items():
+        if name in names and lazy_activation:
+            activate(schema_name)
+            return getattr(_linking_module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if lazy_activation:
+    lab = _LazySchemaModule(lab, "lab")
+    subject = _LazySchemaModule(subject, "subject")
+    session = _LazySchemaModule(session, "session")
+    genotyping = _LazySchemaModule(genotyping, "genotyping")
+    summary = _LazySchemaModule(summary, "summary")
+else:
+    activate()
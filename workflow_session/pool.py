@@ -0,0 +1,146 @@
+import contextlib
+import logging
+import threading
+import time
+
+import datajoint as dj
+
+logger = logging.getLogger(__name__)
+
+
+def new_connection() -> dj.Connection:
+    """Open a connection independent of `dj.conn()`, using the same dj.config"""
+    return dj.Connection(
+        dj.config["database.host"],
+        dj.config["database.user"],
+        dj.config["database.password"],
+        init_fun=dj.config["connection.init_function"],
+        use_tls=dj.config["database.use_tls"],
+    )
+
+
+def bind(table, connection: dj.Connection) -> dj.FreeTable:
+    """The table of an activated schema, queried and inserted through `connection`
+
+    Args:
+        table (dj.Table): table class or instance, e.g. `pipeline.subject.Subject`
+        connection (dj.Connection): e.g. checked out of a `ConnectionPool`
+    """
+    return dj.FreeTable(connection, table.full_table_name)
+
+
+class ConnectionPool:
+    """Bounded set of connections for threads that query or insert in parallel.
+
+    `dj.conn()` is one connection shared by every table class, so concurrent
+    threads using it are serialized at best. Each thread instead checks out a
+    connection of its own for the duration of a `with pool.connection()` block,
+    and uses `bind` to reach the activated tables through it:
+
+        pool = ConnectionPool(size=8)
+
+        def count(key):
+            with pool.connection() as connection:
+                return len(bind(subject.Subject, connection) & key)
+
+    Connections are opened on demand, up to `size`; further checkouts wait for
+    one to be returned. A connection idle for more than `ping_interval` seconds
+    is pinged on checkout and reconnected if the server dropped it. An open
+    transaction is rolled back on return, so the next user starts clean.
+
+    Args:
+        size (int): Default 4. Maximum number of open connections
+        ping_interval (float): Default 30. Seconds of idleness before a
+            connection is checked on checkout. 0 checks on every checkout.
+        timeout (float): Optional. Seconds to wait for a free connection before
+            raising TimeoutError. Default None waits indefinitely.
+    """
+
+    def __init__(self, size: int = 4, ping_interval: float = 30, timeout=None):
+        if size < 1:
+            raise ValueError("A connection pool needs a `size` of at least 1")
+        self.size = size
+        self.ping_interval = ping_interval
+        self.timeout = timeout
+        self._idle = []  # (connection, returned at) pairs, most recent last
+        self._opened = 0
+        self._closed = False
+        self._available = threading.Condition()
+
+    def _checkout(self) -> dj.Connection:
+        with self._available:
+            if not self._available.wait_for(
+                lambda: self._closed or self._idle or self._opened < self.size,
+                timeout=self.timeout,
+            ):
+                raise TimeoutError(f"No free connection within {self.timeout}s")
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._idle:
+                connection, returned = self._idle.pop()
+            else:
+                self._opened += 1
+                connection, returned = None, None
+        if connection is None:
+            try:
+                return new_connection()
+            except BaseException:
+                self._release_slot()
+                raise
+        if time.monotonic() - returned >= self.ping_interval:
+            if not connection.is_connected:
+                logger.info("Reconnecting pooled connection dropped by the server")
+                try:
+                    connection.connect()
+                except BaseException:
+                    self._release_slot()
+                    raise
+        return connection
+
+    def _release_slot(self):
+        with self._available:
+            self._opened -= 1
+            self._available.notify()
+
+    def _checkin(self, connection: dj.Connection):
+        if connection.in_transaction:
+            try:
+                connection.cancel_transaction()
+            except Exception:
+                # Lost mid-transaction; a fresh connection replaces it
+                self._release_slot()
+                with contextlib.suppress(Exception):
+                    connection.close()
+                return
+        with self._available:
+            if not self._closed:
+                self._idle.append((connection, time.monotonic()))
+                self._available.notify()
+                return
+            self._opened -= 1
+        connection.close()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Check out a connection for the `with` block, waiting if none is free"""
+        connection = self._checkout()
+        try:
+            yield connection
+        finally:
+            self._checkin(connection)
+
+    def close(self):
+        """Close idle connections now, and the others as they are returned"""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._available.notify_all()
+        for connection, _ in idle:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,217 @@
+import collections.abc
+import csv
+import importlib
+import itertools
+import pathlib
+import threading
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+def _import_pyarrow(name: str):
+    """Import `pyarrow.<name>`, naming the extra that installs pyarrow if missing"""
+    try:
+        return importlib.import_module(f"pyarrow.{name}")
+    except ImportError as e:
+        raise ImportError(
+            "Reading Parquet or Arrow IPC files requires pyarrow; install it with "
+            "`pip install workflow-session[arrow]`"
+        ) from e
+
+
+def _to_columns(header: list, rows) -> dict:
+    """Transpose csv.reader rows into a mapping of header name to values
+
+    Raises:
+        ValueError: if a header name appears more than once
+    """
+    duplicates = sorted({name for name in header if header.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate CSV header(s): {', '.join(duplicates)}")
+    columns = {name: [] for name in header}
+    appenders = [columns[name].append for name in header]
+    for row in rows:
+        if not row:
+            continue
+        row += [None] * (len(appenders) - len(row))
+        for append, value in zip(appenders, row):
+            append(value)
+    return columns
+
+
+def read_csv_columns(csv_path: str) -> dict:
+    """Read a CSV once into a columnar mapping of header name to column values.
+
+    Mirrors `csv.DictReader`: blank lines are skipped and short rows are padded
+    with None.
+
+    Args:
+        csv_path (str): relative path of csv
+
+    Returns:
+        columns (dict): header name -> list of values, one per row
+    """
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f, delimiter=",")
+        header = next(reader, [])
+        return _to_columns(header, reader)
+
+
+def iter_csv_chunks(csv_path: str, chunk_size: int):
+    """Stream a CSV as columnar chunks, holding at most `chunk_size` rows at once.
+
+    Args:
+        csv_path (str): relative path of csv
+        chunk_size (int): maximum number of rows per chunk
+
+    Yields:
+        columns (dict): header name -> values for the rows of one chunk
+    """
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f, delimiter=",")
+        header = next(reader, [])
+        rows = (row for row in reader if row)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield _to_columns(header, chunk)
+
+
+class ArrowColumns(collections.abc.Mapping):
+    """Columnar mapping over an Arrow table or record batch.
+
+    Selecting a column is zero-copy; it is converted to Python values on first
+    access only, so tables fed by the same file pay only for the columns they
+    use, once. Values keep their Arrow types: timestamps arrive as datetime,
+    integers as int and nulls as None, with no string re-parsing.
+
+    Args:
+        data (pyarrow.Table | pyarrow.RecordBatch): columns to expose
+    """
+
+    def __init__(self, data):
+        self._data = data
+        self._names = data.schema.names
+        self._columns = {}
+
+    def __getitem__(self, name: str) -> list:
+        if name not in self._columns:
+            if name not in self._names:
+                raise KeyError(name)
+            self._columns[name] = self._data.column(name).to_pylist()
+        return self._columns[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+def _is_parquet(path) -> bool:
+    return pathlib.Path(path).suffix.lower() in PARQUET_SUFFIXES
+
+
+def is_arrow_source(path) -> bool:
+    """Whether `path` names a Parquet or Arrow IPC file rather than a CSV"""
+    return pathlib.Path(path).suffix.lower() in PARQUET_SUFFIXES + ARROW_SUFFIXES
+
+
+def read_arrow_columns(path: str) -> ArrowColumns:
+    """Read a Parquet or Arrow IPC (Feather) file into an `ArrowColumns` mapping"""
+    if _is_parquet(path):
+        return ArrowColumns(
+            _import_pyarrow("parquet").read_table(path, memory_map=True)
+        )
+    return ArrowColumns(_import_pyarrow("feather").read_table(path, memory_map=True))
+
+
+def iter_arrow_chunks(path: str, chunk_size: int):
+    """Stream a Parquet or Arrow IPC file as `ArrowColumns` of `chunk_size` rows"""
+    if _is_parquet(path):
+        parquet_file = _import_pyarrow("parquet").ParquetFile(path)
+        batches = parquet_file.iter_batches(batch_size=chunk_size)
+    else:
+        table = _import_pyarrow("feather").read_table(path, memory_map=True)
+        batches = table.to_batches(max_chunksize=chunk_size)
+    for batch in batches:
+        yield ArrowColumns(batch)
+
+
+def read_columns(path: str) -> collections.abc.Mapping:
+    """Read a CSV, Parquet or Arrow IPC file into a columnar mapping, by suffix"""
+    return read_arrow_columns(path) if is_arrow_source(path) else read_csv_columns(path)
+
+
+def iter_chunks(path: str, chunk_size: int):
+    """Stream a CSV, Parquet or Arrow IPC file as columnar chunks, by suffix"""
+    if is_arrow_source(path):
+        return iter_arrow_chunks(path, chunk_size)
+    return iter_csv_chunks(path, chunk_size)
+
+
+def project_rows(columns: dict, table) -> list:
+    """Project columnar CSV data onto the attributes of a DataJoint table.
+
+    Args:
+        columns (dict): header name -> column values, see `read_columns`
+        table (dj.Table): target table with terminal `()`
+
+    Returns:
+        rows (list): one dict per row, restricted to the table's attributes
+    """
+    names = [name for name in table.heading.names if name in columns]
+    return [dict(zip(names, values)) for values in zip(*(columns[n] for n in names))]
+
+
+class CsvCache:
+    """Parsed CSVs shared by every table fed during one ingest call.
+
+    Each file is read once, Parquet and Arrow IPC files too (see
+    `read_columns`). Once the last table fed by a file has been projected, the
+    parsed columns are released. Safe to share between threads: a file is
+    parsed under its own lock, so different files parse concurrently.
+
+    Args:
+        csvs (list): paths of CSVs, one per target table, with repeats
+    """
+
+    def __init__(self, csvs: list):
+        self._remaining = {}
+        for csv_path in csvs:
+            key = self._key(csv_path)
+            self._remaining[key] = self._remaining.get(key, 0) + 1
+        self._columns = {}
+        self._lock = threading.Lock()  # guards the dicts, never held while parsing
+        self._key_locks = {key: threading.Lock() for key in self._remaining}
+
+    @staticmethod
+    def _key(csv_path) -> str:
+        return str(pathlib.Path(csv_path).resolve())
+
+    def columns(self, csv_path: str) -> dict:
+        """Return the parsed columns of `csv_path` for one of the tables it feeds"""
+        key = self._key(csv_path)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                columns = self._columns.get(key)
+            if columns is None:
+                columns = read_columns(csv_path)
+            with self._lock:
+                self._remaining[key] = self._remaining.get(key, 1) - 1
+                if self._remaining[key] > 0:
+                    self._columns[key] = columns
+                else:
+                    self._columns.pop(key, None)
+        return columns
+
+    def rows(self, csv_path: str, table) -> list:
+        """Return the rows of `csv_path` projected onto `table`"""
+        return project_rows(self.columns(csv_path), table)
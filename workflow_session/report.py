@@ -0,0 +1,107 @@
+import contextlib
+import json
+import pathlib
+import threading
+import time
+
+# Counters of one (CSV, table) record, with their initial values
+_FIELDS = dict(
+    parse_s=0.0,
+    validate_s=0.0,
+    rows_read=0,
+    rows_invalid=0,
+    rows_sent=0,
+    rows_inserted=None,
+    bytes=0,
+    batches=0,
+    insert_s=0.0,
+    max_insert_s=0.0,
+)
+
+
+def row_bytes(row: dict) -> int:
+    """Approximate INSERT payload of one row: value text plus quoting/separators"""
+    return sum(len(str(value)) + 4 for value in row.values())
+
+
+class IngestReport:
+    """Per-(CSV, table) timings and row counts collected during ingest.
+
+    Each record holds, for one CSV feeding one table:
+        parse_s: seconds reading the CSV and projecting its rows onto the table
+        validate_s: seconds checking the rows against the table heading
+        rows_read: rows projected from the CSV
+        rows_invalid: rows skipped by validation, listed in `errors`
+        rows_sent: rows sent to the server, after manifest and key prefilters
+        rows_inserted: growth of the table, or None if not measured
+        bytes: approximate INSERT payload sent
+        batches, insert_s, max_insert_s: number of INSERTs, their total and
+            largest latency in seconds, including server-side checks
+
+    One report may be passed to several ingest calls; records accumulate.
+
+    Args:
+        hooks (list): Optional. Callables receiving a copy of each finished
+            record (dict), e.g. to forward metrics to a monitoring system
+    """
+
+    def __init__(self, hooks: list = None):
+        self.hooks = list(hooks or [])
+        self._records = {}
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def record(self, csv_path: str, table) -> dict:
+        """Return the mutable record of `csv_path` feeding `table`"""
+        key = (str(csv_path), table.full_table_name)
+        with self._lock:
+            if key not in self._records:
+                self._records[key] = dict(csv=key[0], table=key[1], **_FIELDS)
+            return self._records[key]
+
+    @contextlib.contextmanager
+    def timer(self, csv_path: str, table, field: str):
+        """Add the time spent in the `with` block to a record's `field`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(csv_path, table)[field] += time.perf_counter() - start
+
+    def add_insert(self, csv_path: str, table, rows: list, seconds: float):
+        """Account for one INSERT of `rows` that took `seconds`"""
+        record = self.record(csv_path, table)
+        record["batches"] += 1
+        record["bytes"] += sum(row_bytes(row) for row in rows)
+        record["insert_s"] += seconds
+        record["max_insert_s"] = max(record["max_insert_s"], seconds)
+
+    def add_errors(self, csv_path: str, table, errors: list, n_invalid: int):
+        """Account for `n_invalid` rows skipped with per-row `errors`"""
+        self.record(csv_path, table)["rows_invalid"] += n_invalid
+        with self._lock:
+            self.errors.extend(errors)
+
+    def finish(self, csv_path: str, table, rows_inserted: int = None):
+        """Close a record and pass it to the hooks"""
+        record = self.record(csv_path, table)
+        record["rows_inserted"] = rows_inserted
+        for hook in self.hooks:
+            hook(dict(record))
+
+    def as_dict(self) -> dict:
+        """Records in ingest order, totals over all of them, and row errors"""
+        with self._lock:
+            records = [dict(record) for record in self._records.values()]
+            errors = list(self.errors)
+        totals = {
+            field: sum(record[field] or 0 for record in records)
+            for field in _FIELDS
+            if field != "max_insert_s"
+        }
+        return dict(tables=records, totals=totals, errors=errors)
+
+    def save(self, path: str):
+        """Write the report as JSON to `path`, with values JSON lacks (e.g. the
+        datetimes and Decimals of error values) as strings"""
+        pathlib.Path(path).write_text(json.dumps(self.as_dict(), indent=2, default=str))
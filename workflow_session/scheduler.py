@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from workflow_session.pool import ConnectionPool
+
+
+def dependency_levels(tables: list) -> list:
+    """Group tables by their foreign-key depth among themselves.
+
+    A table's level is one more than the deepest of its ancestors within
+    `tables`. Ancestors outside `tables` are assumed to be populated already.
+    Tables on the same level do not depend on each other.
+
+    Args:
+        tables (list): DataJoint tables with terminal `()`
+
+    Returns:
+        levels (list): lists of indices into `tables`, shallowest level first,
+            keeping list order within a level
+    """
+    index = {table.full_table_name: i for i, table in enumerate(tables)}
+    parents = [
+        {index[name] for name in table.ancestors() if name in index} - {i}
+        for i, table in enumerate(tables)
+    ]
+
+    depth = {}
+
+    def _depth(i):
+        if i not in depth:
+            depth[i] = 1 + max((_depth(p) for p in parents[i]), default=-1)
+        return depth[i]
+
+    levels = {}
+    for i in range(len(tables)):
+        levels.setdefault(_depth(i), []).append(i)
+    return [levels[d] for d in sorted(levels)]
+
+
+def run_by_level(tables: list, task, workers: int):
+    """Run `task` for every table, level by level, concurrently within a level.
+
+    Each level finishes before the next one starts, so parents are committed
+    before any child insert. Every worker checks out its own connection from
+    a `ConnectionPool` of `workers` connections.
+
+    Args:
+        tables (list): DataJoint tables with terminal `()`
+        task (callable): called as `task(index, connection)` for each table
+        workers (int): number of worker threads and connections
+    """
+    pool = ConnectionPool(size=workers)
+
+    def _run(i):
+        with pool.connection() as connection:
+            return task(i, connection)
+
+    with pool:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for level in dependency_levels(tables):
+                for future in [executor.submit(_run, i) for i in level]:
+                    future.result()
@@ -0,0 +1,440 @@
+import collections
+import logging
+
+import datajoint as dj
+
+from .genotypes import latest_tests
+from .keys import grouped_digests, table_digest
+
+logger = logging.getLogger(__name__)
+
+schema = dj.schema()
+
+# Rows per insert, and keys per restriction when fetching or deleting
+_BATCH_SIZE = 1000
+
+
+def activate(
+    schema_name: str, *, create_schema: bool = True, create_tables: bool = True
+):
+    """Activate the colony summary schema.
+
+    Its tables hold no foreign keys, so deleting subjects upstream does not
+    cascade into them; the next `refresh` accounts for the deletion instead.
+
+    Args:
+        schema_name (str): schema name on the database server
+        create_schema (bool): Default True. Create the schema if missing
+        create_tables (bool): Default True. Create the tables if missing
+    """
+    schema.activate(
+        schema_name, create_schema=create_schema, create_tables=create_tables
+    )
+
+
+@schema
+class SubjectStatus(dj.Manual):
+    """State of each subject as of the last `refresh`, compared to find changes.
+
+    Attributes:
+        subject ( varchar(8) ): Subject ID.
+        line ( varchar(32) ): Line of the subject, '' if none.
+        cage ( varchar(32) ): Cage of the latest caging, '' if never caged.
+        alive (bool): Whether the subject has no SubjectDeath entry.
+    """
+
+    definition = """
+    subject         : varchar(8)
+    ---
+    line=''         : varchar(32)
+    cage=''         : varchar(32)
+    alive           : bool
+    """
+
+    class Genotype(dj.Part):
+        """Latest genotype test result of a subject for each sequence.
+
+        Attributes:
+            SubjectStatus (foreign key): SubjectStatus key.
+            sequence ( varchar(32) ): Abbreviated sequence name.
+            test_result (Present or Absent): Result of the latest test.
+        """
+
+        definition = """
+        -> master
+        sequence        : varchar(32)
+        ---
+        test_result     : enum("Present", "Absent")
+        """
+
+
+@schema
+class SourceDigest(dj.Manual):
+    """Digests of the source tables as of the last `refresh`, compared to find
+    the subjects whose rows changed since.
+
+    Attributes:
+        source ( varchar(255) ): Full name of the source table.
+        subject ( varchar(8) ): Subject ID, '' for the whole table.
+        row_count (int): Number of rows.
+        digest (int): Sum of the rows' digests, see `keys.table_digest`.
+    """
+
+    definition = """
+    source          : varchar(255)
+    subject         : varchar(8)    # '' for the whole table
+    ---
+    row_count       : int unsigned
+    digest          : bigint unsigned
+    """
+
+
+@schema
+class LineCount(dj.Manual):
+    """Live and dead subjects of each line.
+
+    Attributes:
+        line ( varchar(32) ): Line name, '' for subjects without a line.
+        live (int): Number of live subjects.
+        dead (int): Number of dead subjects.
+    """
+
+    definition = """
+    line            : varchar(32)
+    ---
+    live            : int unsigned
+    dead            : int unsigned
+    """
+
+
+@schema
+class CageOccupancy(dj.Manual):
+    """Live subjects whose latest caging is in each cage.
+
+    Attributes:
+        cage ( varchar(32) ): Cage identifier.
+        occupants (int): Number of live subjects.
+    """
+
+    definition = """
+    cage            : varchar(32)
+    ---
+    occupants       : int unsigned
+    """
+
+
+@schema
+class GenotypeCount(dj.Manual):
+    """Live subjects of each line by latest test result for each sequence.
+
+    Attributes:
+        line ( varchar(32) ): Line name, '' for subjects without a line.
+        sequence ( varchar(32) ): Abbreviated sequence name.
+        test_result (Present or Absent): Latest test result.
+        live (int): Number of live subjects.
+    """
+
+    definition = """
+    line            : varchar(32)
+    sequence        : varchar(32)
+    test_result     : enum("Present", "Absent")
+    ---
+    live            : int unsigned
+    """
+
+
+def subject_states(subjects, lines, cagings, deaths, genotype_tests) -> dict:
+    """Combine colony records into one comparable state per subject.
+
+    Args:
+        subjects (iterable): subject IDs
+        lines (iterable): (subject, line) pairs
+        cagings (iterable): (subject, caging_datetime, cage) triples
+        deaths (iterable): IDs of dead subjects
+        genotype_tests (iterable): (subject, sequence, genotype_test_id,
+            test_result) tuples; the latest per sequence counts, see
+            `genotypes.latest_tests`
+
+    Returns:
+        states (dict): subject -> (line, cage, alive, genotypes), with '' for
+            a missing line or cage and genotypes a sorted tuple of
+            (sequence, test_result) pairs
+    """
+    line_of = dict(lines)
+    latest_caging = {}
+    for subject, caging_datetime, cage in cagings:
+        if subject not in latest_caging or caging_datetime >= latest_caging[subject][0]:
+            latest_caging[subject] = (caging_datetime, cage)
+    genotypes = collections.defaultdict(list)
+    for (subject, sequence), test_result in sorted(
+        latest_tests(genotype_tests).items()
+    ):
+        genotypes[subject].append((sequence, test_result))
+    dead = set(deaths)
+    return {
+        subject: (
+            line_of.get(subject, ""),
+            latest_caging.get(subject, (None, ""))[1],
+            subject not in dead,
+            tuple(genotypes.get(subject, ())),
+        )
+        for subject in subjects
+    }
+
+
+def summarize(states: dict, lines: set = None, cages: set = None) -> tuple:
+    """Count subjects per line, cage and genotype from their states.
+
+    Args:
+        states (dict): as returned by `subject_states`
+        lines (set): Optional. Only count these lines, default all
+        cages (set): Optional. Only count these cages, default all
+
+    Returns:
+        line_rows, cage_rows, genotype_rows (list): rows of `LineCount`,
+            `CageOccupancy` and `GenotypeCount`
+    """
+    by_line = collections.defaultdict(lambda: [0, 0])
+    by_cage = collections.Counter()
+    by_genotype = collections.Counter()
+    for line, cage, alive, genotypes in states.values():
+        if lines is None or line in lines:
+            by_line[line][0 if alive else 1] += 1
+            if alive:
+                by_genotype.update((line, *genotype) for genotype in genotypes)
+        if alive and cage and (cages is None or cage in cages):
+            by_cage[cage] += 1
+    return (
+        [
+            dict(line=line, live=live, dead=dead)
+            for line, (live, dead) in by_line.items()
+        ],
+        [dict(cage=cage, occupants=n) for cage, n in by_cage.items()],
+        [
+            dict(line=line, sequence=sequence, test_result=test_result, live=n)
+            for (line, sequence, test_result), n in by_genotype.items()
+        ],
+    )
+
+
+def stored_states(subjects: list = None) -> dict:
+    """States recorded by the last `refresh`, in the form of `subject_states`
+
+    Args:
+        subjects (list): Optional. Only read these subjects, default all
+    """
+    genotypes = collections.defaultdict(list)
+    for subject, sequence, test_result in _fetch(
+        SubjectStatus.Genotype(), ("subject", "sequence", "test_result"), subjects
+    ):
+        genotypes[subject].append((sequence, test_result))
+    return {
+        subject: (line, cage, bool(alive), tuple(sorted(genotypes.get(subject, ()))))
+        for subject, line, cage, alive in _fetch(
+            SubjectStatus(), ("subject", "line", "cage", "alive"), subjects
+        )
+    }
+
+
+def _batches(items: list):
+    for start in range(0, len(items), _BATCH_SIZE):
+        yield items[start : start + _BATCH_SIZE]
+
+
+def _fetch(table, attrs: tuple, subjects: list = None) -> list:
+    """Rows of `attrs` in `table`, of `subjects` only if given"""
+    queries = (
+        [table]
+        if subjects is None
+        else [table & [dict(subject=s) for s in batch] for batch in _batches(subjects)]
+    )
+    rows = []
+    for query in queries:
+        values = query.fetch(*attrs)
+        rows += zip(*(values if len(attrs) > 1 else [values]))
+    return rows
+
+
+def _delete(table, keys: list):
+    """Delete the rows of `table` matching any of `keys` (dicts)"""
+    for batch in _batches(keys):
+        (table & batch).delete_quick()
+
+
+def _replace(table, attr: str, values, rows: list):
+    """Delete rows of `table` whose `attr` is in `values`, then insert `rows`"""
+    _delete(table, [{attr: value} for value in sorted(values)])
+    for batch in _batches(rows):
+        table.insert(batch)
+
+
+def _add_counts(table, attrs: tuple, fields: tuple, before: list, after: list):
+    """Move the counts of `table` from `before` to `after`, rows of `summarize`
+    over the changed subjects only. Rows left at zero are removed."""
+    delta = {}
+    for sign, rows in ((-1, before), (1, after)):
+        for row in rows:
+            counts = delta.setdefault(tuple(row[a] for a in attrs), [0] * len(fields))
+            for i, field in enumerate(fields):
+                counts[i] += sign * row[field]
+    keys = [dict(zip(attrs, key)) for key, counts in delta.items() if any(counts)]
+    existing = {}
+    for batch in _batches(keys):
+        for row in (table & batch).fetch(as_dict=True):
+            existing[tuple(row[a] for a in attrs)] = row
+    rows = []
+    for key in keys:
+        old = existing.get(tuple(key.values()), {})
+        changes = delta[tuple(key.values())]
+        counts = {f: old.get(f, 0) + change for f, change in zip(fields, changes)}
+        if any(counts.values()):
+            rows.append(dict(key, **counts))
+    _delete(table, keys)
+    for batch in _batches(rows):
+        table.insert(batch)
+
+
+def _sources() -> list:
+    """Source tables of the subject states, with the attributes they are read by"""
+    from .pipeline import genotyping, subject
+
+    return [
+        (subject.Subject(), ("subject",)),
+        (subject.Subject.Line(), ("subject", "line")),
+        (genotyping.SubjectCaging(), ("subject", "caging_datetime", "cage")),
+        (subject.SubjectDeath(), ("subject",)),
+        (
+            genotyping.GenotypeTest(),
+            ("subject", "sequence", "genotype_test_id", "test_result"),
+        ),
+    ]
+
+
+def _changed_subjects(sources: list) -> tuple:
+    """Subjects with rows changed in `sources` since the digests were stored.
+
+    Returns:
+        subjects (set): subjects whose rows changed in any source
+        digests (list): (source name, table digest, {subject: digest or None
+            if gone}) of each changed source, to store
+    """
+    stored = {
+        source: (int(count), int(digest))
+        for source, count, digest in _fetch(
+            SourceDigest & "subject=''", ("source", "row_count", "digest")
+        )
+    }
+    subjects, digests = set(), []
+    for table, attrs in sources:
+        name = table.full_table_name
+        total = table_digest(table, *attrs)
+        if stored.get(name) == total:
+            continue
+        current = grouped_digests(table, "subject", *attrs)
+        previous = {
+            subject: (int(count), int(digest))
+            for subject, count, digest in _fetch(
+                SourceDigest & dict(source=name) & "subject!=''",
+                ("subject", "row_count", "digest"),
+            )
+        }
+        moved = {
+            subject
+            for subject in current.keys() | previous.keys()
+            if current.get(subject) != previous.get(subject)
+        }
+        subjects |= moved
+        digests.append((name, total, {s: current.get(s) for s in moved}))
+    return subjects, digests
+
+
+def _store_digests(digests: list):
+    """Record the digests returned by `_changed_subjects`"""
+    for name, total, by_subject in digests:
+        _delete(
+            SourceDigest,
+            [dict(source=name, subject=s) for s in ["", *sorted(by_subject)]],
+        )
+        rows = [dict(source=name, subject="", row_count=total[0], digest=total[1])]
+        rows += [
+            dict(source=name, subject=s, row_count=digest[0], digest=digest[1])
+            for s, digest in sorted(by_subject.items())
+            if digest is not None
+        ]
+        for batch in _batches(rows):
+            SourceDigest.insert(batch)
+
+
+def refresh(verbose: bool = True) -> int:
+    """Bring the summary tables up to date with the subject and genotyping schemas.
+
+    Each source table (Subject, Subject.Line, SubjectCaging, SubjectDeath and
+    GenotypeTest) is digested on the server, one aggregate query scanning the
+    table without transferring it (see `keys.table_digest`), and compared with
+    the digest `SourceDigest` holds from the last refresh, in any process. For
+    each source that changed, per-subject digests are fetched, one narrow row
+    per subject with rows, to find the subjects whose rows changed. Only the
+    source rows and `SubjectStatus` entries of those subjects are then read,
+    and their old and new states (line, latest cage, death and latest genotype
+    results) adjust the counts of the lines, cages and genotypes they left or
+    joined, in one transaction. The first refresh of a summary schema reads
+    every source in full.
+
+    Args:
+        verbose (bool): Default True. Log the number of changed subjects
+
+    Returns:
+        changed (int): number of subjects added, removed or changed
+    """
+    sources = _sources()
+    first = not SourceDigest()
+    subjects, digests = _changed_subjects(sources)
+    subjects = None if first else sorted(subjects)
+
+    current, stored, changed = {}, {}, []
+    if subjects is None or subjects:
+        rows = [_fetch(table, attrs, subjects) for table, attrs in sources]
+        current = subject_states(
+            [row[0] for row in rows[0]],
+            rows[1],
+            rows[2],
+            [row[0] for row in rows[3]],
+            rows[4],
+        )
+        stored = stored_states(subjects)
+        changed = sorted(
+            name
+            for name in current.keys() | stored.keys()
+            if current.get(name) != stored.get(name)
+        )
+    if verbose:
+        logger.info(f"\n---- Refreshing summary for {len(changed)} subject(s) ----")
+
+    before = summarize({name: stored[name] for name in changed if name in stored})
+    after = summarize({name: current[name] for name in changed if name in current})
+    status_rows, status_genotype_rows = [], []
+    for name in changed:
+        if name not in current:
+            continue  # deleted upstream
+        line, cage, alive, genotypes = current[name]
+        status_rows.append(dict(subject=name, line=line, cage=cage, alive=alive))
+        status_genotype_rows += [
+            dict(subject=name, sequence=sequence, test_result=test_result)
+            for sequence, test_result in genotypes
+        ]
+
+    with SubjectStatus.connection.transaction:
+        _replace(SubjectStatus.Genotype, "subject", changed, [])
+        _replace(SubjectStatus, "subject", changed, status_rows)
+        _replace(SubjectStatus.Genotype, "subject", [], status_genotype_rows)
+        _add_counts(LineCount, ("line",), ("live", "dead"), before[0], after[0])
+        _add_counts(CageOccupancy, ("cage",), ("occupants",), before[1], after[1])
+        _add_counts(
+            GenotypeCount,
+            ("line", "sequence", "test_result"),
+            ("live",),
+            before[2],
+            after[2],
+        )
+        _store_digests(digests)
+    return len(changed)
@@ -0,0 +1,245 @@
+import numpy as np
+
+from .keys import row_digest, table_digest
+
+_NOT_A_TIME = np.datetime64("NaT", "us")
+
+
+def _timestamp(value) -> np.datetime64:
+    return _NOT_A_TIME if value is None else np.datetime64(value, "us")
+
+
+class SessionTimeline:
+    """Sessions of every subject and project, sorted by `session_datetime`.
+
+    Sessions are held per subject and per project in sorted arrays, with
+    birth and death dates kept alongside, so range and nearest-session queries
+    with the age at session are binary searches instead of a join of
+    `session.Session`, `session.ProjectSession`, `subject.Subject` and
+    `subject.SubjectDeath`. Keys touched by new sessions are rebuilt on their
+    next query.
+
+    Load and later update it with `refresh`, e.g. after each `ingest_sessions`:
+
+        timeline = SessionTimeline()
+        timeline.refresh()
+        timeline.sessions(project="ProjA", start="2021-01-01", end="2021-02-01")
+        timeline.nearest("2021-01-15", subject="subject1")
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._sessions = set()  # (subject, session time)
+        self._links = set()  # (project, subject, session time)
+        self._by_subject = {}  # subject -> session times
+        self._by_project = {}  # project -> [(session time, subject)]
+        self._arrays = {}  # ("subject" or "project", name) -> (times, subjects)
+        self._dirty = set()
+        self._births = {}  # subject -> birth date
+        self._deaths = {}  # subject -> death date
+        self._latest_session = None
+        self._digests = (0, 0)  # sums of `row_digest` of sessions and links loaded
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add_sessions(self, sessions):
+        """Register sessions.
+
+        Args:
+            sessions (iterable): (subject, session_datetime) pairs
+        """
+        for subject, session_datetime in sessions:
+            session = (subject, _timestamp(session_datetime))
+            if session not in self._sessions:
+                self._sessions.add(session)
+                self._by_subject.setdefault(subject, []).append(session[1])
+                self._dirty.add(("subject", subject))
+
+    def add_projects(self, links):
+        """Register the projects of sessions.
+
+        Args:
+            links (iterable): (project, subject, session_datetime) triples
+        """
+        for project, subject, session_datetime in links:
+            link = (project, subject, _timestamp(session_datetime))
+            if link not in self._links:
+                self._links.add(link)
+                self._by_project.setdefault(project, []).append((link[2], subject))
+                self._dirty.add(("project", project))
+
+    def add_subjects(self, births, deaths=()):
+        """Register birth and death dates, replacing earlier ones.
+
+        Args:
+            births (iterable): (subject, subject_birth_date) pairs
+            deaths (iterable): (subject, death_date) pairs
+        """
+        self._births.update((s, _timestamp(date)) for s, date in births)
+        self._deaths.update((s, _timestamp(date)) for s, date in deaths)
+
+    def refresh(self, full: bool = False) -> int:
+        """Load sessions added to the database since the last refresh.
+
+        Sessions at or after the latest one already loaded are fetched, with
+        their projects; if the row count or digest (see `keys.table_digest`) of
+        either table then differs from that of the rows loaded, because of a
+        backfill, a deletion or a replaced row, everything is reloaded. Birth
+        and death dates are fetched in full, two narrow queries.
+
+        Args:
+            full (bool): Default False. Reload everything
+
+        Returns:
+            sessions (int): number of sessions known after the refresh
+        """
+        from .pipeline import session, subject
+
+        if full:
+            self._reset()
+        session_attrs = ("subject", "session_datetime")
+        link_attrs = ("project",) + session_attrs
+        totals = (
+            table_digest(session.Session(), *session_attrs),
+            table_digest(session.ProjectSession(), *link_attrs),
+        )
+        sessions, links = session.Session(), session.ProjectSession()
+        if self._latest_session is not None:
+            restriction = f"session_datetime >= '{self._latest_session}'"
+            sessions &= restriction
+            links &= restriction
+        rows = [
+            row
+            for row in zip(*sessions.fetch(*session_attrs))
+            if (row[0], _timestamp(row[1])) not in self._sessions
+        ]
+        link_rows = [
+            row
+            for row in zip(*links.fetch(*link_attrs))
+            if (row[0], row[1], _timestamp(row[2])) not in self._links
+        ]
+        digests = (
+            self._digests[0] + sum(map(row_digest, rows)),
+            self._digests[1] + sum(map(row_digest, link_rows)),
+        )
+        self.add_sessions(rows)
+        self.add_projects(link_rows)
+        loaded = (
+            (len(self._sessions), digests[0]),
+            (len(self._links), digests[1]),
+        )
+        if not full and loaded != totals:
+            return self.refresh(full=True)
+        self._digests = digests
+
+        self.add_subjects(
+            zip(*subject.Subject.fetch("subject", "subject_birth_date")),
+            zip(*subject.SubjectDeath.fetch("subject", "death_date")),
+        )
+        if rows:
+            latest = max(session_datetime for _, session_datetime in rows)
+            if self._latest_session is None or latest > self._latest_session:
+                self._latest_session = latest
+        return len(self)
+
+    def _timeline(self, kind: str, name) -> tuple:
+        """(times, subjects) of a subject or project sorted by time, rebuilt if
+        outdated"""
+        key = (kind, name)
+        if key in self._dirty or key not in self._arrays:
+            if kind == "subject":
+                times = self._by_subject.get(name, [])
+                subjects = [name] * len(times)
+            else:
+                pairs = self._by_project.get(name, [])
+                times = [time for time, _ in pairs]
+                subjects = [subject for _, subject in pairs]
+            times = np.array(times, dtype="datetime64[us]")
+            order = np.argsort(times, kind="stable")
+            self._arrays[key] = (times[order], np.array(subjects, dtype=object)[order])
+            self._dirty.discard(key)
+        return self._arrays[key]
+
+    def _select(self, subject, project) -> tuple:
+        if project is None:
+            if subject is None:
+                raise ValueError("Give a subject, a project or both")
+            return self._timeline("subject", subject)
+        times, subjects = self._timeline("project", project)
+        if subject is not None:
+            mine = subjects == subject
+            times, subjects = times[mine], subjects[mine]
+        return times, subjects
+
+    def _rows(self, times: np.ndarray, subjects: np.ndarray) -> list:
+        """Session rows with the subject's age in days (NaN if the birth date is
+        unknown) and whether it was alive, as of each session"""
+        births = np.array(
+            [self._births.get(s, _NOT_A_TIME) for s in subjects],
+            dtype="datetime64[us]",
+        )
+        deaths = np.array(
+            [self._deaths.get(s, _NOT_A_TIME) for s in subjects],
+            dtype="datetime64[us]",
+        )
+        age_days = (times - births) / np.timedelta64(1, "D")
+        alive = np.isnat(deaths) | (times < deaths)
+        return [
+            dict(
+                subject=subject,
+                session_datetime=time,
+                age_days=float(age),
+                alive=bool(living),
+            )
+            for subject, time, age, living in zip(
+                subjects, times.tolist(), age_days, alive
+            )
+        ]
+
+    def sessions(self, subject=None, project=None, start=None, end=None) -> list:
+        """Sessions of a subject, a project, or a subject within a project, in
+        [`start`, `end`), oldest first.
+
+        Args:
+            subject (str): Optional. Subject ID
+            project (str): Optional. Project name
+            start (datetime): Optional. Default from the first session
+            end (datetime): Optional. Default through the last session
+
+        Returns:
+            sessions (list): dicts with the subject, session_datetime, age_days
+                and alive
+
+        Raises:
+            ValueError: if neither a subject nor a project is given
+        """
+        times, subjects = self._select(subject, project)
+        lo = 0 if start is None else np.searchsorted(times, _timestamp(start))
+        hi = len(times) if end is None else np.searchsorted(times, _timestamp(end))
+        return self._rows(times[lo:hi], subjects[lo:hi])
+
+    def nearest(self, at, subject=None, project=None):
+        """Session closest in time to `at`, the earlier one on a tie.
+
+        Args:
+            at (datetime): time to search from
+            subject (str): Optional. Subject ID
+            project (str): Optional. Project name
+
+        Returns:
+            session (dict): as in `sessions`, or None if there are no sessions
+
+        Raises:
+            ValueError: if neither a subject nor a project is given
+        """
+        times, subjects = self._select(subject, project)
+        if not len(times):
+            return None
+        at = _timestamp(at)
+        i = np.searchsorted(times, at)
+        if i == len(times) or (i > 0 and at - times[i - 1] <= times[i] - at):
+            i -= 1
+        return self._rows(times[i : i + 1], subjects[i : i + 1])[0]
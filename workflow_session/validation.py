@@ -0,0 +1,113 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from workflow_session.readers import read_columns
+
+# Bits of each MySQL integer type
+_INT_BITS = dict(tinyint=8, smallint=16, mediumint=24, int=32, integer=32, bigint=64)
+_ENUM_VALUE = re.compile(r"'((?:[^']|'')*)'")
+_PATH_SUFFIXES = ("_dir", "_path")
+
+
+def _int_range(sql_type: str) -> tuple:
+    bits = _INT_BITS[sql_type.split("(")[0].split()[0]]
+    if "unsigned" in sql_type:
+        return 0, 2**bits - 1
+    return -(2 ** (bits - 1)), 2 ** (bits - 1) - 1
+
+
+def _attribute_errors(values: pd.Series, attr):
+    """Yield (invalid mask, message) pairs for one column checked against `attr`"""
+    sql_type = attr.type.lower()
+    base = sql_type.split("(")[0].split()[0]
+    if attr.numeric:
+        # Typed sources (Parquet/Arrow) may hold booleans, stored by MySQL as 0/1
+        values = values.map(lambda v: int(v) if isinstance(v, bool) else v)
+    text = values.fillna("").astype(str)
+    # Like DataJoint's insert, missing and blank numeric values take the default
+    blank = values.isna()
+    if attr.numeric:
+        blank |= text.str.strip() == ""
+    if not (attr.nullable or attr.default is not None or attr.autoincrement):
+        yield blank, "missing value"
+    present = ~blank
+
+    if base == "enum":
+        allowed = {v.replace("''", "'").lower() for v in _ENUM_VALUE.findall(attr.type)}
+        yield present & ~text.str.lower().isin(allowed), f"not one of {attr.type}"
+    elif base in ("char", "varchar"):
+        length = int(sql_type.split("(")[1].split(")")[0])
+        yield present & (text.str.len() > length), f"longer than {attr.type}"
+    elif base in ("date", "datetime", "timestamp"):
+        parsed = pd.to_datetime(text.where(present), format="ISO8601", errors="coerce")
+        yield present & parsed.isna(), f"not a valid {base}"
+    elif base in _INT_BITS:
+        number = pd.to_numeric(text.where(present), errors="coerce")
+        low, high = _int_range(sql_type)
+        invalid = number.isna() | (number % 1 != 0) | (number < low) | (number > high)
+        yield present & invalid, f"not a valid {attr.type}"
+    elif attr.numeric:
+        number = pd.to_numeric(text.where(present), errors="coerce")
+        yield present & number.isna(), f"not a valid {attr.type}"
+
+    if attr.string and attr.name.endswith(_PATH_SUFFIXES):
+        mixed = text.str.contains("/", regex=False) & text.str.contains(
+            "\\", regex=False
+        )
+        yield present & mixed, "mixes / and \\ path separators"
+
+
+def validate_columns(
+    columns: dict, table, csv_path: str = None, row_offset: int = 0
+) -> tuple:
+    """Check columnar CSV data against the heading of a table, column by column.
+
+    Types, lengths and enum values come from the activated table's heading, so
+    the checks follow the schema. Values are checked as DataJoint would send
+    them: missing cells and blank numbers take the attribute's default.
+
+    Args:
+        columns (dict): header name -> column values, see `read_columns`
+        table (dj.Table): target table with terminal `()`
+        csv_path (str): Optional. Source file, recorded in each error
+        row_offset (int): Default 0. Rows of the file preceding these columns
+
+    Returns:
+        valid (np.ndarray): one bool per row, False where any check failed
+        errors (list): one dict per failed check, with the csv, table, 1-based
+            data row number, column, value and error message
+    """
+    n_rows = len(next(iter(columns.values()), []))
+    valid = np.ones(n_rows, dtype=bool)
+    errors = []
+    heading = table.heading
+    for name in heading.names:
+        if name not in columns:
+            continue
+        values = pd.Series(columns[name], dtype=object)
+        for invalid, message in _attribute_errors(values, heading.attributes[name]):
+            invalid = invalid.to_numpy(dtype=bool)
+            valid &= ~invalid
+            for i in np.flatnonzero(invalid):
+                errors.append(
+                    dict(
+                        csv=None if csv_path is None else str(csv_path),
+                        table=table.full_table_name,
+                        row=row_offset + int(i) + 1,
+                        column=name,
+                        value=values.iat[i],
+                        error=message,
+                    )
+                )
+    return valid, errors
+
+
+def validate_csv(csv_path: str, table) -> list:
+    """Check a whole CSV (or Parquet/Arrow) file against a table without inserting
+
+    Returns:
+        errors (list): one dict per failed check, empty if every row is valid
+    """
+    return validate_columns(read_columns(csv_path), table, csv_path)[1]